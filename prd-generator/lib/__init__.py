@@ -2,27 +2,45 @@
 PRD Generator Plugin - Python Library
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "liangliang1259"
 
-from .utils import load_env, setup_logging, get_plugin_root, ensure_dir
-from .prd_validator import PRDValidator
-from .prd_generator import PRDGenerator
-from .version_manager import VersionManager
-
-try:
-    from .feishu_client import FeishuClient
-except ImportError:
-    # Feishu client is optional
-    FeishuClient = None
-
-__all__ = [
-    "load_env",
-    "setup_logging",
-    "get_plugin_root",
-    "ensure_dir",
-    "PRDValidator",
-    "PRDGenerator",
-    "VersionManager",
-    "FeishuClient",
-]
+# 公开名称 -> 所在模块。模块在第一次访问名称时才导入（PEP 562），只验证本地
+# 文件的调用方不会加载 requests、dotenv 等依赖。
+_EXPORTS = {
+    "load_env": ".utils",
+    "setup_logging": ".utils",
+    "get_plugin_root": ".utils",
+    "ensure_dir": ".utils",
+    "PRDValidator": ".prd_validator",
+    "ValidationCache": ".validation_cache",
+    "PRDGenerator": ".prd_generator",
+    "VersionManager": ".version_manager",
+    "FeishuClient": ".feishu_client",
+    "FeishuSync": ".feishu_sync",
+}
+
+# Feishu client is optional
+_OPTIONAL = {"FeishuClient", "FeishuSync"}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    except ImportError:
+        if name not in _OPTIONAL:
+            raise
+        value = None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,325 @@
+"""
+Blob Store - 内容寻址的版本内容存储
+"""
+
+import json
+import lzma
+import zlib
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from .utils import ensure_dir, write_atomic
+
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+class BlobStore:
+    """
+    内容寻址的版本内容存储
+
+    每个对象以内容的SHA-256命名，相同内容只存一份。对象分两种：
+    - full: 完整内容（关键帧）
+    - delta: 相对某个关键帧的行级差异
+
+    delta 总是直接基于关键帧而不是上一个版本，因此任意版本最多只需一次
+    差异应用即可还原；每隔 keyframe_interval 个版本（或差异过大时）写入新的
+    关键帧，避免差异随历史无限增长。
+
+    对象文件格式: 一行未压缩的JSON头 + 压缩后的数据。
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        keyframe_interval: int = 16,
+        codec: str = "zlib",
+        cache_size: int = 8
+    ):
+        """
+        初始化存储
+
+        Args:
+            root: 对象目录
+            keyframe_interval: 关键帧间隔（连续delta的最大数量）
+            codec: 压缩算法 (zlib/lzma)
+            cache_size: 内存中缓存的已还原内容数量
+        """
+        if codec not in CODECS:
+            raise ValueError(f"不支持的压缩算法: {codec}")
+
+        self.root = Path(root)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.codec = codec
+        self.cache_size = cache_size
+        # 读取路径不持有版本目录的文件锁，共享同一个存储的线程可能同时读取，
+        # LRU 的查找和调整都在锁内进行（解码在锁外）
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """计算内容哈希"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def object_path(self, blob_hash: str) -> Path:
+        """对象文件路径"""
+        return self.root / blob_hash[:2] / blob_hash[2:]
+
+    def exists(self, blob_hash: str) -> bool:
+        """对象是否存在"""
+        return self.object_path(blob_hash).exists()
+
+    def put(self, content: str, previous: Optional[str] = None) -> str:
+        """
+        存储内容
+
+        Args:
+            content: 文本内容
+            previous: 上一个版本的对象哈希，用于选择差异基准
+
+        Returns:
+            str: 对象哈希
+        """
+        blob_hash = self.hash_content(content)
+        if self.exists(blob_hash):
+            self._remember(blob_hash, content)
+            return blob_hash
+
+        header, payload = self._encode(content, previous)
+        self._write_object(blob_hash, header, payload)
+        self._remember(blob_hash, content)
+        return blob_hash
+
+    def get(self, blob_hash: str) -> str:
+        """
+        读取内容
+
+        Args:
+            blob_hash: 对象哈希
+
+        Returns:
+            str: 文本内容
+
+        Raises:
+            FileNotFoundError: 对象不存在
+        """
+        content = self._recall(blob_hash)
+        if content is not None:
+            return content
+
+        header, payload = self._read_object(blob_hash)
+        if header["type"] == "full":
+            content = payload.decode("utf-8")
+        else:
+            base_lines = self.get(header["base"]).splitlines(keepends=True)
+            content = apply_delta(base_lines, json.loads(payload.decode("utf-8")))
+
+        self._remember(blob_hash, content)
+        return content
+
+    def read_header(self, blob_hash: str) -> Dict:
+        """只读取对象头，不解压数据"""
+        with open(self.object_path(blob_hash), "rb") as f:
+            return json.loads(f.readline().decode("utf-8"))
+
+    def referenced(self, blob_hashes: Iterable[str]) -> set:
+        """
+        计算对象及其依赖的关键帧集合
+
+        Args:
+            blob_hashes: 仍在使用的对象哈希
+
+        Returns:
+            set: 需要保留的全部对象哈希
+        """
+        live = set()
+        for blob_hash in blob_hashes:
+            if blob_hash in live or not self.exists(blob_hash):
+                continue
+            live.add(blob_hash)
+            header = self.read_header(blob_hash)
+            if header["type"] == "delta":
+                live.add(header["base"])
+        return live
+
+    def gc(self, blob_hashes: Iterable[str]) -> int:
+        """
+        删除不再被引用的对象
+
+        Args:
+            blob_hashes: 仍在使用的对象哈希
+
+        Returns:
+            int: 删除的对象数量
+        """
+        live = self.referenced(blob_hashes)
+        removed = 0
+        if not self.root.exists():
+            return removed
+
+        for path in self.root.glob("*/*"):
+            blob_hash = path.parent.name + path.name
+            if len(blob_hash) == 64 and blob_hash not in live:
+                path.unlink()
+                with self._cache_lock:
+                    self._cache.pop(blob_hash, None)
+                removed += 1
+
+        if removed:
+            logging.info(f"已清理未引用的版本对象: {removed}个")
+        return removed
+
+    def _encode(self, content: str, previous: Optional[str]) -> Tuple[Dict, bytes]:
+        """选择关键帧或差异编码"""
+        data = content.encode("utf-8")
+        full = ({"type": "full"}, data)
+        if previous is None or not self.exists(previous):
+            return full
+
+        prev_header = self.read_header(previous)
+        if prev_header["type"] == "full":
+            base, seq = previous, 1
+        else:
+            base, seq = prev_header["base"], prev_header["seq"] + 1
+
+        if seq >= self.keyframe_interval:
+            return full
+
+        base_lines = self.get(base).splitlines(keepends=True)
+        delta = json.dumps(
+            make_delta(base_lines, content.splitlines(keepends=True)),
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+
+        # 差异超过完整内容一半时，直接写关键帧更划算
+        if len(delta) * 2 > len(data):
+            return full
+
+        return {"type": "delta", "base": base, "seq": seq}, delta
+
+    def _write_object(self, blob_hash: str, header: Dict, payload: bytes) -> None:
+        """原子写入对象文件"""
+        header = dict(header, codec=self.codec)
+        compress, _ = CODECS[self.codec]
+
+        path = self.object_path(blob_hash)
+        ensure_dir(path.parent)
+        write_atomic(path, json.dumps(header).encode("utf-8") + b"\n" + compress(payload))
+
+    def _read_object(self, blob_hash: str) -> Tuple[Dict, bytes]:
+        """读取并解压对象"""
+        path = self.object_path(blob_hash)
+        if not path.exists():
+            raise FileNotFoundError(f"版本对象不存在: {blob_hash}")
+
+        with open(path, "rb") as f:
+            header = json.loads(f.readline().decode("utf-8"))
+            _, decompress = CODECS[header.get("codec", "zlib")]
+            payload = decompress(f.read())
+        return header, payload
+
+    def _recall(self, blob_hash: str) -> Optional[str]:
+        """从缓存中取出已还原的内容"""
+        with self._cache_lock:
+            content = self._cache.get(blob_hash)
+            if content is not None:
+                self._cache.move_to_end(blob_hash)
+            return content
+
+    def _remember(self, blob_hash: str, content: str) -> None:
+        """缓存已还原的内容"""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[blob_hash] = content
+            self._cache.move_to_end(blob_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def make_delta(base_lines: List[str], new_lines: List[str]) -> List:
+    """
+    生成行级差异
+
+    按行建立基准内容的位置索引，贪心地延伸与基准相同的连续行，线性时间完成。
+    结果不一定是最小差异，但总能精确还原新内容。
+
+    Args:
+        base_lines: 基准内容的行（保留换行符）
+        new_lines: 新内容的行（保留换行符）
+
+    Returns:
+        List: 操作列表，[i1, i2] 表示复制基准的第i1到i2行，字符串表示插入的文本
+    """
+    index: Dict[str, List[int]] = {}
+    for i, line in enumerate(base_lines):
+        index.setdefault(line, []).append(i)
+
+    ops = []
+    pending: List[str] = []
+    base_len = len(base_lines)
+    new_len = len(new_lines)
+    expect = 0
+    j = 0
+
+    while j < new_len:
+        line = new_lines[j]
+        if expect < base_len and base_lines[expect] == line:
+            start = expect
+        else:
+            positions = index.get(line)
+            if not positions:
+                pending.append(line)
+                j += 1
+                continue
+            k = bisect_left(positions, expect)
+            start = positions[k] if k < len(positions) else positions[0]
+
+        end = start
+        while j < new_len and end < base_len and base_lines[end] == new_lines[j]:
+            end += 1
+            j += 1
+
+        if end - start == 1 and len(line) < 16:
+            # 单独一行的短内容（如空行）直接插入比复制更省空间
+            pending.append(line)
+            continue
+
+        if pending:
+            ops.append("".join(pending))
+            pending = []
+        ops.append([start, end])
+        expect = end
+
+    if pending:
+        ops.append("".join(pending))
+    return ops
+
+
+def apply_delta(base_lines: List[str], ops: List) -> str:
+    """
+    应用行级差异
+
+    Args:
+        base_lines: 基准内容的行（保留换行符）
+        ops: make_delta 生成的操作列表
+
+    Returns:
+        str: 还原后的内容
+    """
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return "".join(parts)
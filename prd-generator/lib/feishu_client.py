@@ -2,36 +2,142 @@
 Feishu Client - 飞书API客户端
 """
 
+import os
 import json
+import asyncio
 import logging
+import threading
 import requests
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .utils import get_plugin_root
+from .feishu_token import TokenCache, TOKEN_INVALID_CODES
+from .feishu_converter import convert_blocks, iter_markdown, write_markdown
+
+
+DEFAULT_API_BASE_URL = "https://open.feishu.cn/open-apis"
+
+# 连接池大小和请求超时的默认值（构造参数和配置文件都未指定时使用）
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+# 可重试的HTTP状态码（限流和网关错误）
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 
 
 class FeishuClient:
     """飞书API客户端"""
 
-    def __init__(self, app_id: Optional[str] = None, app_secret: Optional[str] = None):
+    def __init__(
+        self,
+        app_id: Optional[str] = None,
+        app_secret: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        max_retries: int = 3,
+        token_cache_file: Optional[Path] = None
+    ):
         """
         初始化飞书客户端
 
+        客户端持有一个 requests.Session，同一主机的请求复用连接池中的
+        keep-alive 连接，避免每次请求都重新建立TLS连接。用完后调用 close()，
+        或者作为上下文管理器使用:
+
+            with FeishuClient() as client:
+                client.get_document(doc_id)
+
         Args:
             app_id: 飞书应用ID
             app_secret: 飞书应用密钥
+            pool_size: 连接池大小（并发请求数超过时会等待空闲连接），None时使用
+                配置文件中的 pool_size，仍未设置则为 DEFAULT_POOL_SIZE
+            timeout: 请求超时（秒），可以是 (连接超时, 读取超时)；None时使用配置
+                文件中的 timeout，仍未设置则为 DEFAULT_TIMEOUT
+            max_retries: 连接错误和 429/5xx 响应的最大重试次数
+            token_cache_file: 访问令牌持久化文件（权限0600），None时读取环境变量
+                FEISHU_TOKEN_CACHE，仍未设置则只缓存在内存中；相对路径相对插件根目录
         """
         self.app_id = app_id
         self.app_secret = app_secret
-        self.api_base_url = "https://open.feishu.cn/open-apis"
-        self.access_token = None
+        self.api_base_url = DEFAULT_API_BASE_URL
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
 
-        # 如果没有提供凭据，尝试从配置文件加载
+        # 如果没有提供凭据，尝试从配置文件加载（只补充未显式传入的参数）
         if not self.app_id or not self.app_secret:
             self._load_config()
+        if self.pool_size is None:
+            self.pool_size = DEFAULT_POOL_SIZE
+        if self.timeout is None:
+            self.timeout = DEFAULT_TIMEOUT
+
+        # 限速函数按线程保存（见 rate_limit），不影响其他线程上的请求
+        self._local = threading.local()
+
+        # 相对路径相对插件根目录（与 CACHE_DIR、LOG_FILE 一致），不随工作目录变化
+        token_cache_file = token_cache_file or os.getenv("FEISHU_TOKEN_CACHE") or None
+        if token_cache_file:
+            token_cache_file = get_plugin_root() / token_cache_file
+
+        self.session = self._create_session()
+        self.tokens = TokenCache(
+            self._fetch_token,
+            key=f"{self.api_base_url}#{self.app_id}",
+            cache_file=token_cache_file
+        )
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """当前缓存的访问令牌"""
+        return self.tokens.token
+
+    def _create_session(self) -> requests.Session:
+        """创建带连接池和重试策略的会话"""
+        retry_options = {
+            "total": self.max_retries,
+            "connect": self.max_retries,
+            "read": self.max_retries,
+            "status": self.max_retries,
+            "backoff_factor": 0.5,
+            "status_forcelist": RETRY_STATUS_CODES,
+            "respect_retry_after_header": True,
+            "raise_on_status": False,
+        }
+        try:
+            retry = Retry(allowed_methods=frozenset(["GET", "POST"]), **retry_options)
+        except TypeError:
+            # urllib3 < 1.26
+            retry = Retry(method_whitelist=frozenset(["GET", "POST"]), **retry_options)
+
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Content-Type": "application/json"})
+        return session
+
+    def close(self) -> None:
+        """停止令牌刷新，关闭会话和连接池"""
+        self.tokens.close()
+        self.session.close()
+
+    def __enter__(self) -> "FeishuClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def _load_config(self) -> None:
-        """从配置文件加载凭据"""
+        """从配置文件加载凭据，以及构造时未指定的连接池大小和超时"""
         try:
             plugin_root = get_plugin_root()
             config_path = plugin_root / "config" / "feishu_config.json"
@@ -42,6 +148,10 @@ class FeishuClient:
                     self.app_id = config.get("app_id")
                     self.app_secret = config.get("app_secret")
                     self.api_base_url = config.get("api_base_url", self.api_base_url)
+                    if self.pool_size is None:
+                        self.pool_size = config.get("pool_size")
+                    if self.timeout is None and config.get("timeout") is not None:
+                        self.timeout = _parse_timeout(config["timeout"])
                     logging.info("已加载飞书配置")
             else:
                 logging.warning("飞书配置文件不存在")
@@ -50,7 +160,7 @@ class FeishuClient:
 
     def authenticate(self) -> str:
         """
-        获取访问令牌
+        从服务端获取新的访问令牌
 
         Returns:
             str: 访问令牌
@@ -58,6 +168,26 @@ class FeishuClient:
         Raises:
             Exception: 认证失败
         """
+        token = self.tokens.refresh()
+        logging.info("飞书认证成功")
+        return token
+
+    def get_access_token(self) -> str:
+        """
+        获取有效的访问令牌（优先使用缓存）
+
+        Returns:
+            str: 访问令牌
+        """
+        return self.tokens.get()
+
+    def _fetch_token(self) -> Tuple[str, int]:
+        """
+        请求 tenant_access_token
+
+        Returns:
+            Tuple[str, int]: (令牌, 有效期秒数)
+        """
         if not self.app_id or not self.app_secret:
             raise ValueError("缺少飞书应用凭据")
 
@@ -68,21 +198,85 @@ class FeishuClient:
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            self._wait_rate_limit()
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
 
             data = response.json()
             if data.get("code") != 0:
                 raise Exception(f"认证失败: {data.get('msg')}")
 
-            self.access_token = data.get("tenant_access_token")
-            logging.info("飞书认证成功")
-            return self.access_token
+            return data.get("tenant_access_token"), int(data.get("expire", 7200))
 
         except requests.exceptions.RequestException as e:
             logging.error(f"飞书认证请求失败: {e}")
             raise Exception(f"飞书认证失败: {e}")
 
+    @contextmanager
+    def rate_limit(self, limiter: Callable[[], None]) -> Iterator[None]:
+        """
+        在当前线程内，每个HTTP请求之前调用 limiter（例如令牌桶的 wait）
+
+        只作用于调用线程，同一客户端上其他线程的请求不受影响；可以嵌套，退出时恢复之前的限速函数。
+
+        Args:
+            limiter: 限速函数，阻塞到允许发出请求为止
+        """
+        previous = getattr(self._local, "rate_limiter", None)
+        self._local.rate_limiter = limiter
+        try:
+            yield
+        finally:
+            self._local.rate_limiter = previous
+
+    def _wait_rate_limit(self) -> None:
+        """调用当前线程的限速函数（未设置时不限速）"""
+        limiter = getattr(self._local, "rate_limiter", None)
+        if limiter is not None:
+            limiter()
+
+    def _api_get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        """
+        带访问令牌的GET请求
+
+        令牌被服务端判定为无效时（例如在其他地方被刷新），作废缓存并重试一次。
+
+        Args:
+            path: API路径（相对 api_base_url）
+            params: 查询参数
+
+        Returns:
+            Dict: 响应JSON
+
+        Raises:
+            requests.exceptions.RequestException: 请求失败
+        """
+        url = f"{self.api_base_url}{path}"
+        for attempt in range(2):
+            token = self.get_access_token()
+            self._wait_rate_limit()
+            response = self.session.get(
+                url,
+                params=params,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self.timeout
+            )
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+
+            if attempt == 0 and data and data.get("code") in TOKEN_INVALID_CODES:
+                logging.info("飞书访问令牌已失效，重新获取")
+                self.tokens.invalidate(token)
+                continue
+
+            response.raise_for_status()
+            if data is None:
+                raise requests.exceptions.InvalidJSONError(f"响应不是JSON: {url}")
+            return data
+
     def get_document(self, document_id: str) -> Dict:
         """
         获取飞书文档内容
@@ -96,21 +290,8 @@ class FeishuClient:
         Raises:
             Exception: 获取文档失败
         """
-        # 确保已认证
-        if not self.access_token:
-            self.authenticate()
-
-        url = f"{self.api_base_url}/docx/v1/documents/{document_id}/raw_content"
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
-
         try:
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._api_get(f"/docx/v1/documents/{document_id}/raw_content")
             if data.get("code") != 0:
                 raise Exception(f"获取文档失败: {data.get('msg')}")
 
@@ -121,6 +302,157 @@ class FeishuClient:
             logging.error(f"获取飞书文档请求失败: {e}")
             raise Exception(f"获取飞书文档失败: {e}")
 
+    def get_document_info(self, document_id: str) -> Dict:
+        """
+        获取文档基本信息（不含内容）
+
+        Args:
+            document_id: 文档ID
+
+        Returns:
+            Dict: 文档信息，包含 document_id、revision_id 和 title
+
+        Raises:
+            Exception: 获取文档信息失败
+        """
+        try:
+            data = self._api_get(f"/docx/v1/documents/{document_id}")
+            if data.get("code") != 0:
+                raise Exception(f"获取文档信息失败: {data.get('msg')}")
+            return data.get("data", {}).get("document", {})
+
+        except requests.exceptions.RequestException as e:
+            logging.error(f"获取飞书文档信息请求失败: {e}")
+            raise Exception(f"获取飞书文档信息失败: {e}")
+
+    def iter_document_blocks(self, document_id: str, page_size: int = 500) -> Iterator[Dict]:
+        """
+        分页获取文档的全部块（按文档顺序）
+
+        Args:
+            document_id: 文档ID
+            page_size: 每页块数（最大500）
+
+        Yields:
+            Dict: 文档块
+
+        Raises:
+            Exception: 获取文档失败
+        """
+        params = {"page_size": page_size, "document_revision_id": -1}
+        path = f"/docx/v1/documents/{document_id}/blocks"
+        pages = 0
+        try:
+            while True:
+                data = self._api_get(path, params=params)
+                if data.get("code") != 0:
+                    raise Exception(f"获取文档块失败: {data.get('msg')}")
+
+                page = data.get("data", {})
+                pages += 1
+                yield from page.get("items", [])
+
+                if not page.get("has_more") or not page.get("page_token"):
+                    break
+                params["page_token"] = page["page_token"]
+
+        except requests.exceptions.RequestException as e:
+            logging.error(f"获取飞书文档块请求失败: {e}")
+            raise Exception(f"获取飞书文档失败: {e}")
+
+        logging.info(f"成功获取飞书文档块: {document_id}（{pages}页）")
+
+    def get_document_blocks(self, document_id: str) -> List[Dict]:
+        """
+        获取文档的全部块
+
+        Args:
+            document_id: 文档ID
+
+        Returns:
+            List[Dict]: 文档块
+        """
+        return list(self.iter_document_blocks(document_id))
+
+    def fetch_markdown(self, document_id: str) -> str:
+        """
+        获取文档并转换为Markdown（保留标题层级、嵌套列表、表格等结构）
+
+        Args:
+            document_id: 文档ID
+
+        Returns:
+            str: Markdown内容
+        """
+        return "".join(self.iter_markdown(document_id))
+
+    def iter_markdown(self, document_id: str, chunk_size: int = 64 * 1024) -> Iterator[str]:
+        """
+        流式获取文档的Markdown
+
+        边分页获取边转换，已转换的块不再保留，大文档也只占用一页块的内存。
+
+        Args:
+            document_id: 文档ID
+            chunk_size: 每段的大约字符数
+
+        Yields:
+            str: Markdown片段
+        """
+        return iter_markdown(self.iter_document_blocks(document_id), chunk_size)
+
+    def write_markdown(self, document_id: str, fp: IO[str]) -> int:
+        """
+        获取文档并把Markdown直接写入文件对象
+
+        写入文件后可以交给 PRDValidator.validate_file() 校验，
+        无需在内存中拼出整个文档。
+
+        Args:
+            document_id: 文档ID
+            fp: 文本文件对象
+
+        Returns:
+            int: 写入的字符数
+        """
+        return write_markdown(self.iter_document_blocks(document_id), fp)
+
+    def import_many(
+        self,
+        urls: Iterable[str],
+        concurrency: int = 8,
+        qps: float = 5.0,
+        failures: Optional[Dict[str, Exception]] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        并发导入多个飞书文档
+
+        在独立的事件循环中运行 import_many_async()，按完成顺序逐个产出结果。
+        已经在 asyncio 中运行的代码请直接使用 lib.feishu_import.import_many_async。
+
+        Args:
+            urls: 文档URL或文档ID
+            concurrency: 最大并发请求数
+            qps: 每秒最大请求数
+            failures: 传入字典时，失败的文档记录到其中并跳过
+
+        Yields:
+            Tuple[str, str]: (文档ID, Markdown内容)
+        """
+        from .feishu_import import import_many_async
+
+        loop = asyncio.new_event_loop()
+        results = import_many_async(self, urls, concurrency=concurrency, qps=qps, failures=failures)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.close()
+
     def parse_document(self, document_data: Dict) -> str:
         """
         解析飞书文档为Markdown格式
@@ -132,6 +464,10 @@ class FeishuClient:
             str: Markdown格式的文档内容
         """
         try:
+            # 块接口返回的 items
+            if "items" in document_data:
+                return self._parse_blocks(document_data["items"])
+
             # 获取文档内容
             content = document_data.get("content", "")
 
@@ -162,63 +498,7 @@ class FeishuClient:
         """
         if not blocks:
             return ""
-
-        markdown_lines = []
-
-        for block in blocks:
-            block_type = block.get("block_type")
-
-            if block_type == "heading1":
-                text = self._extract_text(block)
-                markdown_lines.append(f"# {text}\n")
-            elif block_type == "heading2":
-                text = self._extract_text(block)
-                markdown_lines.append(f"## {text}\n")
-            elif block_type == "heading3":
-                text = self._extract_text(block)
-                markdown_lines.append(f"### {text}\n")
-            elif block_type == "text":
-                text = self._extract_text(block)
-                markdown_lines.append(f"{text}\n")
-            elif block_type == "bullet":
-                text = self._extract_text(block)
-                markdown_lines.append(f"- {text}\n")
-            elif block_type == "ordered":
-                text = self._extract_text(block)
-                markdown_lines.append(f"1. {text}\n")
-            elif block_type == "code":
-                text = self._extract_text(block)
-                language = block.get("code", {}).get("language", "")
-                markdown_lines.append(f"```{language}\n{text}\n```\n")
-            elif block_type == "quote":
-                text = self._extract_text(block)
-                markdown_lines.append(f"> {text}\n")
-
-        return "\n".join(markdown_lines)
-
-    def _extract_text(self, block: Dict) -> str:
-        """
-        从块中提取文本
-
-        Args:
-            block: 文档块
-
-        Returns:
-            str: 文本内容
-        """
-        # 根据飞书API返回的实际结构提取文本
-        # 这里提供基础实现
-        text_elements = block.get("text", {}).get("elements", [])
-
-        if not text_elements:
-            return ""
-
-        texts = []
-        for element in text_elements:
-            if "text_run" in element:
-                texts.append(element["text_run"].get("content", ""))
-
-        return "".join(texts)
+        return convert_blocks(blocks)
 
     def extract_document_id(self, url: str) -> str:
         """
@@ -288,10 +568,17 @@ class FeishuClient:
         config = {
             "app_id": app_id,
             "app_secret": app_secret,
-            "api_base_url": api_base_url or "https://open.feishu.cn/open-apis"
+            "api_base_url": api_base_url or DEFAULT_API_BASE_URL
         }
 
         with open(config_path, "w", encoding="utf-8") as f:
             json.dump(config, f, indent=2, ensure_ascii=False)
 
         logging.info(f"飞书配置已保存: {config_path}")
+
+
+def _parse_timeout(value) -> Union[float, Tuple[float, float]]:
+    """配置文件中的超时可以是数字或 [连接超时, 读取超时]"""
+    if isinstance(value, (list, tuple)):
+        return (float(value[0]), float(value[1]))
+    return float(value)
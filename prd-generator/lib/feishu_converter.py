@@ -0,0 +1,609 @@
+"""
+Feishu Converter - 飞书文档块转换为Markdown
+"""
+
+import json
+import hashlib
+import logging
+from urllib.parse import unquote
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# 渲染逻辑的版本，修改任何块的Markdown输出时递增，使持久化的渲染缓存失效
+CONVERTER_VERSION = "1"
+
+# 飞书 docx 块类型（block_type 为整数）
+BLOCK_TYPES = {
+    1: "page",
+    2: "text",
+    3: "heading1",
+    4: "heading2",
+    5: "heading3",
+    6: "heading4",
+    7: "heading5",
+    8: "heading6",
+    9: "heading7",
+    10: "heading8",
+    11: "heading9",
+    12: "bullet",
+    13: "ordered",
+    14: "code",
+    15: "quote",
+    17: "todo",
+    19: "callout",
+    22: "divider",
+    23: "file",
+    24: "grid",
+    25: "grid_column",
+    27: "image",
+    31: "table",
+    32: "table_cell",
+    34: "quote_container",
+}
+
+# 代码块语言（code.style.language）
+CODE_LANGUAGES = {
+    7: "bash", 8: "csharp", 9: "cpp", 10: "c", 12: "css", 18: "dockerfile",
+    22: "go", 24: "html", 26: "http", 28: "json", 29: "java", 30: "javascript",
+    32: "kotlin", 36: "lua", 38: "makefile", 39: "markdown", 40: "nginx",
+    43: "php", 44: "perl", 48: "protobuf", 49: "python", 50: "r", 52: "ruby",
+    53: "rust", 55: "scss", 56: "sql", 57: "scala", 60: "shell", 61: "swift",
+    63: "typescript", 66: "xml", 67: "yaml",
+}
+
+LIST_TYPES = ("bullet", "ordered", "todo")
+
+# 列表项子块的缩进
+LIST_INDENT = "    "
+
+
+def block_type_name(block: Dict) -> str:
+    """块类型名称（兼容旧格式中直接使用字符串的 block_type）"""
+    block_type = block.get("block_type")
+    if isinstance(block_type, int):
+        return BLOCK_TYPES.get(block_type, f"unknown_{block_type}")
+    return block_type or ""
+
+
+def block_payload(block: Dict) -> Dict:
+    """块的内容字段（字段名与类型名相同，例如 block["heading1"]；旧格式统一为 block["text"]）"""
+    payload = block.get(block_type_name(block)) or {}
+    if "elements" not in payload and isinstance(block.get("text"), dict):
+        payload = dict(block["text"], **payload)
+    return payload
+
+
+def render_inline(payload: Dict) -> str:
+    """
+    渲染行内元素
+
+    支持粗体、斜体、删除线、下划线、行内代码、链接、公式、@文档和@用户。
+
+    Args:
+        payload: 块的内容字段（包含 elements）
+
+    Returns:
+        str: Markdown文本
+    """
+    parts = []
+    for element in payload.get("elements", []):
+        if "text_run" in element:
+            run = element["text_run"]
+            parts.append(_style_text(run.get("content", ""), run.get("text_element_style") or {}))
+        elif "mention_doc" in element:
+            doc = element["mention_doc"]
+            parts.append(f"[{doc.get('title', '')}]({unquote(doc.get('url', ''))})")
+        elif "mention_user" in element:
+            parts.append(f"@{element['mention_user'].get('user_id', '')}")
+        elif "equation" in element:
+            parts.append(f"${element['equation'].get('content', '').strip()}$")
+    return "".join(parts)
+
+
+def _style_text(content: str, style: Dict) -> str:
+    """给文本加上行内样式（空白文本不加标记）"""
+    if not content.strip():
+        return content
+
+    # 标记放在首尾空白之内，否则 Markdown 不识别
+    stripped = content.strip()
+    lead = content[:len(content) - len(content.lstrip())]
+    trail = content[len(content.rstrip()):]
+
+    text = stripped
+    if style.get("inline_code"):
+        text = f"`{text}`"
+    if style.get("bold"):
+        text = f"**{text}**"
+    if style.get("italic"):
+        text = f"*{text}*"
+    if style.get("strikethrough"):
+        text = f"~~{text}~~"
+    if style.get("underline"):
+        text = f"<u>{text}</u>"
+    link = style.get("link")
+    if link and link.get("url"):
+        text = f"[{text}]({unquote(link['url'])})"
+    return f"{lead}{text}{trail}"
+
+
+class _Frame:
+    """遍历中的一层兄弟块"""
+
+    __slots__ = ("children", "index", "prefix", "previous", "ordinal")
+
+    def __init__(self, children: List[str], prefix: str):
+        self.children = children
+        self.index = 0
+        self.prefix = prefix
+        self.previous: Optional[str] = None
+        self.ordinal = 0
+
+
+class MarkdownConverter:
+    """
+    飞书文档块树转换器
+
+    按文档顺序遍历块树；遍历用显式栈实现，嵌套深度不受递归限制。每种块
+    由 RENDERERS 分发表中的函数渲染，返回 (块本身的行, 子块的行前缀)：
+    行为 None 时跳过整个块；子块前缀为 None 时不展开子块（已由渲染函数
+    处理，例如表格）。
+    """
+
+    def __init__(self, blocks: Iterable[Dict]):
+        """
+        初始化转换器
+
+        Args:
+            blocks: 文档的全部块（/docx/v1/documents/{id}/blocks 的 items），
+                也接受没有 block_id 的旧格式平铺列表
+        """
+        self.blocks: Dict[str, Dict] = {}
+        self.roots: List[str] = []
+
+        for index, block in enumerate(blocks):
+            block_id = block.get("block_id") or f"_{index}"
+            self.blocks[block_id] = block
+            parent_id = block.get("parent_id")
+            if not parent_id or parent_id not in self.blocks:
+                self.roots.append(block_id)
+
+    def convert(self) -> str:
+        """
+        转换为Markdown
+
+        Returns:
+            str: Markdown文本
+        """
+        return "".join(self.iter_lines())
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        逐行产出Markdown（每行以换行符结尾）
+
+        Yields:
+            str: Markdown行
+        """
+        stack = [_Frame(self.roots, "")]
+        while stack:
+            frame = stack[-1]
+            if frame.index >= len(frame.children):
+                stack.pop()
+                continue
+
+            block = self.blocks.get(frame.children[frame.index])
+            frame.index += 1
+            if block is None:
+                continue
+
+            lines, child_prefix, previous = self._render(block, frame)
+            yield from lines
+            if child_prefix is not None:
+                self._push_children(stack, block, child_prefix, previous)
+
+    def _render(self, block: Dict, frame: _Frame) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """
+        渲染一个块
+
+        Args:
+            block: 块
+            frame: 块所在的一层兄弟块
+
+        Returns:
+            Tuple: (输出的行, 子块的行前缀, 子块之前的块类型)；行前缀为 None 时不展开子块
+        """
+        kind = block_type_name(block)
+        renderer = RENDERERS.get(kind)
+        if renderer is None:
+            if not kind.startswith("unknown_"):
+                logging.debug(f"跳过不支持的飞书块: {kind}")
+            # 未知的容器块直接展开其子块
+            return [], frame.prefix, None
+
+        if kind == "ordered":
+            frame.ordinal = _ordinal(block_payload(block), frame.ordinal if frame.previous == "ordered" else 0)
+
+        lines, child_prefix = renderer(self, block, frame)
+        if lines is None:
+            return [], None, None
+
+        output = []
+        # 段落之间空一行；同一层相邻的列表项保持紧凑
+        if frame.previous is not None and not (frame.previous in LIST_TYPES and kind in LIST_TYPES):
+            output.append(frame.prefix.rstrip() + "\n")
+        frame.previous = kind
+
+        for line in lines:
+            output.append(f"{frame.prefix}{line}\n" if line else frame.prefix.rstrip() + "\n")
+
+        if child_prefix is None:
+            return output, None, None
+        # 列表项和引用的子块紧跟在后面，其他块的子块与之空一行
+        return output, frame.prefix + child_prefix, (kind if lines and not child_prefix else None)
+
+    def _push_children(
+        self,
+        stack: List[_Frame],
+        block: Dict,
+        prefix: str,
+        previous: Optional[str] = None
+    ) -> None:
+        children = block.get("children") or []
+        if children:
+            child_frame = _Frame(children, prefix)
+            child_frame.previous = previous
+            stack.append(child_frame)
+
+    def children_text(self, block: Dict) -> str:
+        """
+        块所有后代中的行内文本（用于表格单元格），以 <br> 连接
+
+        Args:
+            block: 块
+
+        Returns:
+            str: 单行文本
+        """
+        texts = []
+        pending = list(reversed(block.get("children") or []))
+        while pending:
+            child = self.blocks.get(pending.pop())
+            if child is None:
+                continue
+            text = render_inline(block_payload(child))
+            if text:
+                texts.append(text)
+            pending.extend(reversed(child.get("children") or []))
+        return "<br>".join(texts).replace("|", "\\|").replace("\n", "<br>")
+
+
+class StreamingConverter(MarkdownConverter):
+    """
+    流式转换器
+
+    要求块按文档顺序（先序）到达，这正是块接口分页返回的顺序：每个块到达
+    时立即渲染，只保留从根到当前块的祖先栈，不需要先拿到整个文档。表格要
+    等到单元格全部到达后才能渲染，因此只缓存当前表格的子树。
+
+    父块不在祖先栈中的块（顺序不符合要求的输入）按顶层块处理；
+    顺序不确定时请使用 MarkdownConverter。
+    """
+
+    # 需要完整子树才能渲染的块
+    SUBTREE_KINDS = frozenset(["table"])
+
+    def __init__(self, blocks: Iterable[Dict]):
+        """
+        初始化转换器
+
+        Args:
+            blocks: 按文档顺序排列的块（可以是迭代器，例如分页获取的结果）
+        """
+        self.source = blocks
+        self.blocks: Dict[str, Dict] = {}
+        self.roots: List[str] = []
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        逐行产出Markdown（每行以换行符结尾）
+
+        Yields:
+            str: Markdown行
+        """
+        # 祖先栈：(块ID, 子块所在的层)，栈底是顶层块
+        stack: List[Tuple[str, _Frame]] = [("", _Frame([], ""))]
+        open_ids = {""}
+        skipped = set()
+        subtree: Optional[Tuple[Dict, _Frame]] = None
+        orphans = 0
+
+        for index, block in enumerate(self.source):
+            block_id = block.get("block_id") or f"_{index}"
+            parent_id = block.get("parent_id") or ""
+
+            if subtree is not None:
+                if parent_id in self.blocks:
+                    self.blocks[block_id] = block
+                    continue
+                yield from self._flush(subtree)
+                subtree = None
+
+            if parent_id in skipped:
+                skipped.add(block_id)
+                continue
+            if parent_id not in open_ids:
+                orphans += 1
+                parent_id = ""
+            while stack[-1][0] != parent_id:
+                open_ids.discard(stack.pop()[0])
+            frame = stack[-1][1]
+
+            if block_type_name(block) in self.SUBTREE_KINDS:
+                self.blocks = {block_id: block}
+                subtree = (block, frame)
+                continue
+
+            lines, child_prefix, previous = self._render(block, frame)
+            yield from lines
+            if child_prefix is None:
+                skipped.add(block_id)
+            elif block.get("children"):
+                child_frame = _Frame([], child_prefix)
+                child_frame.previous = previous
+                stack.append((block_id, child_frame))
+                open_ids.add(block_id)
+
+        if subtree is not None:
+            yield from self._flush(subtree)
+        if orphans:
+            logging.debug(f"{orphans} 个飞书块的父块不在当前路径上，已按顶层块输出")
+
+    def _flush(self, subtree: Tuple[Dict, _Frame]) -> Iterator[str]:
+        """渲染缓存的子树（其子块已由渲染函数处理）"""
+        block, frame = subtree
+        lines, _, _ = self._render(block, frame)
+        self.blocks = {}
+        return iter(lines)
+
+
+class IncrementalConverter(StreamingConverter):
+    """
+    带渲染缓存的流式转换器
+
+    每个块按内容计算摘要（表格包含整个子树），渲染结果以
+    (摘要, 行前缀, 前一个块的类型, 列表编号) 为键缓存。再次转换同一文档时，
+    内容和上下文都没变的块直接复用上次的结果，只重新渲染变化的块。
+    持久化缓存时需要同时记录 CONVERTER_VERSION，版本不同的缓存不能复用。
+    """
+
+    def __init__(self, blocks: Iterable[Dict], cache: Optional[Dict[str, list]] = None):
+        """
+        初始化转换器
+
+        Args:
+            blocks: 按文档顺序排列的块
+            cache: 上次转换后的 cache 属性，None表示全部重新渲染
+        """
+        super().__init__(blocks)
+        self.previous_cache = cache or {}
+        # 本次用到的渲染结果，作为下次转换的缓存
+        self.cache: Dict[str, list] = {}
+        # 块ID -> 内容摘要
+        self.hashes: Dict[str, str] = {}
+        self.rendered = 0
+
+    def _render(self, block: Dict, frame: _Frame) -> Tuple[List[str], Optional[str], Optional[str]]:
+        kind = block_type_name(block)
+        if kind in self.SUBTREE_KINDS:
+            digest = block_digest(list(self.blocks.values()))
+        else:
+            digest = block_digest({k: v for k, v in block.items() if k not in _CONTEXT_FIELDS})
+        if block.get("block_id"):
+            self.hashes[block["block_id"]] = digest
+
+        # 只有有序列表项的渲染结果依赖编号
+        ordinal = frame.ordinal if kind == "ordered" else ""
+        key = f"{digest}|{frame.prefix}|{frame.previous or ''}|{ordinal}"
+        entry = self.previous_cache.get(key)
+        if entry is None:
+            lines, child_prefix, previous = super()._render(block, frame)
+            entry = [lines, child_prefix, previous, frame.previous, frame.ordinal]
+            self.rendered += 1
+
+        self.cache[key] = entry
+        lines, child_prefix, previous, frame.previous, ordinal = entry
+        if kind == "ordered":
+            frame.ordinal = ordinal
+        return lines, child_prefix, previous
+
+
+# 不影响块本身渲染结果的字段
+_CONTEXT_FIELDS = ("block_id", "parent_id", "children")
+
+
+def block_digest(value) -> str:
+    """
+    块内容的摘要
+
+    Args:
+        value: 块或块列表（可JSON序列化）
+
+    Returns:
+        str: 16位十六进制摘要
+    """
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _ordinal(payload: Dict, previous: int) -> int:
+    """有序列表编号：显式的 sequence 优先，否则在上一项的基础上递增"""
+    sequence = (payload.get("style") or {}).get("sequence")
+    if sequence and str(sequence).isdigit():
+        return int(sequence)
+    return previous + 1
+
+
+# ---- 渲染函数：返回 (行列表, 子块前缀) ----
+
+Rendered = Tuple[Optional[List[str]], Optional[str]]
+
+
+def _render_page(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    title = render_inline(block_payload(block))
+    return ([f"# {title}"] if title else []), ""
+
+
+def _render_heading(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    level = int(block_type_name(block)[len("heading"):])
+    return [f"{'#' * min(level, 6)} {render_inline(block_payload(block))}"], ""
+
+
+def _render_text(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    text = render_inline(block_payload(block))
+    return text.split("\n"), ""
+
+
+def _render_bullet(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    lines = render_inline(block_payload(block)).split("\n")
+    return ["- " + lines[0]] + [LIST_INDENT + line for line in lines[1:]], LIST_INDENT
+
+
+def _render_ordered(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    lines = render_inline(block_payload(block)).split("\n")
+    return [f"{frame.ordinal}. " + lines[0]] + [LIST_INDENT + line for line in lines[1:]], LIST_INDENT
+
+
+def _render_todo(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    payload = block_payload(block)
+    mark = "x" if (payload.get("style") or {}).get("done") else " "
+    lines = render_inline(payload).split("\n")
+    return [f"- [{mark}] " + lines[0]] + [LIST_INDENT + line for line in lines[1:]], LIST_INDENT
+
+
+def _render_code(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    payload = block_payload(block)
+    language = (payload.get("style") or {}).get("language", payload.get("language", ""))
+    if isinstance(language, int):
+        language = CODE_LANGUAGES.get(language, "")
+    content = "".join(
+        element.get("text_run", {}).get("content", "") for element in payload.get("elements", [])
+    )
+    return [f"```{language}"] + content.rstrip("\n").split("\n") + ["```"], None
+
+
+def _render_quote(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    return ["> " + line for line in render_inline(block_payload(block)).split("\n")], "> "
+
+
+def _render_container(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    """引用容器和高亮块：子块作为引用输出"""
+    emoji = block_payload(block).get("emoji_id")
+    return ([f"> :{emoji}:"] if emoji else []), "> "
+
+
+def _render_divider(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    return ["---"], None
+
+
+def _render_image(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    token = block_payload(block).get("token", "")
+    return [f"![image]({token})"], None
+
+
+def _render_file(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    payload = block_payload(block)
+    return [f"[{payload.get('name', 'file')}]({payload.get('token', '')})"], None
+
+
+def _render_table(converter: MarkdownConverter, block: Dict, frame: _Frame) -> Rendered:
+    payload = block_payload(block)
+    columns = (payload.get("property") or {}).get("column_size") or 1
+    cells = payload.get("cells") or block.get("children") or []
+
+    rows = []
+    for start in range(0, len(cells), columns):
+        row = []
+        for cell_id in cells[start:start + columns]:
+            cell = converter.blocks.get(cell_id)
+            row.append(converter.children_text(cell) if cell else "")
+        row.extend([""] * (columns - len(row)))
+        rows.append("| " + " | ".join(row) + " |")
+
+    if not rows:
+        return None, None
+    separator = "| " + " | ".join(["---"] * columns) + " |"
+    return [rows[0], separator] + rows[1:], None
+
+
+RENDERERS: Dict[str, Callable[[MarkdownConverter, Dict, _Frame], Rendered]] = {
+    "page": _render_page,
+    "text": _render_text,
+    "bullet": _render_bullet,
+    "ordered": _render_ordered,
+    "todo": _render_todo,
+    "code": _render_code,
+    "quote": _render_quote,
+    "callout": _render_container,
+    "quote_container": _render_container,
+    "divider": _render_divider,
+    "image": _render_image,
+    "file": _render_file,
+    "table": _render_table,
+}
+RENDERERS.update({f"heading{level}": _render_heading for level in range(1, 10)})
+
+
+def convert_blocks(blocks: Iterable[Dict]) -> str:
+    """
+    把飞书文档块转换为Markdown
+
+    Args:
+        blocks: 文档块
+
+    Returns:
+        str: Markdown文本
+    """
+    return MarkdownConverter(blocks).convert()
+
+
+def iter_markdown(blocks: Iterable[Dict], chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    流式转换：按文档顺序逐块转换，分段产出Markdown
+
+    Args:
+        blocks: 按文档顺序排列的块（可以是迭代器）
+        chunk_size: 每段的大约字符数
+
+    Yields:
+        str: Markdown片段，拼接后与 convert_blocks() 的结果相同
+    """
+    buffer: List[str] = []
+    size = 0
+    for line in StreamingConverter(blocks).iter_lines():
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def write_markdown(blocks: Iterable[Dict], fp: IO[str], chunk_size: int = 64 * 1024) -> int:
+    """
+    流式转换并写入文件对象
+
+    Args:
+        blocks: 按文档顺序排列的块（可以是迭代器）
+        fp: 文本文件对象
+        chunk_size: 每次写入的大约字符数
+
+    Returns:
+        int: 写入的字符数
+    """
+    written = 0
+    for chunk in iter_markdown(blocks, chunk_size):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
@@ -0,0 +1,162 @@
+"""
+Feishu Import - 飞书文档批量导入
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+from .feishu_converter import convert_blocks
+
+
+# 去重时记住的最近文档ID数，长输入流中内存占用保持稳定
+DEDUPE_WINDOW = 10000
+
+
+class TokenBucket:
+    """
+    令牌桶限流器（线程安全，可在 asyncio 和线程中使用）
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个，允许短时突发。
+    令牌不足时预约下一个令牌（余额记为负数），按预约顺序等待。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初始化限流器
+
+        Args:
+            rate: 每秒请求数
+            capacity: 桶容量（允许的突发请求数），默认等于 rate
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """取走一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        """获取一个令牌，不足时等待"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait(self) -> None:
+        """获取一个令牌，不足时阻塞当前线程"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+async def import_many_async(
+    client,
+    urls: Iterable[str],
+    concurrency: int = 8,
+    qps: float = 5.0,
+    failures: Optional[Dict[str, Exception]] = None
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    并发导入飞书文档
+
+    最多 concurrency 个文档同时获取，并由令牌桶把请求速率限制在 qps 以内
+    （飞书文档接口的默认频率限制为每秒5次）。令牌按HTTP请求计：多页文档的
+    每一页和获取访问令牌的请求各占一个。
+    请求在线程池中通过客户端的连接池发出，文档块按完成顺序转换为
+    Markdown 并逐个产出；同时在途的任务数有上限，
+    输入很长时内存占用也保持稳定。重复的文档ID只获取一次
+    （只在最近 DEDUPE_WINDOW 个不同的文档ID内去重）。
+
+    Args:
+        client: FeishuClient 实例
+        urls: 文档URL或文档ID
+        concurrency: 最大并发请求数
+        qps: 每秒最大请求数
+        failures: 传入字典时，失败的文档记录到其中（文档ID或无法识别的URL -> 异常）并跳过；
+            不传时遇到第一个失败即抛出异常
+
+    Yields:
+        Tuple[str, str]: (文档ID, Markdown内容)
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    bucket = TokenBucket(qps)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    def limited(func, *args):
+        # 在工作线程中调用，限速只作用于本次调用发出的请求，不修改共享的客户端
+        with client.rate_limit(bucket.wait):
+            return func(*args)
+
+    if client.pool_size < concurrency:
+        logging.warning(f"连接池大小({client.pool_size})小于并发数({concurrency})，多余的连接不会被复用")
+
+    async def fetch(doc_id: str):
+        try:
+            async with semaphore:
+                blocks = await loop.run_in_executor(executor, limited, client.get_document_blocks, doc_id)
+            markdown = await loop.run_in_executor(executor, convert_blocks, blocks)
+            return doc_id, markdown, None
+        except Exception as e:
+            return doc_id, None, e
+
+    url_iter = iter(urls)
+    seen: "OrderedDict[str, None]" = OrderedDict()
+    pending = set()
+
+    def fill() -> None:
+        # 排队的任务数保持在并发数的两倍以内
+        while len(pending) < concurrency * 2:
+            url = next(url_iter, None)
+            if url is None:
+                return
+            try:
+                doc_id = client.extract_document_id(url.strip())
+            except ValueError as e:
+                if failures is None:
+                    raise
+                failures[url] = e
+                continue
+            if doc_id in seen:
+                seen.move_to_end(doc_id)
+                continue
+            seen[doc_id] = None
+            if len(seen) > DEDUPE_WINDOW:
+                seen.popitem(last=False)
+            pending.add(asyncio.ensure_future(fetch(doc_id)))
+
+    try:
+        # 先取得令牌，避免并发请求同时认证
+        await loop.run_in_executor(executor, limited, client.get_access_token)
+
+        fill()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                doc_id, markdown, error = task.result()
+                if error is not None:
+                    if failures is None:
+                        raise error
+                    logging.warning(f"导入飞书文档失败: {doc_id}, 错误: {error}")
+                    failures[doc_id] = error
+                    continue
+                yield doc_id, markdown
+            fill()
+    finally:
+        for task in pending:
+            task.cancel()
+        executor.shutdown(wait=False)
+
@@ -0,0 +1,178 @@
+"""
+Feishu Sync - 飞书文档增量同步
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+from .utils import write_atomic
+from .file_lock import FileLock
+from .blob_store import BlobStore
+from .version_manager import VersionManager
+from .feishu_converter import IncrementalConverter, CONVERTER_VERSION
+
+
+class FeishuSync:
+    """
+    飞书文档增量同步
+
+    每个文档的同步状态保存在其版本目录中:
+        feishu_sync.json   - 文档的 revision_id、各块的内容摘要和同步到的版本号
+        feishu_render.cache - 上次转换的块渲染结果（按 CONVERTER_VERSION 区分，
+                              转换逻辑更新后旧缓存作废）
+
+    同步时先只获取文档信息：revision_id 没有变化就直接跳过，不下载文档内容。
+    有变化时分页获取文档块，只重新渲染内容变化的块；转换出的Markdown与
+    最新版本不同时才通过 VersionManager.create_version 创建新版本。
+    """
+
+    STATE_FILE = "feishu_sync.json"
+    RENDER_CACHE_FILE = "feishu_render.cache"
+
+    def __init__(self, client, author: Optional[str] = None):
+        """
+        初始化同步器
+
+        Args:
+            client: FeishuClient 实例
+            author: 创建版本时记录的作者
+        """
+        self.client = client
+        self.author = author or "Feishu Sync"
+
+    def sync(
+        self,
+        url: str,
+        prd_name: Optional[str] = None,
+        message: Optional[str] = None,
+        force: bool = False
+    ) -> Dict:
+        """
+        同步一个飞书文档
+
+        Args:
+            url: 文档URL或文档ID
+            prd_name: 版本库中的PRD名称，默认使用文档ID
+            message: 版本说明，默认记录文档ID和 revision_id
+            force: 忽略已记录的 revision_id，重新获取文档
+
+        Returns:
+            Dict: 同步结果，status 为 unchanged（revision_id 未变，只获取了文档信息）、
+                identical（文档有修改但Markdown相同）或 updated（创建了新版本）
+        """
+        document_id = self.client.extract_document_id(url.strip())
+        manager = VersionManager(prd_name or document_id)
+        state_file = manager.version_dir / self.STATE_FILE
+        cache_file = manager.version_dir / self.RENDER_CACHE_FILE
+
+        with FileLock(manager.version_dir / ".sync.lock"):
+            state = _load_json(state_file)
+            revision_id = self.client.get_document_info(document_id).get("revision_id")
+            last_version = manager.store.last()
+
+            result = {
+                "document_id": document_id,
+                "revision_id": revision_id,
+                "version": (last_version or {}).get("version"),
+                "changed_blocks": 0,
+                "rendered_blocks": 0
+            }
+
+            if (not force and last_version and revision_id is not None
+                    and state.get("revision_id") == revision_id
+                    and state.get("version") == last_version["version"]):
+                result["status"] = "unchanged"
+                logging.info(f"飞书文档未变化: {document_id}（revision {revision_id}）")
+                return result
+
+            converter = IncrementalConverter(
+                self.client.iter_document_blocks(document_id),
+                cache=_load_render_cache(cache_file)
+            )
+            markdown = converter.convert()
+
+            old_hashes = state.get("blocks") or {}
+            result["changed_blocks"] = sum(
+                1 for block_id, digest in converter.hashes.items() if old_hashes.get(block_id) != digest
+            ) + sum(1 for block_id in old_hashes if block_id not in converter.hashes)
+            result["rendered_blocks"] = converter.rendered
+
+            if last_version and self._same_content(manager, last_version, markdown):
+                result["status"] = "identical"
+            else:
+                result["version"] = manager.create_version(
+                    markdown,
+                    message or f"同步飞书文档 {document_id}（revision {revision_id}）",
+                    author=self.author
+                )
+                result["status"] = "updated"
+
+            state = {
+                "document_id": document_id,
+                "revision_id": revision_id,
+                "version": result["version"],
+                "blocks": converter.hashes
+            }
+            render_cache = {"version": CONVERTER_VERSION, "blocks": converter.cache}
+            write_atomic(cache_file, json.dumps(render_cache, ensure_ascii=False).encode("utf-8"))
+            write_atomic(state_file, json.dumps(state, ensure_ascii=False, indent=2).encode("utf-8"))
+
+        logging.info(
+            f"飞书文档同步完成: {document_id}（{result['status']}，"
+            f"变化 {result['changed_blocks']} 块，重新渲染 {result['rendered_blocks']} 块）"
+        )
+        return result
+
+    def sync_many(
+        self,
+        urls: Iterable[str],
+        force: bool = False,
+        failures: Optional[Dict[str, Exception]] = None
+    ) -> Iterator[Dict]:
+        """
+        逐个同步多个飞书文档（每个文档使用以文档ID命名的版本库）
+
+        Args:
+            urls: 文档URL或文档ID
+            force: 忽略已记录的 revision_id
+            failures: 传入字典时，失败的文档记录到其中（URL -> 异常）并跳过；
+                不传时遇到第一个失败即抛出异常
+
+        Yields:
+            Dict: 每个文档的同步结果
+        """
+        for url in urls:
+            try:
+                yield self.sync(url, force=force)
+            except Exception as e:
+                if failures is None:
+                    raise
+                logging.warning(f"同步飞书文档失败: {url}, 错误: {e}")
+                failures[url] = e
+
+    @staticmethod
+    def _same_content(manager: VersionManager, version_info: Dict, markdown: str) -> bool:
+        """与已有版本的内容比较（有对象哈希时不读取旧内容）"""
+        if "blob" in version_info:
+            return version_info["blob"] == BlobStore.hash_content(markdown)
+        return manager.get_version_content(version_info["version"]) == markdown
+
+
+def _load_render_cache(file_path: Path) -> Dict:
+    """读取块渲染缓存，转换器版本不同（或旧格式）时返回空字典"""
+    cache = _load_json(file_path)
+    if cache.get("version") != CONVERTER_VERSION:
+        if cache:
+            logging.info(f"飞书渲染缓存的转换器版本已变化，重新渲染: {file_path}")
+        return {}
+    return cache.get("blocks") or {}
+
+
+def _load_json(file_path: Path) -> Dict:
+    """读取JSON文件，不存在或损坏时返回空字典"""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
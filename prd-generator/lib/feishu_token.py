@@ -0,0 +1,199 @@
+"""
+Feishu Token - 飞书访问令牌缓存
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+# 令牌无效或过期的错误码，遇到时刷新令牌并重试一次
+TOKEN_INVALID_CODES = frozenset([99991661, 99991663, 99991668])
+
+
+class TokenCache:
+    """
+    访问令牌缓存
+
+    记录令牌的过期时间，在过期前 refresh_margin 秒由后台定时器提前刷新，
+    请求线程通常不会因为令牌过期而等待。可选地把令牌保存到权限为0600的
+    文件中，短时间运行的命令行进程可以直接复用仍然有效的令牌。
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Tuple[str, int]],
+        key: str,
+        cache_file: Optional[Path] = None,
+        refresh_margin: int = 300,
+        auto_refresh: bool = True
+    ):
+        """
+        初始化令牌缓存
+
+        Args:
+            fetch: 获取新令牌的函数，返回 (令牌, 有效期秒数)
+            key: 缓存键（区分不同应用），不包含密钥
+            cache_file: 令牌持久化文件，None表示只缓存在内存中
+            refresh_margin: 提前刷新的时间（秒）
+            auto_refresh: 是否在后台提前刷新
+        """
+        self.fetch = fetch
+        self.key = key
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.refresh_margin = refresh_margin
+        self.auto_refresh = auto_refresh
+
+        self._lock = threading.RLock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+
+        self._load()
+
+    @property
+    def token(self) -> Optional[str]:
+        """当前缓存的令牌（可能已过期）"""
+        return self._token
+
+    @property
+    def expires_at(self) -> float:
+        """令牌过期时间（time.time()）"""
+        return self._expires_at
+
+    def get(self) -> str:
+        """
+        获取有效的令牌，缓存中没有或即将过期时同步刷新
+
+        Returns:
+            str: 访问令牌
+        """
+        token = self._token
+        if token and time.time() < self._refresh_at:
+            return token
+
+        with self._lock:
+            # 等待锁期间可能已被其他线程刷新
+            if self._token and time.time() < self._refresh_at:
+                return self._token
+            return self.refresh()
+
+    def refresh(self) -> str:
+        """
+        立即获取新令牌
+
+        Returns:
+            str: 访问令牌
+        """
+        with self._lock:
+            token, expire = self.fetch()
+            self._set(token, time.time() + expire)
+            self._save()
+            self._schedule()
+            return token
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        作废令牌
+
+        Args:
+            token: 被服务端拒绝的令牌；与当前令牌不同时说明已被其他线程刷新，
+                不再重复作废
+        """
+        with self._lock:
+            if token is not None and token != self._token:
+                return
+            self._token = None
+            self._expires_at = self._refresh_at = 0.0
+            self._save()
+
+    def close(self) -> None:
+        """停止后台刷新"""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _schedule(self) -> None:
+        """安排在过期前 refresh_margin 秒刷新"""
+        if not self.auto_refresh or self._closed:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+
+        delay = max(1.0, self._refresh_at - time.time())
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        """后台刷新；失败时30秒后重试，令牌仍有效期间不影响请求"""
+        try:
+            self.refresh()
+            logging.info("飞书访问令牌已提前刷新")
+        except Exception as e:
+            logging.warning(f"后台刷新飞书访问令牌失败: {e}")
+            with self._lock:
+                if not self._closed:
+                    self._timer = threading.Timer(30, self._background_refresh)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def _load(self) -> None:
+        """从文件加载仍然有效的令牌"""
+        entry = self._read_file().get(self.key)
+        if not entry:
+            return
+        self._set(entry.get("token"), entry.get("expires_at", 0))
+        if self._token and time.time() < self._refresh_at:
+            self._schedule()
+            logging.debug("已复用缓存的飞书访问令牌")
+
+    def _set(self, token: Optional[str], expires_at: float) -> None:
+        """
+        更新令牌
+
+        刷新时间为过期前 refresh_margin 秒；剩余有效期很短时（服务端返回的
+        是即将过期的旧令牌）改为剩余时间的一半，避免每次请求都刷新。
+        """
+        self._token = token
+        self._expires_at = expires_at
+        remaining = expires_at - time.time()
+        self._refresh_at = expires_at - min(self.refresh_margin, remaining / 2)
+
+    def _read_file(self) -> Dict:
+        if self.cache_file is None:
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        """保存令牌（文件权限0600，原子替换）"""
+        if self.cache_file is None:
+            return
+
+        data = self._read_file()
+        if self._token:
+            data[self.key] = {"token": self._token, "expires_at": self._expires_at}
+        else:
+            data.pop(self.key, None)
+
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_name(f".{self.cache_file.name}.{os.getpid()}.tmp")
+            fd = os.open(str(tmp_file), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logging.warning(f"保存飞书访问令牌失败: {e}")
@@ -0,0 +1,193 @@
+"""
+File Lock - 跨进程文件锁与组提交
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 等平台没有 fcntl，退化为进程内锁
+    fcntl = None
+
+
+class FileLock:
+    """
+    基于 fcntl.flock 的排他文件锁
+
+    同一实例可以在同一线程内重入；不同线程、不同进程之间互斥。
+    没有 fcntl 的平台上只保证进程内互斥。
+
+    用法:
+        lock = FileLock(version_dir / ".lock")
+        with lock:
+            ...
+    """
+
+    def __init__(self, path: Path, timeout: Optional[float] = None):
+        """
+        初始化文件锁
+
+        Args:
+            path: 锁文件路径
+            timeout: 获取锁的超时时间（秒），None表示一直等待
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        """
+        获取锁
+
+        Raises:
+            TimeoutError: 超时仍未获取到锁
+        """
+        if not self._thread_lock.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            raise TimeoutError(f"获取文件锁超时: {self.path}")
+
+        if self._depth == 0:
+            try:
+                self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        """释放锁"""
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def _lock_file(self) -> None:
+        """获取文件锁（阻塞或轮询直到超时）"""
+        if fcntl is None:
+            return
+
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if self.timeout is None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                deadline = time.monotonic() + self.timeout
+                while True:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            raise TimeoutError(f"获取文件锁超时: {self.path}")
+                        time.sleep(0.005)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+class GroupCommit:
+    """
+    组提交：把并发保存的 fsync 合并执行
+
+    写入方在释放文件锁之后调用 commit()，登记本次写入的文件并等待落盘。
+    同一时刻只有一个线程（leader）执行 fsync，它开始前登记的全部文件随之
+    落盘，等待中的线程直接返回；这期间到达的写入由下一轮 leader 处理。
+    同一目录的所有实例共享一个 GroupCommit（见 for_key）。
+    """
+
+    _instances: Dict[str, "GroupCommit"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self):
+        self.fsync_count = 0
+        self._cond = threading.Condition()
+        self._pending: Set[Path] = set()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+
+    @classmethod
+    def for_key(cls, key: str) -> "GroupCommit":
+        """
+        获取进程内共享的组提交实例
+
+        Args:
+            key: 共享键（通常为版本目录）
+
+        Returns:
+            GroupCommit: 组提交实例
+        """
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls._instances[key] = cls()
+            return instance
+
+    def commit(self, paths: Iterable[Path]) -> None:
+        """
+        登记已写入的文件并等待其落盘
+
+        Args:
+            paths: 本次写入的文件
+        """
+        with self._cond:
+            self._pending.update(Path(p) for p in paths)
+            self._written += 1
+            ticket = self._written
+
+            while self._synced < ticket:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+
+                # 成为leader：本轮fsync覆盖到目前为止登记的全部写入
+                self._syncing = True
+                target = self._written
+                batch, self._pending = self._pending, set()
+                self._cond.release()
+                done = False
+                try:
+                    # 新文件通过 rename 生成，目录项也需要落盘
+                    for path in sorted(batch | {p.parent for p in batch}):
+                        _fsync_path(path)
+                    done = True
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    if not done:
+                        # fsync失败，留给下一轮重试
+                        self._pending |= batch
+                    self._cond.notify_all()
+                self._synced = max(self._synced, target)
+                self.fsync_count += 1
+                logging.debug(f"组提交: {target - ticket + 1}次写入, {len(batch)}个文件")
+
+
+def _fsync_path(path: Path) -> None:
+    """把文件刷到磁盘；文件已被替换或删除时忽略"""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
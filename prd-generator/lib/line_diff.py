@@ -0,0 +1,357 @@
+"""
+Line Diff - 基于行哈希的快速差异统计
+"""
+
+import zlib
+import operator
+from array import array
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Myers 算法允许的最大编辑距离（新增+删除行数）。不超过时统计是精确的，
+# 超过时改用近似算法，统计结果标记为近似
+MAX_EDIT_DISTANCE = 256
+
+# 以下参数只用于近似算法
+# 重新同步时要求连续相同的行数，避免被空行等重复行误导
+SYNC_LINES = 3
+
+# 先在附近窗口内寻找同步点，找不到时才建立全文索引
+SYNC_WINDOW = 32
+
+# 近似算法中 Myers 的总工作量上限（约为编辑距离的平方和），
+# 用尽后剩余的差异区间直接视为替换，保证大面积改写时耗时可控
+MYERS_BUDGET = 200000
+
+
+def hash_lines(content: str) -> List[int]:
+    """
+    计算每一行的哈希
+
+    哈希由行的字节长度和CRC32组成（64位），跨进程稳定，可以持久化后
+    直接与新版本比较，而不必重新读取和切分旧内容。按 \n、\r\n、\r 切分行。
+
+    Args:
+        content: 文本内容
+
+    Returns:
+        List[int]: 每行一个无符号64位哈希
+    """
+    lines = content.encode("utf-8").splitlines()
+    return list(map(
+        operator.or_,
+        map(operator.lshift, map(len, lines), repeat(32)),
+        map(zlib.crc32, lines)
+    ))
+
+
+def pack_hashes(hashes: Sequence[int]) -> bytes:
+    """把行哈希序列化为定长字节（每行8字节）"""
+    return array("Q", hashes).tobytes()
+
+
+def unpack_hashes(data: bytes) -> List[int]:
+    """pack_hashes 的逆操作"""
+    hashes = array("Q")
+    hashes.frombytes(data)
+    return hashes.tolist()
+
+
+def matching_blocks(a: Sequence[int], b: Sequence[int]) -> List[Tuple[int, int, int]]:
+    """
+    计算两个行哈希序列的匹配块
+
+    相同的首尾行以切片比较（C速度）整段跳过，中间部分用 Myers 算法求最短
+    编辑脚本，结果为最长公共子序列。编辑距离超过 MAX_EDIT_DISTANCE 时改用
+    近似算法（见 _approximate_blocks）。
+
+    Args:
+        a: 旧版本行哈希
+        b: 新版本行哈希
+
+    Returns:
+        List[Tuple[int, int, int]]: (a起始, b起始, 长度)，按位置递增
+    """
+    return _match(a, b)[0]
+
+
+def diff_stats(a: Sequence[int], b: Sequence[int]) -> Dict:
+    """
+    统计新增、删除和修改的行数
+
+    匹配块之间的区间中，成对的删除和新增计为修改，其余计为新增或删除。
+    编辑距离不超过 MAX_EDIT_DISTANCE 时，新增与删除之和为最小值；超过时
+    统计为近似值，结果中带有 "approximate": True。
+
+    Args:
+        a: 旧版本行哈希
+        b: 新版本行哈希
+
+    Returns:
+        Dict: {"added", "deleted", "modified"}，近似时另有 "approximate"
+    """
+    blocks, exact = _match(a, b)
+    added = deleted = modified = 0
+    i = j = 0
+    for ai, bj, size in blocks + [(len(a), len(b), 0)]:
+        removed_lines = ai - i
+        inserted_lines = bj - j
+        paired = min(removed_lines, inserted_lines)
+        modified += paired
+        deleted += removed_lines - paired
+        added += inserted_lines - paired
+        i, j = ai + size, bj + size
+
+    stats = {"added": added, "deleted": deleted, "modified": modified}
+    if not exact:
+        stats["approximate"] = True
+    return stats
+
+
+def _match(a: Sequence[int], b: Sequence[int]) -> Tuple[List[Tuple[int, int, int]], bool]:
+    """
+    计算匹配块
+
+    Returns:
+        Tuple[List, bool]: (匹配块, 是否为最长公共子序列)
+    """
+    blocks: List[Tuple[int, int, int]] = []
+    a_hi, b_hi = len(a), len(b)
+
+    suffix = _common_suffix(a, 0, a_hi, b, 0, b_hi)
+    a_hi -= suffix
+    b_hi -= suffix
+    if suffix:
+        blocks.append((a_hi, b_hi, suffix))
+
+    prefix = _common_prefix(a, 0, a_hi, b, 0, b_hi)
+    if prefix:
+        blocks.append((0, 0, prefix))
+
+    exact_blocks, _ = _myers(a, prefix, a_hi, b, prefix, b_hi, MAX_EDIT_DISTANCE)
+    if exact_blocks is not None:
+        return _merge_blocks(blocks + exact_blocks), True
+
+    blocks.extend(_approximate_blocks(a, prefix, a_hi, b, prefix, b_hi))
+    return _merge_blocks(blocks), False
+
+
+def _approximate_blocks(a, i, a_hi, b, j, b_hi) -> List[Tuple[int, int, int]]:
+    """
+    大面积改写时的近似匹配
+
+    遇到差异时向前搜索最近的重新同步点（连续 SYNC_LINES 行相同），两点
+    之间的差异区间再用 Myers 算法求最短编辑脚本；区间的编辑距离超出上限
+    或总工作量超过 MYERS_BUDGET 时，该区间视为整体替换。耗时可控，但匹配
+    行数可能少于最长公共子序列。
+    """
+    blocks: List[Tuple[int, int, int]] = []
+
+    # 行哈希 -> 最后出现的位置；只要当前位置之后存在该行，就一定能查到
+    a_last: Optional[Dict[int, int]] = None
+    b_last: Optional[Dict[int, int]] = None
+    budget = MYERS_BUDGET
+    while True:
+        prefix = _common_prefix(a, i, a_hi, b, j, b_hi)
+        if prefix:
+            blocks.append((i, j, prefix))
+            i += prefix
+            j += prefix
+        if i >= a_hi or j >= b_hi:
+            break
+
+        sync = _resync_local(a, i, a_hi, b, j, b_hi)
+        if sync is None and max(a_hi - i, b_hi - j) > SYNC_WINDOW:
+            if a_last is None:
+                a_last = dict(zip(a[:a_hi], range(a_hi)))
+                b_last = dict(zip(b[:b_hi], range(b_hi)))
+            sync = _resync(a, i, a_hi, b, j, b_hi, a_last, b_last)
+
+        end_a, end_b = sync if sync is not None else (a_hi, b_hi)
+        max_d = min(MAX_EDIT_DISTANCE, int(budget ** 0.5))
+        gap_blocks, used = _myers(a, i, end_a, b, j, end_b, max_d)
+        blocks.extend(gap_blocks or [])
+        budget = max(0, budget - used * used)
+        if sync is None:
+            break
+        i, j = sync
+
+    return blocks
+
+
+def _resync_local(a, i, a_hi, b, j, b_hi) -> Optional[Tuple[int, int]]:
+    """
+    在 SYNC_WINDOW 行的窗口内寻找最近的重新同步点
+
+    小范围修改时不必为整篇文档建立索引。
+
+    Returns:
+        Optional[Tuple[int, int]]: (a位置, b位置)，窗口内找不到时返回None
+    """
+    a_end = min(a_hi, i + SYNC_WINDOW)
+    b_end = min(b_hi, j + SYNC_WINDOW)
+    best = None
+    best_cost = SYNC_WINDOW * 2
+    for d in range(SYNC_WINDOW):
+        if d >= best_cost:
+            break
+        x = i + d
+        if x < a_end:
+            y = _find(b, a[x], j, b_end)
+            if y >= 0 and d + y - j < best_cost and _confirm(a, x, a_hi, b, y, b_hi):
+                best, best_cost = (x, y), d + y - j
+        y = j + d
+        if y < b_end:
+            x = _find(a, b[y], i, a_end)
+            if x >= 0 and d + x - i < best_cost and _confirm(a, x, a_hi, b, y, b_hi):
+                best, best_cost = (x, y), d + x - i
+    return best
+
+
+def _find(seq, value, start, stop) -> int:
+    """在 seq[start:stop] 中查找 value，返回位置或-1"""
+    try:
+        return seq.index(value, start, stop)
+    except ValueError:
+        return -1
+
+
+def _resync(a, i, a_hi, b, j, b_hi, a_last, b_last) -> Optional[Tuple[int, int]]:
+    """
+    从 (i, j) 开始寻找最近的重新同步点
+
+    同时沿两边向前扫描，候选点的代价为两边跳过的行数之和；扫描距离达到
+    当前最优代价时停止。
+
+    Returns:
+        Optional[Tuple[int, int]]: (a位置, b位置)，找不到时返回None
+    """
+    best = None
+    best_cost = (a_hi - i) + (b_hi - j)
+    d = 0
+    while d < best_cost:
+        x = i + d
+        if x < a_hi:
+            y = b_last.get(a[x], -1)
+            cost = d + y - j
+            if j <= y < b_hi and cost < best_cost and _confirm(a, x, a_hi, b, y, b_hi):
+                best, best_cost = (x, y), cost
+        y = j + d
+        if y < b_hi:
+            x = a_last.get(b[y], -1)
+            cost = d + x - i
+            if i <= x < a_hi and cost < best_cost and _confirm(a, x, a_hi, b, y, b_hi):
+                best, best_cost = (x, y), cost
+        d += 1
+    return best
+
+
+def _confirm(a, x, a_hi, b, y, b_hi) -> bool:
+    """确认 (x, y) 之后连续 SYNC_LINES 行相同（接近末尾时放宽）"""
+    size = min(SYNC_LINES, a_hi - x, b_hi - y)
+    return a[x:x + size] == b[y:y + size]
+
+
+def _common_prefix(a, a_lo, a_hi, b, b_lo, b_hi) -> int:
+    """公共前缀长度（倍增步长比较切片，再二分收缩）"""
+    limit = min(a_hi - a_lo, b_hi - b_lo)
+    n = 0
+    step = 1
+    while n + step <= limit and a[a_lo + n:a_lo + n + step] == b[b_lo + n:b_lo + n + step]:
+        n += step
+        step *= 2
+    while step > 1:
+        step //= 2
+        if n + step <= limit and a[a_lo + n:a_lo + n + step] == b[b_lo + n:b_lo + n + step]:
+            n += step
+    return n
+
+
+def _common_suffix(a, a_lo, a_hi, b, b_lo, b_hi) -> int:
+    """公共后缀长度（倍增步长比较切片，再二分收缩）"""
+    limit = min(a_hi - a_lo, b_hi - b_lo)
+    n = 0
+    step = 1
+    while n + step <= limit and a[a_hi - n - step:a_hi - n] == b[b_hi - n - step:b_hi - n]:
+        n += step
+        step *= 2
+    while step > 1:
+        step //= 2
+        if n + step <= limit and a[a_hi - n - step:a_hi - n] == b[b_hi - n - step:b_hi - n]:
+            n += step
+    return n
+
+
+def _myers(a, a_lo, a_hi, b, b_lo, b_hi, max_d) -> Tuple[List[Tuple[int, int, int]], int]:
+    """
+    Myers O(ND) 最短编辑脚本
+
+    编辑距离超过 max_d 时放弃。对角线上的相同行用切片比较整段跳过。
+
+    Returns:
+        Tuple[Optional[List], int]: (匹配块，放弃时为None, 实际搜索的编辑距离)
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    max_d = min(n + m, max_d)
+    v = {1: 0}
+    trace = []
+
+    for d in range(max_d + 1):
+        # trace[d] 保存第d步开始前的状态，用于回溯
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            if x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                snake = _common_prefix(a, a_lo + x, a_hi, b, b_lo + y, b_hi)
+                x += snake
+                y += snake
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m, a_lo, b_lo), d
+    return None, max_d
+
+
+def _backtrack(trace, n, m, a_lo, b_lo) -> List[Tuple[int, int, int]]:
+    """根据 Myers 的搜索轨迹还原匹配块"""
+    blocks = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+            prev_x = v[prev_k]
+            mid_x = prev_x
+        else:
+            prev_k = k - 1
+            prev_x = v[prev_k]
+            mid_x = prev_x + 1
+
+        # (mid_x, mid_y) 到 (x, y) 是一段对角线（匹配）
+        if x > mid_x:
+            blocks.append((a_lo + mid_x, b_lo + mid_x - k, x - mid_x))
+        x, y = prev_x, prev_x - prev_k
+
+    if x > 0:
+        blocks.append((a_lo, b_lo, x))
+    blocks.reverse()
+    return blocks
+
+
+def _merge_blocks(blocks: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+    """排序并合并相邻的匹配块"""
+    merged: List[Tuple[int, int, int]] = []
+    for ai, bj, size in sorted(block for block in blocks if block[2] > 0):
+        if merged:
+            pa, pb, ps = merged[-1]
+            if pa + ps == ai and pb + ps == bj:
+                merged[-1] = (pa, pb, ps + size)
+                continue
+        merged.append((ai, bj, size))
+    return merged
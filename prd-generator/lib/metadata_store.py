@@ -0,0 +1,367 @@
+"""
+Metadata Store - 版本元数据存储
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+from .utils import write_atomic
+
+
+class MetadataStore:
+    """
+    版本元数据存储基类
+
+    维护按版本号和标签索引的内存视图，查找为O(1)。子类负责持久化。
+    """
+
+    def __init__(self, version_dir: Path, prd_name: str):
+        """
+        初始化存储
+
+        Args:
+            version_dir: 版本目录
+            prd_name: PRD名称
+        """
+        self.version_dir = Path(version_dir)
+        self.prd_name = prd_name
+        self._reset()
+
+    def _reset(self) -> None:
+        """清空内存索引"""
+        self._versions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tags: Dict[str, List[str]] = {}
+        self._current_version: Optional[str] = None
+
+    # ---- 读取 ----
+
+    def refresh(self) -> None:
+        """与磁盘上的数据同步"""
+
+    def list_versions(self) -> List[Dict]:
+        """列出所有版本（按创建顺序）"""
+        self.refresh()
+        return list(self._versions.values())
+
+    def get(self, version: str) -> Optional[Dict]:
+        """按版本号获取版本信息"""
+        self.refresh()
+        return self._versions.get(version)
+
+    def last(self) -> Optional[Dict]:
+        """获取最后创建的版本"""
+        self.refresh()
+        if not self._versions:
+            return None
+        return self._versions[next(reversed(self._versions))]
+
+    def count(self) -> int:
+        """版本数量"""
+        self.refresh()
+        return len(self._versions)
+
+    def find_by_tag(self, tag: str) -> List[Dict]:
+        """获取带有指定标签的版本"""
+        self.refresh()
+        return [self._versions[v] for v in self._tags.get(tag, []) if v in self._versions]
+
+    @property
+    def current_version(self) -> Optional[str]:
+        """当前版本号"""
+        self.refresh()
+        return self._current_version
+
+    def to_dict(self) -> Dict:
+        """导出为 metadata.json 格式"""
+        self.refresh()
+        return {
+            "prd_name": self.prd_name,
+            "current_version": self._current_version,
+            "versions": list(self._versions.values())
+        }
+
+    # ---- 写入 ----
+
+    def append(self, version_info: Dict) -> None:
+        """追加新版本"""
+        self._write({"op": "create", "version": version_info})
+
+    def add_tag(self, version: str, tag: str) -> bool:
+        """
+        为版本添加标签
+
+        Returns:
+            bool: 是否发生变化（版本不存在时抛出ValueError）
+        """
+        info = self.get(version)
+        if info is None:
+            raise ValueError(f"版本不存在: {version}")
+        if tag in info.get("tags", []):
+            return False
+        self._write({"op": "tag", "version": version, "tag": tag})
+        return True
+
+    def remove_tag(self, version: str, tag: str) -> bool:
+        """
+        移除版本标签
+
+        Returns:
+            bool: 标签是否存在并被移除
+        """
+        info = self.get(version)
+        if info is None or tag not in info.get("tags", []):
+            return False
+        self._write({"op": "untag", "version": version, "tag": tag})
+        return True
+
+    def delete(self, version: str) -> Optional[Dict]:
+        """
+        删除版本
+
+        Returns:
+            Optional[Dict]: 被删除的版本信息，不存在时返回None
+        """
+        info = self.get(version)
+        if info is None:
+            return None
+        self._write({"op": "delete", "version": version})
+        return info
+
+    def compact(self) -> None:
+        """压缩存储"""
+
+    def data_files(self) -> List[Path]:
+        """写入操作会修改的文件（用于组提交时fsync）"""
+        return []
+
+    def _write(self, record: Dict) -> None:
+        """持久化一条变更记录并更新内存索引"""
+        raise NotImplementedError
+
+    # ---- 索引维护 ----
+
+    def _load_snapshot(self, metadata: Dict) -> None:
+        """从 metadata.json 格式加载"""
+        self._reset()
+        self._current_version = metadata.get("current_version")
+        for info in metadata.get("versions", []):
+            self._apply({"op": "create", "version": info}, set_current=False)
+
+    def _apply(self, record: Dict, set_current: bool = True) -> None:
+        """
+        把一条变更记录应用到内存索引
+
+        所有操作都是幂等的，重复回放同一条记录不会改变结果。
+        """
+        op = record["op"]
+
+        if op == "create":
+            info = record["version"]
+            version = info["version"]
+            info.setdefault("tags", [])
+            self._versions[version] = info
+            for tag in info["tags"]:
+                self._index_tag(tag, version)
+            if set_current:
+                self._current_version = version
+            return
+
+        version = record["version"]
+        info = self._versions.get(version)
+        if info is None:
+            return
+
+        if op == "tag":
+            if record["tag"] not in info["tags"]:
+                info["tags"].append(record["tag"])
+            self._index_tag(record["tag"], version)
+        elif op == "untag":
+            if record["tag"] in info["tags"]:
+                info["tags"].remove(record["tag"])
+            tagged = self._tags.get(record["tag"], [])
+            if version in tagged:
+                tagged.remove(version)
+        elif op == "delete":
+            for tag in info["tags"]:
+                tagged = self._tags.get(tag, [])
+                if version in tagged:
+                    tagged.remove(version)
+            del self._versions[version]
+
+    def _index_tag(self, tag: str, version: str) -> None:
+        tagged = self._tags.setdefault(tag, [])
+        if version not in tagged:
+            tagged.append(version)
+
+
+class JsonMetadataStore(MetadataStore):
+    """
+    单文件JSON存储（原有格式）
+
+    每次写入都会重写整个 metadata.json，写入成本与历史长度成正比。
+    """
+
+    def __init__(self, version_dir: Path, prd_name: str):
+        super().__init__(version_dir, prd_name)
+        self.metadata_file = self.version_dir / "metadata.json"
+        self._loaded_stat = None
+
+    def refresh(self) -> None:
+        stat = _stat_key(self.metadata_file)
+        if stat == self._loaded_stat:
+            return
+
+        if stat is None:
+            self._reset()
+        else:
+            with open(self.metadata_file, "r", encoding="utf-8") as f:
+                self._load_snapshot(json.load(f))
+        self._loaded_stat = stat
+
+    def data_files(self) -> List[Path]:
+        return [self.metadata_file]
+
+    def _write(self, record: Dict) -> None:
+        self.refresh()
+        self._apply(record)
+        write_atomic(self.metadata_file, _dump_snapshot(self.to_dict()))
+        self._loaded_stat = _stat_key(self.metadata_file)
+
+
+class JournalMetadataStore(MetadataStore):
+    """
+    快照 + 追加日志存储
+
+    metadata.json 作为快照（与原有格式相同，已有文件无需迁移），之后的每次
+    变更以一行JSON追加到 metadata.log，写入为O(1)。读取时只回放日志中新增
+    的部分；compact() 把日志合并回快照。
+    """
+
+    def __init__(self, version_dir: Path, prd_name: str):
+        super().__init__(version_dir, prd_name)
+        self.metadata_file = self.version_dir / "metadata.json"
+        self.log_file = self.version_dir / "metadata.log"
+        self._snapshot_stat = None
+        self._log_offset = 0
+        self._log_records = 0
+        self._loaded = False
+
+    @property
+    def log_records(self) -> int:
+        """日志中尚未压缩的记录数"""
+        self.refresh()
+        return self._log_records
+
+    def refresh(self) -> None:
+        snapshot_stat = _stat_key(self.metadata_file)
+        if not self._loaded or snapshot_stat != self._snapshot_stat:
+            self._full_reload(snapshot_stat)
+            return
+
+        try:
+            log_size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            log_size = 0
+
+        if log_size < self._log_offset:
+            # 日志被其他进程压缩，重新加载
+            self._full_reload(_stat_key(self.metadata_file))
+        elif log_size > self._log_offset:
+            self._replay_log()
+
+    def _full_reload(self, snapshot_stat) -> None:
+        if snapshot_stat is None:
+            self._reset()
+        else:
+            with open(self.metadata_file, "r", encoding="utf-8") as f:
+                self._load_snapshot(json.load(f))
+        self._snapshot_stat = snapshot_stat
+        self._log_offset = 0
+        self._log_records = 0
+        self._loaded = True
+        self._replay_log()
+
+    def _replay_log(self) -> None:
+        """回放日志中尚未读取的记录"""
+        try:
+            with open(self.log_file, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # 最后一行若不完整（写入中断或正在写入），留到下次读取；写入中断留下的
+        # 不完整记录由下一次写入截断
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except ValueError:
+                # 旧版本在不完整记录之后直接追加造成的损坏行，跳过
+                logging.warning(f"跳过无法解析的版本元数据记录: {self.log_file}")
+                continue
+            self._apply(record)
+            self._log_records += 1
+        self._log_offset += end
+
+    def data_files(self) -> List[Path]:
+        return [self.log_file]
+
+    def _write(self, record: Dict) -> None:
+        """
+        追加一条记录（调用方持有写锁）
+
+        回放之后 _log_offset 指向最后一条完整记录的结尾。持有写锁时其后的
+        字节只可能是上次写入中断留下的不完整记录，先截断再追加，避免新记录
+        接在残留字节之后。
+        """
+        self.refresh()
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.log_file, "ab") as f:
+            if f.tell() > self._log_offset:
+                logging.warning(f"截断版本元数据日志中不完整的记录: {self.log_file}")
+                f.truncate(self._log_offset)
+            f.write(line)
+            f.flush()
+            end = f.tell()
+        self._apply(record)
+        self._log_offset = end
+        self._log_records += 1
+
+    def compact(self) -> None:
+        """把日志合并进快照，再删除日志"""
+        self.refresh()
+        if not self._log_records and self.metadata_file.exists():
+            return
+
+        # 删除日志前快照必须已经落盘
+        write_atomic(self.metadata_file, _dump_snapshot(self.to_dict()), fsync=True)
+
+        # 快照已包含全部记录；即使在删除日志前中断，回放也是幂等的
+        try:
+            self.log_file.unlink()
+        except FileNotFoundError:
+            pass
+
+        self._snapshot_stat = _stat_key(self.metadata_file)
+        self._log_offset = 0
+        self._log_records = 0
+        logging.info(f"已压缩版本元数据: {self.prd_name}")
+
+
+def _dump_snapshot(metadata: Dict) -> bytes:
+    """序列化为 metadata.json 格式"""
+    return json.dumps(metadata, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _stat_key(path: Path):
+    """用于判断文件是否被替换或修改的stat摘要"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
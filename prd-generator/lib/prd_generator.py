@@ -2,11 +2,43 @@
 PRD Generator - PRD文档生成器
 """
 
+import time
 import logging
+import itertools
+from collections import deque
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
-from .utils import get_template_path, read_file, write_file, get_output_dir, sanitize_filename
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .utils import write_file, write_atomic, get_output_dir, sanitize_filename, ensure_dir
+from .template_engine import Template, template_cache
+from .version_manager import VersionManager
+
+
+# PRD类型 -> 模板文件（references/ 下）
+TEMPLATE_MAP = {
+    "standard": "prd_template.md",
+    "lean": "prd_template_lean.md",
+    "onepager": "prd_template_onepager.md",
+    "technical": "prd_template_technical.md",
+    "design": "prd_template_design.md"
+}
+
+
+def prd_filename(name: str) -> str:
+    """
+    PRD输出文件名
+
+    Args:
+        name: PRD名称或文件名
+
+    Returns:
+        str: 清理后的文件名，不以 .md 结尾时加上 -prd.md
+    """
+    clean_filename = sanitize_filename(name)
+    if not clean_filename.endswith(".md"):
+        clean_filename += "-prd.md"
+    return clean_filename
 
 
 class PRDGenerator:
@@ -20,13 +52,7 @@ class PRDGenerator:
             prd_type: PRD类型 (standard/lean/onepager/technical/design)
         """
         self.prd_type = prd_type
-        self.template_map = {
-            "standard": "prd_template.md",
-            "lean": "prd_template_lean.md",
-            "onepager": "prd_template_onepager.md",
-            "technical": "prd_template_technical.md",
-            "design": "prd_template_design.md"
-        }
+        self.template_map = TEMPLATE_MAP
 
     def generate(self, requirements: Dict, output_filename: Optional[str] = None) -> Path:
         """
@@ -41,11 +67,8 @@ class PRDGenerator:
         """
         logging.info(f"开始生成{self.prd_type} PRD")
 
-        # 加载模板
-        template = self._load_template()
-
-        # 填充模板
-        content = self._fill_template(template, requirements)
+        # 加载并填充模板
+        content = self.render(requirements)
 
         # 保存文件
         output_path = self._save_prd(content, output_filename or requirements.get("name", "prd"))
@@ -53,84 +76,154 @@ class PRDGenerator:
         logging.info(f"PRD已生成: {output_path}")
         return output_path
 
-    def _load_template(self) -> str:
-        """加载PRD模板"""
+    def render(self, requirements: Dict) -> str:
+        """
+        生成PRD内容（只在内存中，不写文件）
+
+        Args:
+            requirements: 需求信息字典
+
+        Returns:
+            str: PRD内容
+        """
+        return self._fill_template(self._load_template(), requirements)
+
+    def generate_and_commit(
+        self,
+        requirements: Dict,
+        message: str = "生成PRD",
+        prd_name: Optional[str] = None,
+        author: Optional[str] = None,
+        email: Optional[str] = None,
+        output_filename: Optional[str] = None,
+        write_output: bool = True,
+        version_manager: Optional[VersionManager] = None
+    ) -> Dict:
+        """
+        生成PRD并直接保存为新版本
+
+        内容只在内存中生成一次，由 VersionManager 计算哈希、与上一版本的
+        行哈希比较并写入版本库，不再经过“写入 outputs/ -> 读回 -> 保存版本”
+        的往返。outputs/ 中的文件可选，直接由内存中的内容写出（版本对象是
+        压缩或差异编码的，不能与之硬链接）。
+
+        Args:
+            requirements: 需求信息字典
+            message: 版本说明
+            prd_name: 版本库中的PRD名称，默认使用需求中的 name
+            author: 作者，默认使用需求中的 author
+            email: 作者邮箱
+            output_filename: 输出文件名（可选）
+            write_output: 是否同时写入 outputs/ 目录
+            version_manager: 已有的 VersionManager 实例（可选）
+
+        Returns:
+            Dict: version（版本号）、content（PRD内容）和 file（输出文件路径，
+                不写入时为 None）
+        """
+        content = self.render(requirements)
+        name = requirements.get("name", "prd")
+
+        manager = version_manager or VersionManager(sanitize_filename(prd_name or name))
+        version = manager.create_version(
+            content,
+            message,
+            author=author or requirements.get("author"),
+            email=email
+        )
+
+        output_path = None
+        if write_output:
+            output_path = get_output_dir() / prd_filename(output_filename or name)
+            write_atomic(output_path, content.encode("utf-8"))
+
+        logging.info(f"PRD已生成并保存为版本 {version}: {manager.prd_name}")
+        return {"version": version, "content": content, "file": output_path}
+
+    def _load_template(self) -> Template:
+        """加载编译后的PRD模板（进程内共享缓存）"""
         template_name = self.template_map.get(self.prd_type)
         if not template_name:
             raise ValueError(f"不支持的PRD类型: {self.prd_type}")
 
-        template_path = get_template_path(template_name)
-        return read_file(template_path)
+        return template_cache.get(template_name)
 
-    def _fill_template(self, template: str, requirements: Dict) -> str:
+    @staticmethod
+    def warm_up(prd_types: Optional[Iterable[str]] = None) -> int:
+        """
+        预加载PRD模板，供服务启动时调用
+
+        Args:
+            prd_types: PRD类型，None表示全部类型
+
+        Returns:
+            int: 加载的模板数量
+        """
+        names = TEMPLATE_MAP.values() if prd_types is None else [TEMPLATE_MAP[t] for t in prd_types]
+        return template_cache.warm_up(names)
+
+    def _fill_template(self, template: Template, requirements: Dict) -> str:
         """
         填充模板
 
         Args:
-            template: 模板内容
+            template: 编译后的模板
             requirements: 需求信息
 
         Returns:
             str: 填充后的内容
         """
-        content = template
-
-        # 基本信息替换
-        content = self._replace_basic_info(content, requirements)
+        # 基本信息
+        values = self._basic_info(requirements)
 
         # 根据PRD类型填充不同内容
         if self.prd_type == "standard":
-            content = self._fill_standard_prd(content, requirements)
+            self._fill_standard_prd(values, requirements)
         elif self.prd_type == "lean":
-            content = self._fill_lean_prd(content, requirements)
+            self._fill_lean_prd(values, requirements)
         elif self.prd_type == "onepager":
-            content = self._fill_onepager_prd(content, requirements)
+            self._fill_onepager_prd(values, requirements)
         elif self.prd_type == "technical":
-            content = self._fill_technical_prd(content, requirements)
+            self._fill_technical_prd(values, requirements)
         elif self.prd_type == "design":
-            content = self._fill_design_prd(content, requirements)
-
-        return content
+            self._fill_design_prd(values, requirements)
 
-    def _replace_basic_info(self, content: str, requirements: Dict) -> str:
-        """替换基本信息"""
-        # 产品/功能名称
-        name = requirements.get("name", "产品名称")
-        content = content.replace("[产品/功能名称]", name)
+        return template.render(values)
 
-        # 日期
+    def _basic_info(self, requirements: Dict) -> Dict:
+        """基本信息的占位符"""
         today = datetime.now().strftime("%Y-%m-%d")
-        content = content.replace("[日期]", today)
-        content = content.replace("[创建日期]", today)
-        content = content.replace("[最后更新]", today)
-
-        # 作者
         author = requirements.get("author", "产品经理")
-        content = content.replace("[姓名]", author)
-        content = content.replace("[作者]", author)
-
-        # 状态
-        content = content.replace("[草稿/审核中/已批准]", "草稿")
-        content = content.replace("[状态]", "草稿")
 
-        return content
+        return {
+            # 产品/功能名称
+            "产品/功能名称": requirements.get("name", "产品名称"),
+            # 日期
+            "日期": today,
+            "创建日期": today,
+            "最后更新": today,
+            # 作者
+            "姓名": author,
+            "作者": author,
+            # 状态
+            "草稿/审核中/已批准": "草稿",
+            "状态": "草稿",
+        }
 
-    def _fill_standard_prd(self, content: str, requirements: Dict) -> str:
+    def _fill_standard_prd(self, values: Dict, requirements: Dict) -> None:
         """填充标准PRD"""
         # 问题陈述
         if "problem" in requirements:
             problem = requirements["problem"]
-            content = content.replace("[描述现有的情况、痛点或机会]", problem.get("current_state", ""))
-            content = content.replace("[清晰阐述需要解决的核心问题]", problem.get("description", ""))
-            content = content.replace("[说明问题对用户、业务的影响]", problem.get("impact", ""))
+            values["描述现有的情况、痛点或机会"] = problem.get("current_state", "")
+            values["清晰阐述需要解决的核心问题"] = problem.get("description", "")
+            values["说明问题对用户、业务的影响"] = problem.get("impact", "")
 
         # 业务目标
         if "goals" in requirements:
             goals = requirements["goals"]
             if isinstance(goals, list):
-                goals_text = "\n".join([f"- {goal}" for goal in goals])
-                # 简单替换，实际应该更智能
-                content = content.replace("- [目标1]\n- [目标2]\n- [目标3]", goals_text)
+                values["目标"] = goals
 
         # 用户画像
         if "users" in requirements:
@@ -147,49 +240,37 @@ class PRDGenerator:
         if "scope" in requirements:
             scope = requirements["scope"]
             if "in_scope" in scope:
-                in_scope_text = "\n".join([f"- {item}" for item in scope["in_scope"]])
-                content = content.replace("- [功能1]\n- [功能2]\n- [功能3]", in_scope_text)
-
-            if "out_scope" in scope:
-                out_scope_text = "\n".join([f"- {item}" for item in scope["out_scope"]])
-                # 替换不包含部分
+                values["功能"] = scope["in_scope"]
 
-        return content
+            # out_scope 暂不填充，[不包含的功能N] 保持占位符（与原有输出一致）
 
-    def _fill_lean_prd(self, content: str, requirements: Dict) -> str:
+    def _fill_lean_prd(self, values: Dict, requirements: Dict) -> None:
         """填充精益PRD"""
         # 简化的填充逻辑
         if "problem" in requirements:
-            content = content.replace("[用1-2段清晰描述问题]", requirements["problem"].get("description", ""))
+            values["用1-2段清晰描述问题"] = requirements["problem"].get("description", "")
 
         if "solution" in requirements:
-            content = content.replace("[用1-2段描述解决方案]", requirements["solution"])
+            values["用1-2段描述解决方案"] = requirements["solution"]
 
-        return content
-
-    def _fill_onepager_prd(self, content: str, requirements: Dict) -> str:
+    def _fill_onepager_prd(self, values: Dict, requirements: Dict) -> None:
         """填充单页PRD"""
         # 单页PRD的填充逻辑
-        return content
 
-    def _fill_technical_prd(self, content: str, requirements: Dict) -> str:
+    def _fill_technical_prd(self, values: Dict, requirements: Dict) -> None:
         """填充技术PRD"""
         # 技术PRD的填充逻辑
         if "technical" in requirements:
             tech = requirements["technical"]
             # 填充技术相关内容
 
-        return content
-
-    def _fill_design_prd(self, content: str, requirements: Dict) -> str:
+    def _fill_design_prd(self, values: Dict, requirements: Dict) -> None:
         """填充设计PRD"""
         # 设计PRD的填充逻辑
         if "design" in requirements:
             design = requirements["design"]
             # 填充设计相关内容
 
-        return content
-
     def _save_prd(self, content: str, filename: str) -> Path:
         """
         保存PRD文件
@@ -201,14 +282,7 @@ class PRDGenerator:
         Returns:
             Path: 保存的文件路径
         """
-        # 清理文件名
-        clean_filename = sanitize_filename(filename)
-        if not clean_filename.endswith(".md"):
-            clean_filename += "-prd.md"
-
-        # 获取输出目录
-        output_dir = get_output_dir()
-        output_path = output_dir / clean_filename
+        output_path = get_output_dir() / prd_filename(filename)
 
         # 写入文件
         write_file(output_path, content)
@@ -290,3 +364,165 @@ def generate_prd(
     """
     generator = PRDGenerator(prd_type)
     return generator.generate(requirements, output_filename)
+
+
+def _render_item(item: Tuple[int, Dict, str]) -> Dict:
+    """
+    渲染一条需求（可在工作进程中执行）
+
+    Args:
+        item: (序号, 需求信息, 默认PRD类型)
+
+    Returns:
+        Dict: 包含 filename、content 和 render_ms；失败时包含 error
+    """
+    index, requirements, default_type = item
+    start = time.perf_counter()
+    result = {"index": index, "name": None, "prd_type": default_type}
+    try:
+        if not isinstance(requirements, dict):
+            raise TypeError(f"需求信息应为对象，实际为 {type(requirements).__name__}")
+        prd_type = requirements.get("prd_type") or default_type
+        result["name"] = requirements.get("output_filename") or requirements.get("name", f"prd-{index}")
+        result["prd_type"] = prd_type
+        if not isinstance(result["name"], str):
+            raise TypeError(f"name/output_filename 应为字符串，实际为 {type(result['name']).__name__}")
+        filename = prd_filename(result["name"])
+        result["content"] = PRDGenerator(prd_type).render(requirements)
+        result["filename"] = filename
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["render_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def _render_chunk(chunk: List[Tuple[int, Dict, str]]) -> List[Dict]:
+    """渲染一组需求（在工作进程中执行）"""
+    return [_render_item(item) for item in chunk]
+
+
+def _render_in_pool(
+    pool: ProcessPoolExecutor,
+    tasks: Iterator[Tuple[int, Dict, str]],
+    chunksize: int,
+    max_pending: int
+) -> Iterator[Dict]:
+    """
+    分块提交到进程池并按输入顺序返回结果
+
+    与 pool.map 不同，最多只有 max_pending 块在处理中，输入边读取边提交，
+    不会先把整个输入读入内存。
+    """
+    pending = deque()
+    while True:
+        chunk = list(itertools.islice(tasks, chunksize))
+        if chunk:
+            pending.append(pool.submit(_render_chunk, chunk))
+        if pending and (not chunk or len(pending) >= max_pending):
+            for result in pending.popleft().result():
+                yield result
+        if not chunk and not pending:
+            return
+
+
+def _write_item(result: Dict) -> Dict:
+    """写入一个已渲染的PRD（在写入线程中执行）"""
+    start = time.perf_counter()
+    try:
+        with open(result["file"], "w", encoding="utf-8") as f:
+            f.write(result.pop("content"))
+    except OSError as e:
+        result.pop("content", None)
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["write_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def generate_many(
+    items: Iterable[Dict],
+    prd_type: str = "standard",
+    output_dir: Optional[Path] = None,
+    jobs: int = 1,
+    chunksize: int = 16,
+    batch_size: int = 64,
+    io_workers: int = 4
+) -> Iterator[Dict]:
+    """
+    批量生成PRD
+
+    jobs 大于1时在进程池中分块渲染（最多 jobs*2 块在处理中，输入边读取边
+    提交），否则在当前进程中渲染（模板已缓存，单个PRD的渲染只需几十微秒）。渲染结果按批（batch_size 个）交给写入线程池写入
+    输出目录；输出目录只解析和创建一次，同名文件自动加序号。单条需求失败
+    不影响其他需求。
+
+    Args:
+        items: 需求信息；可以包含 prd_type（覆盖默认类型）和 output_filename
+        prd_type: 默认PRD类型
+        output_dir: 输出目录，默认为 OUTPUT_DIR
+        jobs: 渲染进程数
+        chunksize: 每次分发给工作进程的需求数
+        batch_size: 每批写入的文件数
+        io_workers: 写入线程数
+
+    Yields:
+        Dict: 每条需求的结果（按输入顺序）：index、name、prd_type、file、
+            render_ms、write_ms，失败时包含 error
+    """
+    if output_dir is None:
+        output_dir = get_output_dir()
+    else:
+        output_dir = Path(output_dir)
+        ensure_dir(output_dir)
+
+    tasks = ((index, requirements, prd_type) for index, requirements in enumerate(items))
+    used_names = set()
+    total = failed = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, io_workers)) as writer:
+        if jobs > 1:
+            pool = ProcessPoolExecutor(max_workers=jobs)
+            rendered = _render_in_pool(pool, tasks, max(1, chunksize), max_pending=jobs * 2)
+        else:
+            pool = None
+            rendered = map(_render_item, tasks)
+
+        try:
+            batch: List[Dict] = []
+            for result in rendered:
+                if "error" not in result:
+                    result["file"] = str(output_dir / _unique_filename(result.pop("filename"), used_names))
+                batch.append(result)
+                if len(batch) >= batch_size:
+                    for item in _write_batch(writer, batch):
+                        total += 1
+                        failed += "error" in item
+                        yield item
+                    batch = []
+
+            for item in _write_batch(writer, batch):
+                total += 1
+                failed += "error" in item
+                yield item
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    logging.info(f"批量生成完成: {total}个PRD, {failed}个失败, 输出目录: {output_dir}")
+
+
+def _write_batch(writer: ThreadPoolExecutor, batch: List[Dict]) -> List[Dict]:
+    """并行写入一批结果，渲染失败的条目原样返回"""
+    futures = [writer.submit(_write_item, result) if "error" not in result else None for result in batch]
+    return [future.result() if future is not None else result for future, result in zip(futures, batch)]
+
+
+def _unique_filename(filename: str, used_names: set) -> str:
+    """同一批中重名的文件加上序号"""
+    if filename in used_names:
+        stem = filename[:-len(".md")]
+        number = 2
+        while f"{stem}-{number}.md" in used_names:
+            number += 1
+        filename = f"{stem}-{number}.md"
+    used_names.add(filename)
+    return filename
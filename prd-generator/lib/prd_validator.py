@@ -3,178 +3,262 @@ PRD Validator - PRD文档验证器
 """
 
 import re
+import json
+import hashlib
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from .utils import read_file, parse_markdown_sections
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, Optional, Union
+from .utils import read_file, SectionIndex, LineIndex
 
+# 规则集版本：修改规则的判定逻辑（而不仅是模式）时需要递增，使缓存的报告失效
+RULESET_VERSION = "3"
 
-class PRDValidator:
-    """PRD文档验证器"""
 
-    def __init__(self, prd_type: str = "standard"):
+class PRDDocument:
+    """
+    单次验证中的文档视图
+
+    同一文档的内容、章节索引和行偏移索引只构建一次，供各规则共享。
+    章节索引和行偏移索引在第一次访问时才构建，只运行部分规则时（如只检查
+    成功指标）不做用不到的解析；章节字典是原文上的视图，章节内容在访问时才切片。
+    """
+
+    def __init__(self, content: str, sections: Optional[Mapping[str, str]] = None):
         """
-        初始化验证器
+        初始化文档视图
 
         Args:
-            prd_type: PRD类型 (standard/lean/onepager/technical/design)
+            content: 文档内容
+            sections: 章节字典，None时使用章节索引
         """
-        self.prd_type = prd_type
-        self.issues = []
-        self.warnings = []
-        self.suggestions = []
-        self.score = 100
+        self.content = content
+        self._sections = sections
+        self._index: Optional[SectionIndex] = None
+        self._lines: Optional[LineIndex] = None
+
+    @property
+    def index(self) -> SectionIndex:
+        """章节索引（首次访问时构建）"""
+        if self._index is None:
+            self._index = SectionIndex(self.content)
+        return self._index
+
+    @property
+    def sections(self) -> Mapping[str, str]:
+        """章节字典 {章节标题: 章节内容}"""
+        if self._sections is None:
+            self._sections = self.index.sections_dict()
+        return self._sections
+
+    @property
+    def lines(self) -> LineIndex:
+        """行偏移索引"""
+        if self._lines is None:
+            self._lines = LineIndex(self.content)
+        return self._lines
+
+
+class Rule:
+    """
+    验证规则基类
 
-    def validate_file(self, file_path: Path) -> Dict:
+    规则通过 patterns（键 -> 正则）和 literals（键 -> 字面量列表）声明自己关心的
+    文本，验证器在构造时把所有规则的模式编译成一个组合正则，整篇文档只扫描一次，
+    并把每个匹配分派给对应规则的 on_match。扫描结束后按注册顺序调用 finish 输出问题。
+
+    once 中的键只需要知道“是否出现过”，首次匹配后即从组合正则中移除，
+    因此高频字面量（如表格的 |）不会拖慢扫描。
+
+    section_scoped 的规则只读取章节字典，结果可以按章节哈希缓存：
+    只有 depends_on 的章节发生变化时才需要重新执行。
+
+    注意：
+        - 正则模式排在字面量之前匹配，字面量按长度从长到短匹配
+        - 分派时先按匹配文本查字面量，正则模式不应恰好匹配某个字面量
+        - 不同规则的模式不应在同一位置重叠，否则只有一个规则收到匹配
+    """
+
+    name = "rule"
+    patterns: Dict[str, str] = {}
+    literals: Dict[str, List[str]] = {}
+    once: frozenset = frozenset()
+    section_scoped = False
+
+    def signature(self) -> str:
+        """规则指纹的组成部分：类名、模式和实例配置"""
+        return repr((
+            type(self).__name__,
+            self.name,
+            sorted(self.patterns.items()),
+            sorted(self.literals.items()),
+            sorted(self.once),
+            sorted(vars(self).items()),
+        ))
+
+    def depends_on(self, title: str) -> bool:
+        """章节级规则是否读取该章节"""
+        return True
+
+    def start(self) -> Dict:
+        """创建单次扫描的状态"""
+        return {}
+
+    def on_match(self, state: Dict, key: str, match) -> None:
+        """处理一个匹配"""
+
+    def finish(self, state: Dict, doc: PRDDocument, ctx) -> None:
         """
-        验证PRD文件
+        扫描结束后输出问题
 
         Args:
-            file_path: PRD文件路径
+            state: 扫描状态
+            doc: 文档视图（内容、章节、行偏移索引）
+            ctx: 结果收集对象（提供 issues/warnings/suggestions 列表）
 
-        Returns:
-            Dict: 验证结果
+        有位置的问题应通过 doc.lines 附带 line 和 column 字段。
         """
-        logging.info(f"开始验证PRD: {file_path}")
-
-        # 读取文件
-        content = read_file(file_path)
 
-        # 解析章节
-        sections = parse_markdown_sections(content)
 
-        # 执行各项检查
-        self._validate_structure(sections)
-        self._validate_user_stories(content)
-        self._validate_metrics(content)
-        self._validate_placeholders(content)
-        self._validate_scope(sections)
+class StructureRule(Rule):
+    """必需章节检查"""
 
-        # 计算总分
-        self._calculate_score()
+    name = "structure"
+    section_scoped = True
 
-        # 生成报告
-        return self._generate_report()
+    def __init__(self, required_sections: List[str]):
+        self.required_sections = list(required_sections)
 
-    def _validate_structure(self, sections: Dict[str, str]) -> None:
-        """验证文档结构"""
-        required_sections = self._get_required_sections()
+    def depends_on(self, title: str) -> bool:
+        return title in self.required_sections
 
-        for section in required_sections:
+    def finish(self, state: Dict, doc: PRDDocument, ctx) -> None:
+        sections = doc.sections
+        for section in self.required_sections:
             if section not in sections:
-                self.issues.append({
+                ctx.issues.append({
                     "type": "structure",
                     "severity": "error",
                     "message": f"缺少必需章节: {section}"
                 })
             elif not sections[section].strip():
-                self.warnings.append({
+                ctx.warnings.append({
                     "type": "structure",
                     "severity": "warning",
                     "message": f"章节内容为空: {section}"
                 })
 
-    def _get_required_sections(self) -> List[str]:
-        """获取必需章节列表"""
-        if self.prd_type == "standard":
-            return [
-                "执行摘要",
-                "问题陈述",
-                "目标与目的",
-                "用户画像",
-                "用户故事与需求",
-                "成功指标",
-                "范围",
-                "技术考虑"
-            ]
-        elif self.prd_type == "lean":
-            return [
-                "问题",
-                "解决方案",
-                "用户故事",
-                "成功指标",
-                "范围"
-            ]
-        elif self.prd_type == "onepager":
-            return [
-                "概述",
-                "核心需求",
-                "成功标准",
-                "时间线"
-            ]
-        elif self.prd_type == "technical":
-            return [
-                "技术背景",
-                "架构设计",
-                "API规范",
-                "数据模型",
-                "性能要求"
-            ]
-        elif self.prd_type == "design":
-            return [
-                "设计目标",
-                "用户研究",
-                "用户体验流程",
-                "视觉设计要求",
-                "交互设计"
-            ]
-        else:
-            return []
-
-    def _validate_user_stories(self, content: str) -> None:
-        """验证用户故事格式"""
-        # 查找用户故事
-        story_pattern = r'(?:####|###)\s*用户故事\s*#?\d+[：:]\s*(.+?)(?=(?:####|###)|$)'
-        stories = re.finditer(story_pattern, content, re.DOTALL)
-
-        story_count = 0
-        for match in stories:
-            story_count += 1
-            story_content = match.group(1)
-
-            # 检查格式
-            has_as = "作为" in story_content or "**作为**" in story_content
-            has_want = "我想要" in story_content or "**我想要**" in story_content
-            has_so = "以便" in story_content or "**以便**" in story_content
-
-            if not (has_as and has_want and has_so):
-                self.issues.append({
+
+class UserStoryRule(Rule):
+    """
+    用户故事格式检查
+
+    故事块取自章节索引：标题（3级及以下）以“用户故事 N：”开头的章节，到下一个
+    同级或更高级的标题（或下一个故事）为止。故事内部更深层的标题（如
+    ##### 验收标准）不会截断故事，代码块中的 # 行也不是标题。每个故事块只做
+    几次子串查找，总耗时与文档长度成线性关系。
+    """
+
+    name = "user_story"
+    story_heading = re.compile(r'用户故事\s*#?\d+[：:]')
+    min_level = 3
+    markers = {
+        "as": "作为",
+        "want": "我想要",
+        "so": "以便",
+        "criteria": "验收标准",
+    }
+    checkbox = "- [ ]"
+
+    def stories(self, doc: PRDDocument) -> List[Tuple[int, int]]:
+        """
+        查找用户故事块
+
+        Args:
+            doc: 文档视图
+
+        Returns:
+            List[Tuple[int, int]]: 按文档顺序排列的 (起始偏移, 结束偏移)
+        """
+        headings = [
+            section for section in doc.index.sections
+            if section.level >= self.min_level and self.story_heading.match(section.title)
+        ]
+        # 嵌套在上一个故事中的故事截断上一个故事，故事块互不重叠
+        ends = [heading.start for heading in headings[1:]] + [len(doc.content)]
+        return [(heading.start, min(heading.end, end)) for heading, end in zip(headings, ends)]
+
+    def finish(self, state: Dict, doc: PRDDocument, ctx) -> None:
+        content = doc.content
+        stories = self.stories(doc)
+        for story_count, (start, end) in enumerate(stories, 1):
+            block = content[start:end]
+            markers = {key for key, word in self.markers.items() if word in block}
+            checkboxes = block.count(self.checkbox)
+            if len(markers) == len(self.markers) and checkboxes >= 3:
+                continue
+            # 只为有问题的故事定位行号，格式正确的故事不需要构建行索引
+            line_num, column = doc.lines.position(start)
+
+            if not {"as", "want", "so"} <= markers:
+                ctx.issues.append({
                     "type": "user_story",
                     "severity": "error",
-                    "message": f"用户故事 #{story_count} 格式不正确，缺少标准格式（作为...我想要...以便...）"
+                    "message": f"用户故事 #{story_count} 格式不正确，缺少标准格式（作为...我想要...以便...）",
+                    "line": line_num,
+                    "column": column
                 })
 
-            # 检查验收标准
-            if "验收标准" not in story_content:
-                self.warnings.append({
+            if "criteria" not in markers:
+                ctx.warnings.append({
                     "type": "user_story",
                     "severity": "warning",
-                    "message": f"用户故事 #{story_count} 缺少验收标准"
+                    "message": f"用户故事 #{story_count} 缺少验收标准",
+                    "line": line_num,
+                    "column": column
                 })
-            else:
-                # 统计验收标准数量
-                criteria_count = story_content.count("- [ ]")
-                if criteria_count < 3:
-                    self.warnings.append({
-                        "type": "user_story",
-                        "severity": "warning",
-                        "message": f"用户故事 #{story_count} 验收标准不足（建议3-5个，当前{criteria_count}个）"
-                    })
-
-        if story_count == 0:
-            self.warnings.append({
+            elif checkboxes < 3:
+                ctx.warnings.append({
+                    "type": "user_story",
+                    "severity": "warning",
+                    "message": f"用户故事 #{story_count} 验收标准不足（建议3-5个，当前{checkboxes}个）",
+                    "line": line_num,
+                    "column": column
+                })
+
+        if not stories:
+            ctx.warnings.append({
                 "type": "user_story",
                 "severity": "warning",
                 "message": "未找到用户故事"
             })
 
-    def _validate_metrics(self, content: str) -> None:
-        """验证成功指标"""
-        # 检查是否有指标表格
-        has_metrics_table = "|" in content and ("指标" in content or "目标" in content)
 
-        if not has_metrics_table:
-            self.warnings.append({
+class MetricsRule(Rule):
+    """成功指标检查"""
+
+    name = "metrics"
+    literals = {
+        "table": ["|"],
+        "metric": ["指标", "目标"],
+        "vague": ["提升", "改善", "优化", "增加", "减少"],
+        "percent": ["%"],
+        "framework": ["AARRR", "HEART", "北极星", "OKR"],
+    }
+    once = frozenset(literals)
+
+    def start(self) -> Dict:
+        return {"seen": set()}
+
+    def on_match(self, state: Dict, key: str, match) -> None:
+        state["seen"].add(key)
+
+    def finish(self, state: Dict, doc: PRDDocument, ctx) -> None:
+        seen = state["seen"]
+
+        # 检查是否有指标表格
+        if not {"table", "metric"} <= seen:
+            ctx.warnings.append({
                 "type": "metrics",
                 "severity": "warning",
                 "message": "未找到成功指标表格"
@@ -182,60 +266,78 @@ class PRDValidator:
             return
 
         # 检查指标是否具体
-        vague_terms = ["提升", "改善", "优化", "增加", "减少"]
-        for term in vague_terms:
-            if term in content and "%" not in content:
-                self.suggestions.append({
-                    "type": "metrics",
-                    "severity": "info",
-                    "message": f"指标描述可能不够具体，建议使用具体数值（如：提升50%）"
-                })
-                break
+        if "vague" in seen and "percent" not in seen:
+            ctx.suggestions.append({
+                "type": "metrics",
+                "severity": "info",
+                "message": "指标描述可能不够具体，建议使用具体数值（如：提升50%）"
+            })
 
         # 检查是否有指标框架
-        frameworks = ["AARRR", "HEART", "北极星", "OKR"]
-        has_framework = any(fw in content for fw in frameworks)
-
-        if not has_framework:
-            self.suggestions.append({
+        if "framework" not in seen:
+            ctx.suggestions.append({
                 "type": "metrics",
                 "severity": "info",
                 "message": "建议使用成功指标框架（AARRR、HEART、北极星指标或OKRs）"
             })
 
-    def _validate_placeholders(self, content: str) -> None:
-        """检查占位符文本"""
-        placeholders = [
-            r'\[待定\]',
-            r'\[TODO\]',
-            r'\[TBD\]',
-            r'\[待补充\]',
-            r'\[待确认\]',
-            r'\[日期\]',
-            r'\[姓名\]',
-            r'\[描述\]',
-            r'\[数值\]'
-        ]
 
-        for placeholder in placeholders:
-            matches = re.finditer(placeholder, content)
-            for match in matches:
-                # 找到占位符所在行号
-                line_num = content[:match.start()].count('\n') + 1
-                self.warnings.append({
-                    "type": "placeholder",
-                    "severity": "warning",
-                    "message": f"第{line_num}行发现占位符: {match.group()}",
-                    "line": line_num
-                })
+class PlaceholderRule(Rule):
+    """占位符文本检查"""
+
+    name = "placeholder"
+    literals = {
+        "placeholder": [
+            "[待定]",
+            "[TODO]",
+            "[TBD]",
+            "[待补充]",
+            "[待确认]",
+            "[日期]",
+            "[姓名]",
+            "[描述]",
+            "[数值]",
+        ],
+    }
+
+    def start(self) -> Dict:
+        return {"matches": []}
+
+    def on_match(self, state: Dict, key: str, match) -> None:
+        state["matches"].append((match.start(), match.group()))
+
+    def finish(self, state: Dict, doc: PRDDocument, ctx) -> None:
+        # 与原先逐个占位符扫描的报告顺序一致：先按占位符种类，再按位置
+        order = {text: index for index, text in enumerate(self.literals["placeholder"])}
+        matches = sorted(state["matches"], key=lambda item: (order[item[1]], item[0]))
+        for start, text in matches:
+            # 通过行偏移索引定位占位符
+            line_num, column = doc.lines.position(start)
+            ctx.warnings.append({
+                "type": "placeholder",
+                "severity": "warning",
+                "message": f"第{line_num}行发现占位符: {text}",
+                "line": line_num,
+                "column": column
+            })
+
+
+class ScopeRule(Rule):
+    """范围定义检查"""
 
-    def _validate_scope(self, sections: Dict[str, str]) -> None:
-        """验证范围定义"""
-        scope_keywords = ["范围", "包含", "不包含"]
-        has_scope = any(keyword in sections for keyword in scope_keywords)
+    name = "scope"
+    section_scoped = True
+    scope_keywords = ["范围", "包含", "不包含"]
+
+    def depends_on(self, title: str) -> bool:
+        return title in self.scope_keywords or "范围" in title
+
+    def finish(self, state: Dict, doc: PRDDocument, ctx) -> None:
+        sections = doc.sections
+        has_scope = any(keyword in sections for keyword in self.scope_keywords)
 
         if not has_scope:
-            self.warnings.append({
+            ctx.warnings.append({
                 "type": "scope",
                 "severity": "warning",
                 "message": "未找到范围定义章节"
@@ -250,24 +352,172 @@ class PRDValidator:
                 break
 
         if "不包含" not in scope_content and "不在范围" not in scope_content:
-            self.suggestions.append({
+            ctx.suggestions.append({
                 "type": "scope",
                 "severity": "info",
                 "message": "建议明确说明不包含在范围内的功能，防止范围蔓延"
             })
 
-    def _calculate_score(self) -> None:
-        """计算总分"""
-        # 每个错误扣10分
-        self.score -= len(self.issues) * 10
 
-        # 每个警告扣5分
-        self.score -= len(self.warnings) * 5
+# 各PRD类型的必需章节
+REQUIRED_SECTIONS = {
+    "standard": [
+        "执行摘要",
+        "问题陈述",
+        "目标与目的",
+        "用户画像",
+        "用户故事与需求",
+        "成功指标",
+        "范围",
+        "技术考虑"
+    ],
+    "lean": [
+        "问题",
+        "解决方案",
+        "用户故事",
+        "成功指标",
+        "范围"
+    ],
+    "onepager": [
+        "概述",
+        "核心需求",
+        "成功标准",
+        "时间线"
+    ],
+    "technical": [
+        "技术背景",
+        "架构设计",
+        "API规范",
+        "数据模型",
+        "性能要求"
+    ],
+    "design": [
+        "设计目标",
+        "用户研究",
+        "用户体验流程",
+        "视觉设计要求",
+        "交互设计"
+    ],
+}
+
+# 规则分组（命令行 --sections 的取值）-> 规则名称
+RULE_GROUPS = {
+    "structure": ("structure",),
+    "user-stories": ("user_story",),
+    "metrics": ("metrics",),
+    "placeholders": ("placeholder",),
+    "scope": ("scope",),
+}
+
+# 规则分组的别名
+_RULE_GROUP_ALIASES = {
+    "sections": "structure",
+    "user-story": "user-stories",
+    "stories": "user-stories",
+    "placeholder": "placeholders",
+}
+
+
+def resolve_rule_names(groups: Iterable[str]) -> List[str]:
+    """
+    把规则分组解析为规则名称
+
+    Args:
+        groups: 规则分组，如 ["user-stories", "metrics"]（不区分大小写，下划线等同于连字符）
+
+    Returns:
+        List[str]: 规则名称（去重，保持顺序）
+
+    Raises:
+        ValueError: 未知的规则分组
+    """
+    names = []
+    for group in groups:
+        key = group.strip().lower().replace("_", "-")
+        if not key:
+            continue
+        key = _RULE_GROUP_ALIASES.get(key, key)
+        if key not in RULE_GROUPS:
+            raise ValueError(f"未知的验证分组: {group}（可选: {', '.join(RULE_GROUPS)}）")
+        names.extend(RULE_GROUPS[key])
+    return list(dict.fromkeys(names))
+
+
+# 规则注册表: [(规则, 适用的PRD类型；None表示全部类型)]，按注册顺序输出问题
+RULES: List[Tuple[Rule, Optional[Tuple[str, ...]]]] = []
+
+
+def register_rule(rule: Rule, prd_types: Optional[List[str]] = None) -> None:
+    """
+    注册验证规则
+
+    Args:
+        rule: 规则实例
+        prd_types: 适用的PRD类型，None表示全部类型
+    """
+    RULES.append((rule, tuple(prd_types) if prd_types is not None else None))
+
+
+for _prd_type, _sections in REQUIRED_SECTIONS.items():
+    register_rule(StructureRule(_sections), prd_types=[_prd_type])
+register_rule(UserStoryRule())
+register_rule(MetricsRule())
+register_rule(PlaceholderRule())
+register_rule(ScopeRule())
+
+
+@lru_cache(maxsize=256)
+def _compile_branches(branches: Tuple, excluded: frozenset):
+    """
+    编译组合正则
+
+    Args:
+        branches: 分支元组 ((规则序号, 键, 正则片段), ...)
+        excluded: 需要排除的 (规则序号, 键)
+
+    Returns:
+        组合正则，没有分支时返回None
+    """
+    alternatives = [
+        fragment for index, key, fragment in branches
+        if (index, key) not in excluded
+    ]
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives))
+
+
+class _Findings:
+    """单个规则输出的问题"""
+
+    def __init__(self, issues=None, warnings=None, suggestions=None):
+        self.issues = issues or []
+        self.warnings = warnings or []
+        self.suggestions = suggestions or []
+
+    def to_dict(self) -> Dict:
+        return {
+            "issues": self.issues,
+            "warnings": self.warnings,
+            "suggestions": self.suggestions
+        }
+
+
+class ValidationResult(_Findings):
+    """单次验证的结果，汇总各规则的问题并计算总分"""
+
+    def add(self, findings: _Findings) -> None:
+        """合并一个规则的问题"""
+        self.issues.extend(findings.issues)
+        self.warnings.extend(findings.warnings)
+        self.suggestions.extend(findings.suggestions)
 
-        # 确保分数不低于0
-        self.score = max(0, self.score)
+    @property
+    def score(self) -> int:
+        """总分：每个错误扣10分，每个警告扣5分，不低于0"""
+        return max(0, 100 - len(self.issues) * 10 - len(self.warnings) * 5)
 
-    def _generate_report(self) -> Dict:
+    def to_report(self) -> Dict:
         """生成验证报告"""
         return {
             "score": self.score,
@@ -281,6 +531,275 @@ class PRDValidator:
             }
         }
 
+
+def hash_sections(sections: Mapping[str, str]) -> List[List[str]]:
+    """
+    计算章节哈希
+
+    Args:
+        sections: 章节字典
+
+    Returns:
+        List[List[str]]: 按文档顺序排列的 [章节标题, 内容SHA-256]
+    """
+    return [
+        [title, hashlib.sha256(body.encode("utf-8")).hexdigest()]
+        for title, body in sections.items()
+    ]
+
+
+class PRDValidator:
+    """
+    PRD文档验证器
+
+    验证器只持有构造时编译好的不可变规则，每次验证的结果保存在独立的
+    ValidationResult 中，因此同一个实例可以重复使用，也可以在线程池或
+    asyncio 执行器中并发调用。
+    """
+
+    def __init__(self, prd_type: str = "standard", cache=None, rules: Optional[Iterable[str]] = None):
+        """
+        初始化验证器
+
+        Args:
+            prd_type: PRD类型 (standard/lean/onepager/technical/design)
+            cache: 验证缓存（ValidationCache），None表示不缓存
+            rules: 只执行这些规则（规则名称，见 resolve_rule_names），None表示全部规则；
+                组合正则只包含所选规则的模式，用不到的解析（如章节切分）也会跳过
+        """
+        self.prd_type = prd_type
+        self.cache = cache
+
+        selected = None if rules is None else frozenset(rules)
+        self._rules = tuple(
+            rule for rule, prd_types in RULES
+            if (prd_types is None or prd_type in prd_types)
+            and (selected is None or rule.name in selected)
+        )
+
+        # 组合正则的分支: (规则序号, 键, 正则片段)，正则模式在前，字面量按长度降序
+        patterns = []
+        self._literals = {}
+        literal_branches = []
+        for index, rule in enumerate(self._rules):
+            for key, pattern in rule.patterns.items():
+                patterns.append((index, key, re.compile(pattern)))
+            for key, words in rule.literals.items():
+                for word in words:
+                    self._literals[word] = (index, key)
+                    literal_branches.append((index, key, re.escape(word)))
+        literal_branches.sort(key=lambda branch: len(branch[2]), reverse=True)
+
+        self._patterns = tuple(patterns)
+        self._branches = tuple(
+            [(index, key, pattern.pattern) for index, key, pattern in patterns]
+            + literal_branches
+        )
+        self._once = frozenset(
+            (index, key) for index, rule in enumerate(self._rules) for key in rule.once
+        )
+
+        self.fingerprint = hashlib.sha256(json.dumps(
+            [RULESET_VERSION, prd_type] + [rule.signature() for rule in self._rules],
+            ensure_ascii=False
+        ).encode("utf-8")).hexdigest()
+
+    @property
+    def rule_names(self) -> List[str]:
+        """本验证器执行的规则名称（即问题类型，按注册顺序）"""
+        return list(dict.fromkeys(rule.name for rule in self._rules))
+
+    def validate_file(self, file_path: Path) -> Dict:
+        """
+        验证PRD文件
+
+        Args:
+            file_path: PRD文件路径
+
+        Returns:
+            Dict: 验证结果
+        """
+        logging.info(f"开始验证PRD: {file_path}")
+
+        # 读取文件
+        content = read_file(file_path)
+
+        if self.cache is None:
+            return self.validate_content(content)
+
+        return self._validate_cached(content, Path(file_path))
+
+    def validate_content(self, content: str) -> Dict:
+        """
+        验证PRD内容（不经过缓存）
+
+        Args:
+            content: PRD文档内容
+
+        Returns:
+            Dict: 验证结果
+        """
+        result, _ = self._run_rules(PRDDocument(content))
+        return result.to_report()
+
+    def validate_many(self, file_paths: Iterable[Union[str, Path]]) -> Iterator[Tuple[Path, Dict]]:
+        """
+        逐个验证多个PRD文件
+
+        复用同一组已编译的规则，按需（惰性）生成结果。
+
+        Args:
+            file_paths: PRD文件路径的可迭代对象
+
+        Yields:
+            Tuple[Path, Dict]: (文件路径, 验证结果)
+        """
+        for file_path in file_paths:
+            file_path = Path(file_path)
+            yield file_path, self.validate_file(file_path)
+
+    def _validate_cached(self, content: str, file_path: Path) -> Dict:
+        """
+        通过缓存验证
+
+        内容未变化时直接返回缓存的报告；同一文件的部分章节变化时，
+        章节级规则只在其依赖的章节变化时重新执行。
+        """
+        key = self.cache.make_key(content, self.prd_type, self.fingerprint)
+        report = self.cache.get(key)
+        if report is not None:
+            logging.debug(f"验证缓存命中: {file_path}")
+            return report
+
+        doc = PRDDocument(content)
+        if any(rule.section_scoped for rule in self._rules):
+            section_hashes = hash_sections(doc.sections)
+            reuse = self._reusable_findings(
+                self.cache.get_sections(str(file_path.resolve()), self.fingerprint),
+                section_hashes
+            )
+        else:
+            # 没有章节级规则时不切分章节
+            section_hashes = []
+            reuse = {}
+        result, findings = self._run_rules(doc, reuse)
+        report = result.to_report()
+
+        self.cache.put(
+            key,
+            str(file_path.resolve()),
+            self.fingerprint,
+            report,
+            {
+                "hashes": section_hashes,
+                "findings": {
+                    str(index): findings[index].to_dict()
+                    for index, rule in enumerate(self._rules) if rule.section_scoped
+                }
+            }
+        )
+        return report
+
+    def _reusable_findings(self, previous: Optional[Dict], section_hashes: List[List[str]]) -> Dict:
+        """
+        找出章节未变化、可以复用上次结果的章节级规则
+
+        Args:
+            previous: 同一文件上次缓存的章节状态
+            section_hashes: 当前章节哈希
+
+        Returns:
+            Dict: {规则序号: _Findings}
+        """
+        if not previous:
+            return {}
+
+        old_hashes = previous["hashes"]
+        old_titles = [title for title, _ in old_hashes]
+        new_titles = [title for title, _ in section_hashes]
+        if old_titles != new_titles and sorted(old_titles) == sorted(new_titles):
+            # 仅章节顺序变化时无法判断依赖，全部重新执行
+            return {}
+
+        changed = set(dict(map(tuple, old_hashes)).items()) ^ set(dict(map(tuple, section_hashes)).items())
+        changed_titles = {title for title, _ in changed}
+
+        reuse = {}
+        for index, rule in enumerate(self._rules):
+            stored = previous["findings"].get(str(index))
+            if not rule.section_scoped or stored is None:
+                continue
+            if not any(rule.depends_on(title) for title in changed_titles):
+                reuse[index] = _Findings(**stored)
+        if reuse:
+            self.cache.record_partial()
+        return reuse
+
+    def _run_rules(
+        self,
+        doc: PRDDocument,
+        reuse: Optional[Dict] = None
+    ) -> Tuple[ValidationResult, List[_Findings]]:
+        """
+        扫描一次文档并把匹配分派给各规则
+
+        Args:
+            doc: 文档视图
+            reuse: 可直接复用结果的规则 {规则序号: _Findings}
+
+        Returns:
+            Tuple: (汇总结果, 按规则顺序排列的各规则问题)
+        """
+        reuse = reuse or {}
+        content = doc.content
+        rules = self._rules
+        states = [rule.start() for rule in rules]
+        literals = self._literals
+        once = self._once
+        done = set()
+
+        pattern = _compile_branches(self._branches, frozenset())
+        pos = 0
+        while pattern is not None:
+            for match in pattern.finditer(content, pos):
+                target = literals.get(match.group())
+                if target is None:
+                    target = self._classify(match)
+                index, key = target
+                rules[index].on_match(states[index], key, match)
+
+                if target in once and target not in done:
+                    # 只关心是否出现的键：移除后从当前位置继续扫描
+                    done.add(target)
+                    pattern = _compile_branches(self._branches, frozenset(done))
+                    pos = match.end()
+                    break
+            else:
+                break
+
+        result = ValidationResult()
+        findings = []
+        for index, (rule, state) in enumerate(zip(rules, states)):
+            rule_findings = reuse.get(index)
+            if rule_findings is None:
+                rule_findings = _Findings()
+                rule.finish(state, doc, rule_findings)
+            findings.append(rule_findings)
+            result.add(rule_findings)
+
+        return result, findings
+
+    def _classify(self, match) -> Tuple[int, str]:
+        """确定非字面量匹配所属的正则模式"""
+        for index, key, pattern in self._patterns:
+            if pattern.match(match.string, match.start()) is not None:
+                return index, key
+        raise RuntimeError(f"无法分派的匹配: {match.group()!r}")
+
+    def _get_required_sections(self) -> List[str]:
+        """获取必需章节列表"""
+        return list(REQUIRED_SECTIONS.get(self.prd_type, []))
+
     def print_report(self, report: Dict) -> None:
         """打印验证报告"""
         print("\n" + "=" * 60)
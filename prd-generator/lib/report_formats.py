@@ -0,0 +1,287 @@
+"""
+Report Formats - 验证报告的机器可读输出格式
+
+各格式的写入器按文件逐条写出结果，不在内存中累积整个批次，批量验证时可以
+直接流式写入输出文件：
+
+    with get_writer("sarif", stream) as writer:
+        for result in results:
+            writer.write(result)
+
+result 为带文件路径的验证报告（{"file": ..., **report}），验证失败时为
+{"file": ..., "error": ...}。
+"""
+
+import json
+from pathlib import Path
+from urllib.parse import quote
+from typing import Dict, IO, Iterable, List, Optional
+
+# 报告中的问题级别
+LEVELS = ("issues", "warnings", "suggestions")
+
+# 问题级别 -> SARIF 级别
+SARIF_LEVELS = {"issues": "error", "warnings": "warning", "suggestions": "note"}
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+# XML 转义（xml.sax.saxutils 会导入 urllib.request，拖慢 validate_prd.py 的启动）
+_XML_TEXT = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_XML_ATTR = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"
+})
+
+
+def group_findings(report: Dict) -> Dict[str, Dict[str, List[Dict]]]:
+    """
+    按问题类型分组（一次遍历）
+
+    Args:
+        report: 验证报告
+
+    Returns:
+        Dict: {问题类型: {"issues": [...], "warnings": [...], "suggestions": [...]}}，
+            类型按首次出现的顺序排列
+    """
+    grouped: Dict[str, Dict[str, List[Dict]]] = {}
+    for level in LEVELS:
+        for finding in report.get(level, ()):
+            group = grouped.get(finding["type"])
+            if group is None:
+                group = grouped[finding["type"]] = {"issues": [], "warnings": [], "suggestions": []}
+            group[level].append(finding)
+    return grouped
+
+
+class ReportWriter:
+    """报告写入器基类"""
+
+    def __init__(self, stream: IO[str]):
+        """
+        初始化写入器
+
+        Args:
+            stream: 输出流
+        """
+        self.stream = stream
+        self.count = 0
+
+    def __enter__(self) -> "ReportWriter":
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end()
+
+    def begin(self) -> None:
+        """写入开头"""
+
+    def write(self, result: Dict) -> None:
+        """写入一个文件的结果"""
+        self._write(result)
+        self.count += 1
+
+    def end(self) -> None:
+        """写入结尾"""
+        self.stream.flush()
+
+    def _write(self, result: Dict) -> None:
+        raise NotImplementedError
+
+
+class JsonLinesWriter(ReportWriter):
+    """JSON Lines：每个文件一行"""
+
+    def _write(self, result: Dict) -> None:
+        self.stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+class JsonWriter(ReportWriter):
+    """JSON：所有文件的结果组成一个数组"""
+
+    def begin(self) -> None:
+        self.stream.write("[")
+
+    def _write(self, result: Dict) -> None:
+        self.stream.write(("," if self.count else "") + "\n  " + json.dumps(result, ensure_ascii=False))
+
+    def end(self) -> None:
+        self.stream.write("\n]\n" if self.count else "]\n")
+        super().end()
+
+
+class SarifWriter(ReportWriter):
+    """
+    SARIF 2.1.0（GitHub 代码扫描等工具使用的静态分析结果格式）
+
+    每个问题是一个 result，问题类型作为 ruleId；无法验证的文件记录为
+    执行通知。结果先于工具信息写出，规则列表在结尾根据出现过的类型生成。
+    """
+
+    def __init__(self, stream: IO[str], tool_name: str = "prd-validator", tool_version: Optional[str] = None):
+        super().__init__(stream)
+        self.tool_name = tool_name
+        self.tool_version = tool_version
+        self._rules: Dict[str, None] = {}
+        self._notifications: List[Dict] = []
+        self._results = 0
+
+    def begin(self) -> None:
+        self.stream.write(
+            '{"$schema": ' + json.dumps(SARIF_SCHEMA) + ', "version": "2.1.0", "runs": [{"results": ['
+        )
+
+    def _write(self, result: Dict) -> None:
+        uri = _artifact_uri(result["file"])
+        if "error" in result:
+            self._notifications.append({
+                "level": "error",
+                "message": {"text": f"{result['file']}: {result['error']}"},
+                "locations": [{"physicalLocation": {"artifactLocation": {"uri": uri}}}]
+            })
+            return
+
+        for level in LEVELS:
+            for finding in result.get(level, ()):
+                self._rules[finding["type"]] = None
+                location = {"artifactLocation": {"uri": uri}}
+                if "line" in finding:
+                    location["region"] = {"startLine": finding["line"], "startColumn": finding.get("column", 1)}
+                sarif_result = {
+                    "ruleId": finding["type"],
+                    "level": SARIF_LEVELS[level],
+                    "message": {"text": finding["message"]},
+                    "locations": [{"physicalLocation": location}]
+                }
+                self.stream.write(("," if self._results else "") + "\n" + json.dumps(sarif_result, ensure_ascii=False))
+                self._results += 1
+
+    def end(self) -> None:
+        driver = {"name": self.tool_name, "rules": [{"id": rule, "name": rule} for rule in self._rules]}
+        if self.tool_version:
+            driver["version"] = self.tool_version
+        invocation = {
+            "executionSuccessful": not self._notifications,
+            "toolExecutionNotifications": self._notifications
+        }
+        self.stream.write(
+            "\n], \"tool\": {\"driver\": " + json.dumps(driver, ensure_ascii=False)
+            + "}, \"invocations\": [" + json.dumps(invocation, ensure_ascii=False) + "]}]}\n"
+        )
+        super().end()
+
+
+class JUnitWriter(ReportWriter):
+    """
+    JUnit XML（CI 测试报告格式）
+
+    每个文件一个 testsuite，每个问题类型一个 testcase：有错误（issues）时
+    记为 failure，警告和建议写入 system-out；无法验证的文件记为 error。
+    """
+
+    def __init__(self, stream: IO[str], categories: Iterable[str] = ()):
+        """
+        初始化写入器
+
+        Args:
+            stream: 输出流
+            categories: 每个文件都输出的问题类型（没有问题时记为通过）
+        """
+        super().__init__(stream)
+        self.categories = list(categories)
+
+    def begin(self) -> None:
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="prd-validator">\n')
+
+    def _write(self, result: Dict) -> None:
+        name = _quoteattr(result["file"])
+        if "error" in result:
+            self.stream.write(
+                f'  <testsuite name={name} tests="1" failures="0" errors="1">\n'
+                f'    <testcase classname={name} name="validate">\n'
+                f'      <error message={_quoteattr(str(result["error"]))}/>\n'
+                f'    </testcase>\n'
+                f'  </testsuite>\n'
+            )
+            return
+
+        grouped = group_findings(result)
+        categories = list(self.categories) + [category for category in grouped if category not in self.categories]
+        failures = sum(1 for category in categories if grouped.get(category, {}).get("issues"))
+
+        parts = [
+            f'  <testsuite name={name} tests="{len(categories)}" failures="{failures}" errors="0">\n'
+            f'    <properties><property name="score" value="{result.get("score", "")}"/></properties>\n'
+        ]
+        for category in categories:
+            group = grouped.get(category)
+            parts.append(f'    <testcase classname={name} name={_quoteattr(category)}')
+            if not group:
+                parts.append("/>\n")
+                continue
+            parts.append(">\n")
+            if group["issues"]:
+                messages = "\n".join(issue["message"] for issue in group["issues"])
+                parts.append(
+                    f'      <failure type={_quoteattr(category)} message={_quoteattr(group["issues"][0]["message"])}>'
+                    f"{_escape(messages)}</failure>\n"
+                )
+            notes = [f"警告: {finding['message']}" for finding in group["warnings"]]
+            notes += [f"建议: {finding['message']}" for finding in group["suggestions"]]
+            if notes:
+                parts.append(f"      <system-out>{_escape(chr(10).join(notes))}</system-out>\n")
+            parts.append("    </testcase>\n")
+        parts.append("  </testsuite>\n")
+        self.stream.write("".join(parts))
+
+    def end(self) -> None:
+        self.stream.write("</testsuites>\n")
+        super().end()
+
+
+# 格式名称 -> 写入器
+WRITERS = {
+    "json": JsonWriter,
+    "jsonl": JsonLinesWriter,
+    "sarif": SarifWriter,
+    "junit": JUnitWriter,
+}
+
+
+def get_writer(format_name: str, stream: IO[str], **options) -> ReportWriter:
+    """
+    创建报告写入器
+
+    Args:
+        format_name: 格式名称（json/jsonl/sarif/junit）
+        stream: 输出流
+        **options: 写入器的其他参数
+
+    Returns:
+        ReportWriter: 写入器
+
+    Raises:
+        ValueError: 未知的格式
+    """
+    writer_class = WRITERS.get(format_name)
+    if writer_class is None:
+        raise ValueError(f"未知的报告格式: {format_name}")
+    return writer_class(stream, **options)
+
+
+def _escape(text: str) -> str:
+    """转义 XML 文本"""
+    return text.translate(_XML_TEXT)
+
+
+def _quoteattr(text: str) -> str:
+    """转义 XML 属性值并加上引号"""
+    return '"' + text.translate(_XML_ATTR) + '"'
+
+
+def _artifact_uri(file: str) -> str:
+    """文件路径转换为 SARIF 中的URI（绝对路径为 file:// URI，相对路径保持相对）"""
+    path = Path(file)
+    if path.is_absolute():
+        return path.as_uri()
+    return quote(path.as_posix(), safe="/")
@@ -0,0 +1,281 @@
+"""
+Template Engine - PRD模板引擎
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+from .utils import get_template_path, read_file
+
+
+# 占位符：方括号中的非空文本（不跨行，不嵌套）
+SLOT_PATTERN = re.compile(r"\[([^\[\]\n]*[^\[\]\s][^\[\]\n]*)\]")
+
+# 列表占位行：列表标记（可带复选框）+ 以序号结尾的占位符，例如 "- [目标1]"、"- [ ] [标准2]"
+LIST_ITEM_PATTERN = re.compile(
+    r"^([ \t]*(?:[-*+]|\d+\.)[ \t]+(?:\[[ xX]\][ \t]+)?)\[([^\[\]\n]*?)(\d+)\][ \t]*\r?$",
+    re.MULTILINE
+)
+
+# 有序列表标记中的编号
+ORDERED_MARKER = re.compile(r"\d+\.")
+
+SlotValue = Union[str, Sequence[str]]
+
+
+class Slot:
+    """单个占位符，例如 [日期]；只填入字符串"""
+
+    __slots__ = ("name", "text")
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+
+    def render(self, value: SlotValue) -> str:
+        return value if isinstance(value, str) else self.text
+
+
+class ListSlot:
+    """
+    连续的编号列表占位行，例如:
+
+        - [目标1]
+        - [目标2]
+        - [目标3]
+
+    名称为去掉序号的部分（"目标"）；只填入列表，每项生成一行并沿用第一行的
+    列表标记（有序列表重新编号）。同名的单个占位符（[目标]）不受影响。
+    """
+
+    __slots__ = ("name", "marker", "text")
+
+    def __init__(self, name: str, marker: str, text: str):
+        self.name = name
+        self.marker = marker
+        self.text = text
+
+    def render(self, value: SlotValue) -> str:
+        if isinstance(value, str):
+            return self.text
+        if not ORDERED_MARKER.search(self.marker):
+            return "\n".join(f"{self.marker}{item}" for item in value)
+        # 有序列表重新编号
+        return "\n".join(
+            ORDERED_MARKER.sub(f"{number}.", self.marker, count=1) + str(item)
+            for number, item in enumerate(value, 1)
+        )
+
+
+class Template:
+    """
+    编译后的模板
+
+    模板只解析一次，拆成字面文本和占位符片段，并按名称索引占位符的位置。
+    渲染时复制片段列表，只改写有值的占位符，再一次拼接：耗时只与输出长度
+    和提供的值的数量有关，与模板中占位符的数量无关。
+    """
+
+    def __init__(self, text: str):
+        """
+        解析模板
+
+        Args:
+            text: 模板文本，占位符写作 [名称]
+        """
+        self.text = text
+        self.segments: List[Union[str, Slot, ListSlot]] = []
+        self._parse(text)
+
+        # 片段文本（占位符为原文，未提供值时保留）和名称 -> 占位符位置
+        self._parts = [segment if isinstance(segment, str) else segment.text for segment in self.segments]
+        self._positions: Dict[str, List[int]] = {}
+        for index, segment in enumerate(self.segments):
+            if not isinstance(segment, str):
+                self._positions.setdefault(segment.name, []).append(index)
+
+    @property
+    def slots(self) -> List[str]:
+        """模板中的占位符名称（按首次出现的顺序）"""
+        return list(self._positions)
+
+    def render(self, values: Dict[str, SlotValue]) -> str:
+        """
+        填充模板
+
+        Args:
+            values: 占位符名称 -> 内容；字符串填入单个占位符，
+                字符串列表填入列表占位；没有提供的占位符保留原文
+
+        Returns:
+            str: 填充后的内容
+        """
+        parts = self._parts[:]
+        segments = self.segments
+        for name, value in values.items():
+            positions = self._positions.get(name)
+            if positions is None or value is None:
+                continue
+            if isinstance(value, str):
+                for index in positions:
+                    if type(segments[index]) is Slot:
+                        parts[index] = value
+            else:
+                for index in positions:
+                    parts[index] = segments[index].render(value)
+        return "".join(parts)
+
+    def _parse(self, text: str) -> None:
+        position = 0
+        for start, end, group in _list_groups(text):
+            self._parse_inline(text[position:start])
+            name, marker = group
+            self.segments.append(ListSlot(name, marker, text[start:end]))
+            position = end
+        self._parse_inline(text[position:])
+
+    def _parse_inline(self, text: str) -> None:
+        position = 0
+        for match in SLOT_PATTERN.finditer(text):
+            if match.start() > position:
+                self.segments.append(text[position:match.start()])
+            self.segments.append(Slot(match.group(1), match.group(0)))
+            position = match.end()
+        if position < len(text):
+            self.segments.append(text[position:])
+
+
+def _list_groups(text: str):
+    """
+    查找编号连续（从1开始）、列表标记和名称相同的列表占位行
+
+    Yields:
+        Tuple: (起始位置, 结束位置（不含最后的换行符）, (名称, 列表标记))
+    """
+    # group: (起始位置, 结束位置, (名称, 第一行的列表标记), 当前序号, 不含空白的标记)
+    group = None
+    for match in LIST_ITEM_PATTERN.finditer(text):
+        marker, name, number = match.group(1), match.group(2), int(match.group(3))
+        # 标记中的空白（缩进、标记后的空格数）和有序列表的编号不同时仍视为同一组
+        key = ORDERED_MARKER.sub("1.", "".join(marker.split()))
+        if (group is not None and number == group[3] + 1 and name == group[2][0] and key == group[4]
+                and text[group[1]:match.start()] == "\n"):
+            group = (group[0], match.end(), group[2], number, key)
+            continue
+        if group is not None:
+            yield group[:3]
+            group = None
+        if number == 1:
+            group = (match.start(), match.end(), (name, marker), number, key)
+    if group is not None:
+        yield group[:3]
+
+
+def compile_template(text: str) -> Template:
+    """
+    编译模板
+
+    Args:
+        text: 模板文本
+
+    Returns:
+        Template: 编译后的模板
+    """
+    return Template(text)
+
+
+class TemplateCache:
+    """
+    进程内共享的模板缓存
+
+    按模板路径缓存编译后的模板，并记录文件的修改时间（mtime）。开启热加载时，
+    最多每 check_interval 秒检查一次文件，修改时间变化后重新编译；关闭时模板
+    加载后不再访问文件系统。所有 PRDGenerator 实例共用 template_cache。
+    """
+
+    def __init__(self, reload: bool = False, check_interval: float = 1.0):
+        """
+        初始化缓存
+
+        Args:
+            reload: 是否在模板文件变化后自动重新加载
+            check_interval: 热加载时检查文件的最小间隔（秒），0表示每次都检查
+        """
+        self.reload = reload
+        self.check_interval = check_interval
+        self.loads = 0
+
+        self._lock = threading.Lock()
+        # 模板名称 -> 路径
+        self._paths: Dict[str, Path] = {}
+        # 路径 -> (修改时间, 编译后的模板, 上次检查时间)
+        self._entries: Dict[Path, Tuple[int, Template, float]] = {}
+
+    def get(self, template_name: str) -> Template:
+        """
+        获取编译后的模板
+
+        Args:
+            template_name: 模板名称（references/ 下的文件名，如 'prd_template.md'）
+
+        Returns:
+            Template: 编译后的模板
+
+        Raises:
+            FileNotFoundError: 模板文件不存在
+        """
+        path = self._paths.get(template_name)
+        if path is not None:
+            entry = self._entries.get(path)
+            if entry is not None and (not self.reload or time.monotonic() - entry[2] < self.check_interval):
+                return entry[1]
+        else:
+            path = get_template_path(template_name)
+            self._paths[template_name] = path
+        return self._load(path)
+
+    def warm_up(self, template_names: Iterable[str]) -> int:
+        """
+        预先加载模板（服务启动时调用，避免第一次生成时读取文件）
+
+        Args:
+            template_names: 模板名称
+
+        Returns:
+            int: 加载的模板数量
+        """
+        count = 0
+        for template_name in template_names:
+            self.get(template_name)
+            count += 1
+        logging.info(f"已预加载 {count} 个PRD模板")
+        return count
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._paths.clear()
+            self._entries.clear()
+
+    def _load(self, path: Path) -> Template:
+        """检查修改时间，变化时（或第一次）编译模板"""
+        with self._lock:
+            mtime = os.stat(path).st_mtime_ns
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime:
+                template = entry[1]
+            else:
+                template = compile_template(read_file(path))
+                self.loads += 1
+                if entry is not None:
+                    logging.info(f"模板已更新，重新加载: {path.name}")
+            self._entries[path] = (mtime, template, time.monotonic())
+            return template
+
+
+# 进程内共享的模板缓存，TEMPLATE_RELOAD=true 时开启热加载
+template_cache = TemplateCache(reload=os.getenv("TEMPLATE_RELOAD", "").lower() in ("1", "true", "yes"))
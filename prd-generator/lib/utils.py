@@ -3,10 +3,14 @@ Utility functions for PRD Generator
 """
 
 import os
+import re
 import logging
+import itertools
+import threading
+from bisect import bisect_right
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Optional
-from dotenv import load_dotenv
+from typing import List, Optional, Tuple
 
 
 def get_plugin_root() -> Path:
@@ -34,6 +38,8 @@ def load_env(env_file: Optional[str] = None) -> None:
         env_file = plugin_root / ".env"
 
     if os.path.exists(env_file):
+        # 只在需要时导入 dotenv，不使用 .env 的调用方（如验证）不必加载
+        from dotenv import load_dotenv
         load_dotenv(env_file)
         logging.info(f"已加载环境变量: {env_file}")
     else:
@@ -121,6 +127,20 @@ def get_version_dir() -> Path:
     return path
 
 
+def get_cache_dir() -> Path:
+    """
+    获取缓存目录
+
+    Returns:
+        Path: 缓存目录路径
+    """
+    plugin_root = get_plugin_root()
+    cache_dir = os.getenv("CACHE_DIR", "outputs/.cache")
+    path = plugin_root / cache_dir
+    ensure_dir(path)
+    return path
+
+
 def sanitize_filename(filename: str) -> str:
     """
     清理文件名，移除不安全的字符
@@ -192,6 +212,35 @@ def write_file(
         raise
 
 
+def write_atomic(file_path: Path, data: bytes, fsync: bool = False) -> None:
+    """
+    原子写入文件
+
+    先写入同目录下的临时文件，再用 os.replace 替换目标文件，读取方要么看到
+    旧内容，要么看到完整的新内容，不会读到写了一半的文件。
+
+    Args:
+        file_path: 文件路径
+        data: 文件内容
+        fsync: 替换前是否把数据刷到磁盘
+    """
+    file_path = Path(file_path)
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 def get_template_path(template_name: str) -> Path:
     """
     获取模板文件路径
@@ -235,34 +284,296 @@ def parse_markdown_sections(content: str) -> dict:
     """
     解析Markdown文档的章节结构
 
+    以一级和二级标题分节（更深的标题属于所在章节的内容，代码块中的 # 行不是
+    标题）；标题重复时保留最后一个。需要位置信息、重复标题或更深层级时
+    使用 SectionIndex。
+
     Args:
         content: Markdown内容
 
     Returns:
         dict: 章节字典 {章节标题: 章节内容}
     """
-    sections = {}
-    current_section = None
-    current_content = []
-
-    for line in content.split('\n'):
-        # 检测一级标题
-        if line.startswith('# '):
-            if current_section:
-                sections[current_section] = '\n'.join(current_content)
-            current_section = line[2:].strip()
-            current_content = []
-        # 检测二级标题
-        elif line.startswith('## '):
-            if current_section:
-                sections[current_section] = '\n'.join(current_content)
-            current_section = line[3:].strip()
-            current_content = []
+    return dict(SectionIndex(content).sections_dict())
+
+
+class Section:
+    """
+    章节在原文中的位置
+
+    Attributes:
+        title: 标题文本
+        level: 标题级别（1-6）
+        start: 标题行起始偏移
+        body_start: 正文起始偏移（标题行之后）
+        end: 正文结束偏移（下一个同级或更高级标题之前的换行符，或文档末尾）
+    """
+
+    __slots__ = ("title", "level", "start", "body_start", "end")
+
+    def __init__(self, title: str, level: int, start: int, body_start: int, end: int):
+        self.title = title
+        self.level = level
+        self.start = start
+        self.body_start = body_start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Section({self.title!r}, level={self.level}, {self.start}:{self.end})"
+
+
+class SectionIndex:
+    """
+    章节索引
+
+    对文档做一次扫描，记录每个标题（1-6级，跳过代码块）的位置，章节内容
+    按需从原文切片，不复制整篇文档。索引只引用原文，不做全局缓存，由持有
+    文档的对象（如验证器的 PRDDocument）保存，随文档一起释放。
+    """
+
+    # ATX 标题行（"#" 后必须有空格）。以换行符开头而不用 ^ 锚定，正则引擎可以
+    # 直接跳到下一个换行符；第一行单独匹配
+    _HEADING = re.compile(r'\n(#{1,6}) ([^\n]*)')
+    # 代码块围栏行，或标题行
+    _LINE = re.compile(
+        r'\n(?:(?P<fence> {0,3}(?:`{3,}|~{3,}))(?P<info>[^\n]*)|(?P<hashes>#{1,6}) (?P<title>[^\n]*))'
+    )
+
+    def __init__(self, content: str):
+        """
+        初始化索引
+
+        Args:
+            content: 文档内容
+        """
+        self.content = content
+        self._sections: Optional[List[Section]] = None
+        self._outlines: dict = {}
+
+        # 标题: (标题, 级别, 标题行起始偏移, 正文起始偏移)
+        if '```' not in content and '~~~' not in content:
+            self._headings = self._scan(content)
         else:
-            current_content.append(line)
+            self._headings = self._scan_fenced(content)
+
+    @staticmethod
+    def _first_line(content: str) -> str:
+        """第一行（加上换行符前缀，以便用同一个正则匹配）"""
+        newline = content.find('\n')
+        return '\n' + (content if newline < 0 else content[:newline])
+
+    def _scan(self, content: str) -> List[Tuple[str, int, int, int]]:
+        """扫描标题"""
+        size = len(content)
+        headings = []
+        first = self._HEADING.match(self._first_line(content))
+        if first:
+            headings.append((first.group(2).strip(), len(first.group(1)), 0, min(first.end(), size)))
+        headings.extend(
+            (match.group(2).strip(), len(match.group(1)), match.start() + 1, min(match.end() + 1, size))
+            for match in self._HEADING.finditer(content)
+        )
+        return headings
+
+    def _scan_fenced(self, content: str) -> List[Tuple[str, int, int, int]]:
+        """扫描标题，跳过代码块中的行"""
+        headings = []
+        size = len(content)
+        fence = None
+        first = self._LINE.match(self._first_line(content))
+        matches = [(first, -1)] if first else []
+        for match, shift in itertools.chain(matches, ((match, 0) for match in self._LINE.finditer(content))):
+            marker = match.group('fence')
+            if marker is not None:
+                marker = marker.lstrip()
+                if fence is None:
+                    fence = marker
+                elif marker[0] == fence[0] and len(marker) >= len(fence) and not match.group('info').strip():
+                    fence = None
+            elif fence is None:
+                headings.append((
+                    match.group('title').strip(),
+                    len(match.group('hashes')),
+                    match.start() + 1 + shift,
+                    min(match.end() + 1 + shift, size)
+                ))
+        return headings
+
+    @property
+    def sections(self) -> List[Section]:
+        """所有标题（1-6级），每节包含其下更深层级的子章节"""
+        if self._sections is None:
+            sections: List[Section] = []
+            open_sections: List[Section] = []
+            size = len(self.content)
+            for title, level, start, body_start in self._headings:
+                # 结束同级和更低级的章节
+                while open_sections and open_sections[-1].level >= level:
+                    open_sections.pop().end = start - 1
+                section = Section(title, level, start, body_start, size)
+                sections.append(section)
+                open_sections.append(section)
+            self._sections = sections
+        return self._sections
+
+    def outline(self, max_level: int = 2) -> List[Section]:
+        """
+        按不超过 max_level 的标题分节
+
+        每节在下一个不超过 max_level 的标题处结束，更深的标题属于所在章节。
+
+        Args:
+            max_level: 最大标题级别
+
+        Returns:
+            List[Section]: 按文档顺序排列的章节
+        """
+        outline = self._outlines.get(max_level)
+        if outline is None:
+            headings = [heading for heading in self._headings if heading[1] <= max_level]
+            ends = [heading[2] - 1 for heading in headings[1:]] + [len(self.content)]
+            outline = [
+                Section(title, level, start, body_start, end)
+                for (title, level, start, body_start), end in zip(headings, ends)
+            ]
+            self._outlines[max_level] = outline
+        return outline
+
+    def find(self, title: str) -> List[Section]:
+        """
+        查找标题（包括重复的标题）
+
+        Args:
+            title: 标题文本
+
+        Returns:
+            List[Section]: 匹配的章节
+        """
+        return [section for section in self.sections if section.title == title]
+
+    def body(self, section: Section) -> str:
+        """
+        章节正文
+
+        Args:
+            section: 章节
+
+        Returns:
+            str: 正文（不含标题行）
+        """
+        return self.content[section.body_start:max(section.body_start, section.end)]
+
+    def sections_dict(self, max_level: int = 2) -> "SectionMap":
+        """
+        章节字典视图 {标题: 正文}，正文在访问时才切片
+
+        Args:
+            max_level: 最大标题级别
+
+        Returns:
+            SectionMap: 只读映射，标题重复时保留最后一个
+        """
+        return SectionMap(self, self.outline(max_level))
+
+
+class SectionMap(Mapping):
+    """章节标题到正文的只读映射（正文按需从原文切片）"""
+
+    def __init__(self, index: SectionIndex, sections: List[Section]):
+        self.index = index
+        self._sections = {}
+        for section in sections:
+            # 空标题只作为分隔；重复标题的位置取最后一个，顺序保持第一次出现的位置
+            if section.title:
+                self._sections[section.title] = section
+
+    def __getitem__(self, title: str) -> str:
+        return self.index.body(self._sections[title])
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def __contains__(self, title) -> bool:
+        return title in self._sections
+
+    def span(self, title: str) -> Section:
+        """章节位置"""
+        return self._sections[title]
+
+
+class LineIndex:
+    """
+    行偏移索引
 
-    # 保存最后一个章节
-    if current_section:
-        sections[current_section] = '\n'.join(current_content)
+    对文档中的换行符位置做一次扫描，之后按字符偏移二分查找行号和列号，
+    避免每次定位都重新扫描前缀。
+    """
 
-    return sections
+    _NEWLINE = re.compile(r'\n')
+
+    def __init__(self, content: str):
+        """
+        初始化索引
+
+        Args:
+            content: 文档内容
+        """
+        self.content = content
+        self._line_starts: Optional[List[int]] = None
+
+    @property
+    def line_starts(self) -> List[int]:
+        """每一行起始位置的字符偏移（首次访问时构建）"""
+        if self._line_starts is None:
+            starts = [0]
+            starts.extend(match.end() for match in self._NEWLINE.finditer(self.content))
+            self._line_starts = starts
+        return self._line_starts
+
+    @property
+    def line_count(self) -> int:
+        """总行数"""
+        return len(self.line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """
+        获取偏移所在行号
+
+        Args:
+            offset: 字符偏移
+
+        Returns:
+            int: 行号（从1开始）
+        """
+        return bisect_right(self.line_starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """
+        获取偏移对应的行号和列号
+
+        Args:
+            offset: 字符偏移
+
+        Returns:
+            Tuple[int, int]: (行号, 列号)，均从1开始
+        """
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def line_span(self, line: int) -> Tuple[int, int]:
+        """
+        获取行的字符偏移范围
+
+        Args:
+            line: 行号（从1开始）
+
+        Returns:
+            Tuple[int, int]: (起始偏移, 结束偏移)，不含换行符
+        """
+        starts = self.line_starts
+        start = starts[line - 1]
+        end = starts[line] - 1 if line < len(starts) else len(self.content)
+        return start, end
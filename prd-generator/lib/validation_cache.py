@@ -0,0 +1,202 @@
+"""
+Validation Cache - PRD验证结果缓存
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from .utils import get_cache_dir, ensure_dir
+
+
+class ValidationCache:
+    """
+    基于SQLite的验证结果缓存
+
+    缓存键由文件内容的SHA-256、PRD类型和规则集指纹组成，内容未变化时直接返回
+    缓存的报告。每条记录同时保存章节哈希和章节级规则的结果，供同一文件部分
+    编辑后复用。条目数量超过上限时按最近访问时间（LRU）淘汰。
+    """
+
+    DB_NAME = "validation.sqlite3"
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: int = 10000):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录，None时使用 CACHE_DIR（默认 outputs/.cache）
+            max_entries: 最大缓存条目数
+        """
+        if cache_dir is None:
+            cache_dir = get_cache_dir()
+        else:
+            cache_dir = Path(cache_dir)
+            ensure_dir(cache_dir)
+
+        self.db_path = cache_dir / self.DB_NAME
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.partial_hits = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            "key TEXT PRIMARY KEY, "
+            "path TEXT NOT NULL, "
+            "fingerprint TEXT NOT NULL, "
+            "report TEXT NOT NULL, "
+            "sections TEXT NOT NULL, "
+            "accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_path ON reports (path, fingerprint)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_accessed ON reports (accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content: str, prd_type: str, fingerprint: str) -> str:
+        """
+        生成缓存键
+
+        Args:
+            content: 文档内容
+            prd_type: PRD类型
+            fingerprint: 规则集指纹
+
+        Returns:
+            str: 缓存键
+        """
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return f"{fingerprint}:{prd_type}:{content_hash}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        读取缓存的报告
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict]: 验证报告，未命中时返回None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT report FROM reports WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute("UPDATE reports SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return json.loads(row[0])
+
+    def get_sections(self, path: str, fingerprint: str) -> Optional[Dict]:
+        """
+        读取同一文件最近一次缓存的章节状态
+
+        Args:
+            path: 文件绝对路径
+            fingerprint: 规则集指纹
+
+        Returns:
+            Optional[Dict]: {"hashes": [...], "findings": {...}}
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sections FROM reports WHERE path = ? AND fingerprint = ? "
+                "ORDER BY accessed DESC LIMIT 1",
+                (path, fingerprint)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, path: str, fingerprint: str, report: Dict, sections: Dict) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            path: 文件绝对路径
+            fingerprint: 规则集指纹
+            report: 验证报告
+            sections: 章节哈希和章节级规则结果
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO reports (key, path, fingerprint, report, sections, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    path,
+                    fingerprint,
+                    json.dumps(report, ensure_ascii=False),
+                    json.dumps(sections, ensure_ascii=False),
+                    time.time()
+                )
+            )
+            if cursor.rowcount:
+                # 其他进程（例如批量验证的工作进程）也在写入同一个数据库，条目数在
+                # 写事务内重新统计（写事务互斥，计数准确；COUNT 走索引，开销很小）
+                size = self._count()
+                if size > self.max_entries:
+                    self._evict(size)
+            self._conn.commit()
+
+    def record_partial(self) -> None:
+        """记录一次章节级结果复用"""
+        with self._lock:
+            self.partial_hits += 1
+
+    def _count(self) -> int:
+        """数据库中的条目数"""
+        return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def _evict(self, size: int) -> None:
+        """
+        按LRU淘汰到上限的90%，避免每次写入都触发淘汰（在写事务内调用）
+
+        Args:
+            size: 当前事务内统计的条目数
+        """
+        target = int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM reports WHERE key IN "
+            "(SELECT key FROM reports ORDER BY accessed ASC LIMIT ?)",
+            (size - target,)
+        )
+        logging.debug(f"验证缓存已淘汰至 {target} 条")
+
+    def stats(self) -> Dict:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict: 命中、未命中、章节复用次数和当前条目数
+        """
+        with self._lock:
+            entries = self._count()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "partial_hits": self.partial_hits,
+            "entries": entries,
+            "max_entries": self.max_entries
+        }
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM reports")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
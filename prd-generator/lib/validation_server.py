@@ -0,0 +1,296 @@
+"""
+Validation Server - 常驻PRD验证服务
+
+在 Unix 套接字上提供PRD验证。验证规则只在服务启动时编译一次，Write 钩子等
+频繁调用的场景通过轻量客户端（scripts/validate_fast.py）发送请求，省去每次
+启动解释器、导入和编译规则的时间。一段时间没有请求后服务自动退出。
+
+协议为 JSON Lines：每个请求一行，每个响应一行，同一连接可以发送多个请求。
+
+    {"path": "/abs/prd.md", "prd_type": "standard"}   -> {"ok": true, "report": {...}}
+    {"content": "# PRD ...", "prd_type": "lean"}      -> {"ok": true, "report": {...}}
+    {"content": "...", "sections": ["metrics"]}       -> 只执行指定的检查（见 RULE_GROUPS）
+    {"command": "ping"}                               -> {"ok": true, "pid": ..., ...}
+    {"command": "shutdown"}                           -> {"ok": true}
+
+失败时返回 {"ok": false, "error": "..."}；验证规则的源文件更新后返回
+{"ok": false, "retry": true, ...} 并退出，客户端重新启动服务后重试。
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import tempfile
+import threading
+import socketserver
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from . import prd_validator
+from .prd_validator import PRDValidator, REQUIRED_SECTIONS, resolve_rule_names
+from .file_lock import FileLock
+
+# 默认空闲超时（秒）
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+# 单个请求（一行JSON）的最大字节数
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+
+
+def default_socket_path() -> Path:
+    """
+    默认套接字路径
+
+    优先使用环境变量 PRD_VALIDATOR_SOCKET，否则为临时目录下按用户区分的文件
+    （Unix 套接字路径有长度限制，不放在插件目录中）。
+    scripts/validate_fast.py 中有相同的逻辑，修改时需同步。
+
+    Returns:
+        Path: 套接字路径
+    """
+    path = os.getenv("PRD_VALIDATOR_SOCKET")
+    if path:
+        return Path(path)
+    return Path(tempfile.gettempdir()) / f"prd-validator-{os.getuid()}.sock"
+
+
+def is_server_running(socket_path: Path) -> bool:
+    """
+    检查套接字上是否有服务在监听
+
+    Args:
+        socket_path: 套接字路径
+
+    Returns:
+        bool: 能够连接时为True
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(1.0)
+        client.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        client.close()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """逐行读取请求并写回响应"""
+
+    def handle(self):
+        service = self.server.service
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_SIZE + 1)
+            if not line:
+                break
+            if len(line) > MAX_REQUEST_SIZE and not line.endswith(b"\n"):
+                self._send({"ok": False, "error": f"请求超过 {MAX_REQUEST_SIZE} 字节"})
+                break
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line.decode("utf-8"))
+                if not isinstance(request, dict):
+                    raise ValueError("请求不是JSON对象")
+            except ValueError as e:
+                self._send({"ok": False, "error": f"无效的请求: {e}"})
+                continue
+            self._send(service.handle(request))
+
+    def _send(self, response: Dict) -> None:
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ValidationServer:
+    """
+    常驻验证服务
+
+    每种PRD类型的验证器只创建一次并在各连接之间共享（PRDValidator 可以并发
+    调用）。最后一个请求之后 idle_timeout 秒内没有新请求时服务退出。
+
+    用法:
+        server = ValidationServer(idle_timeout=300)
+        server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[Path] = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        cache=None
+    ):
+        """
+        初始化服务
+
+        Args:
+            socket_path: 套接字路径，None时使用 default_socket_path()
+            idle_timeout: 空闲超时（秒），0表示不自动退出
+            cache: 验证缓存（ValidationCache），None表示不缓存
+        """
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self.idle_timeout = idle_timeout
+        self.cache = cache
+        self.requests = 0
+
+        # (PRD类型, 规则子集) -> 验证器
+        self._validators: Dict[Tuple[str, Optional[Tuple[str, ...]]], PRDValidator] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = time.monotonic()
+        self._last_request = self._started
+        self._active = 0
+
+        # 验证规则的源文件，修改后服务退出，由客户端重新启动
+        self._source = Path(prd_validator.__file__)
+        self._source_mtime = self._source.stat().st_mtime_ns
+
+    def validator(self, prd_type: str, rules: Optional[Iterable[str]] = None) -> PRDValidator:
+        """
+        获取PRD类型和规则子集对应的验证器（首次使用时创建）
+
+        Args:
+            prd_type: PRD类型
+            rules: 规则名称，None表示全部规则
+
+        Returns:
+            PRDValidator: 验证器
+
+        Raises:
+            ValueError: 未知的PRD类型
+        """
+        key = (prd_type, None if rules is None else tuple(sorted(rules)))
+        validator = self._validators.get(key)
+        if validator is None:
+            if prd_type not in REQUIRED_SECTIONS:
+                raise ValueError(f"未知的PRD类型: {prd_type}")
+            with self._lock:
+                validator = self._validators.get(key)
+                if validator is None:
+                    validator = PRDValidator(prd_type=prd_type, cache=self.cache, rules=key[1])
+                    self._validators[key] = validator
+        return validator
+
+    def warm_up(self) -> None:
+        """预先创建所有PRD类型的验证器"""
+        for prd_type in REQUIRED_SECTIONS:
+            self.validator(prd_type)
+
+    def handle(self, request: Dict) -> Dict:
+        """
+        处理一个请求
+
+        Args:
+            request: 请求（见模块说明）
+
+        Returns:
+            Dict: 响应
+        """
+        with self._lock:
+            self._active += 1
+            self.requests += 1
+        try:
+            return self._dispatch(request)
+        except Exception as e:
+            logging.error(f"处理验证请求失败: {e}")
+            return {"ok": False, "error": str(e)}
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_request = time.monotonic()
+
+    def _dispatch(self, request: Dict) -> Dict:
+        command = request.get("command", "validate")
+        if command == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "requests": self.requests,
+                "uptime": round(time.monotonic() - self._started, 3),
+                "prd_types": sorted({prd_type for prd_type, _ in self._validators})
+            }
+        if command == "shutdown":
+            self.stop()
+            return {"ok": True}
+        if command != "validate":
+            return {"ok": False, "error": f"未知的命令: {command}"}
+
+        if self._source.stat().st_mtime_ns != self._source_mtime:
+            logging.info("验证规则已更新，验证服务退出")
+            self.stop()
+            return {"ok": False, "retry": True, "error": "验证规则已更新，请重新启动验证服务"}
+
+        rules = None
+        if request.get("sections"):
+            rules = resolve_rule_names(request["sections"]) or None
+        validator = self.validator(request.get("prd_type") or "standard", rules)
+        if request.get("content") is not None:
+            report = validator.validate_content(request["content"])
+        elif request.get("path"):
+            report = validator.validate_file(Path(request["path"]))
+        else:
+            return {"ok": False, "error": "请求缺少 path 或 content"}
+        return {"ok": True, "report": report}
+
+    def stop(self) -> None:
+        """请求服务退出（可以在信号处理函数或请求处理线程中调用）"""
+        self._stop.set()
+
+    def serve_forever(self) -> None:
+        """
+        监听套接字并处理请求，直到空闲超时或收到退出请求
+
+        Raises:
+            RuntimeError: 套接字上已有服务在运行
+        """
+        server = self._bind()
+        watchdog = threading.Thread(target=self._watch, args=(server,), daemon=True)
+        watchdog.start()
+        logging.info(f"验证服务已启动: {self.socket_path} (pid {os.getpid()})")
+        try:
+            server.serve_forever(poll_interval=0.5)
+        finally:
+            self._stop.set()
+            server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            logging.info(f"验证服务已退出，共处理 {self.requests} 个请求")
+
+    def _bind(self) -> socketserver.UnixStreamServer:
+        """绑定套接字；清理上次异常退出留下的套接字文件"""
+        lock = FileLock(self.socket_path.with_name(self.socket_path.name + ".lock"), timeout=10)
+        with lock:
+            if self.socket_path.exists():
+                if is_server_running(self.socket_path):
+                    raise RuntimeError(f"验证服务已在运行: {self.socket_path}")
+                self.socket_path.unlink()
+
+            # 套接字只允许当前用户连接
+            umask = os.umask(0o177)
+            try:
+                server = _UnixServer(str(self.socket_path), _RequestHandler)
+            finally:
+                os.umask(umask)
+        server.service = self
+        return server
+
+    def _watch(self, server: socketserver.UnixStreamServer) -> None:
+        """空闲超时或收到退出请求时停止服务"""
+        interval = min(1.0, self.idle_timeout) if self.idle_timeout > 0 else 1.0
+        while not self._stop.wait(interval):
+            if self.idle_timeout <= 0:
+                continue
+            with self._lock:
+                idle = self._active == 0 and time.monotonic() - self._last_request >= self.idle_timeout
+            if idle:
+                logging.info(f"验证服务空闲 {self.idle_timeout:g} 秒，自动退出")
+                break
+        server.shutdown()
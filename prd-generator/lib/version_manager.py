@@ -2,30 +2,65 @@
 Version Manager - PRD版本管理器
 """
 
-import json
+import os
+import re
 import logging
-import shutil
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
 from datetime import datetime
 from difflib import unified_diff
-from .utils import get_version_dir, read_file, write_file, ensure_dir, format_timestamp
+from .utils import get_version_dir, read_file, ensure_dir, write_atomic, SectionIndex
+from .file_lock import FileLock, GroupCommit
+from .metadata_store import MetadataStore, JournalMetadataStore
+from .blob_store import BlobStore
+from .line_diff import hash_lines, diff_stats, pack_hashes, unpack_hashes
 
 
 class VersionManager:
     """PRD版本管理器"""
 
-    def __init__(self, prd_name: str):
+    # 最新版本的行哈希缓存文件：一行对象哈希 + 每行8字节的行哈希
+    LINE_HASH_FILE = "lines.cache"
+
+    def __init__(
+        self,
+        prd_name: str,
+        metadata_store: Optional[MetadataStore] = None,
+        blob_store: Optional[BlobStore] = None,
+        durable: Optional[bool] = None,
+        lock_timeout: Optional[float] = None
+    ):
         """
         初始化版本管理器
 
+        所有写操作都在版本目录的文件锁（.lock）内执行，多个进程或线程
+        可以同时写入同一个PRD。
+
         Args:
             prd_name: PRD名称
+            metadata_store: 元数据存储，默认使用快照+追加日志存储
+                （JournalMetadataStore），兼容已有的 metadata.json
+            blob_store: 版本内容存储，默认使用版本目录下 objects/ 中的
+                内容寻址、差异压缩存储
+            durable: 写入后是否fsync（并发写入通过组提交合并fsync），
+                None时读取环境变量 VERSION_FSYNC
+            lock_timeout: 获取文件锁的超时时间（秒），None表示一直等待
         """
         self.prd_name = prd_name
         self.version_dir = get_version_dir() / prd_name
         self.metadata_file = self.version_dir / "metadata.json"
         ensure_dir(self.version_dir)
+        self.store = metadata_store or JournalMetadataStore(self.version_dir, prd_name)
+        self.blobs = blob_store or BlobStore(self.version_dir / "objects")
+        self.line_hash_file = self.version_dir / self.LINE_HASH_FILE
+        self._line_hashes: Optional[Tuple[str, List[int]]] = None
+
+        if durable is None:
+            durable = os.getenv("VERSION_FSYNC", "").lower() in ("1", "true", "yes")
+        self.durable = durable
+        self._lock = FileLock(self.version_dir / ".lock", timeout=lock_timeout)
+        self._group_commit = GroupCommit.for_key(str(self.version_dir.resolve()))
 
     def create_version(
         self,
@@ -46,40 +81,37 @@ class VersionManager:
         Returns:
             str: 版本号
         """
-        # 加载元数据
-        metadata = self._load_metadata()
-
-        # 生成版本号
-        version = self._generate_version_number(metadata)
-
-        # 生成文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{version}_{timestamp}.md"
-        file_path = self.version_dir / filename
-
-        # 保存版本文件
-        write_file(file_path, content)
-
-        # 计算变更统计
-        changes = self._calculate_changes(metadata, content)
-
-        # 更新元数据
-        version_info = {
-            "version": version,
-            "timestamp": datetime.now().isoformat(),
-            "author": author or "Unknown",
-            "email": email or "",
-            "message": message,
-            "tags": [],
-            "file_path": filename,
-            "file_size": len(content.encode("utf-8")),
-            "line_count": content.count("\n") + 1,
-            "changes": changes
-        }
+        with self._transaction() as written:
+            # 上一个版本（在锁内读取，版本号不会重复）
+            last_version = self.store.last()
+
+            # 生成版本号
+            version = self._generate_version_number(last_version)
+
+            # 保存版本内容（相同内容只存一份，与上一版本做差异压缩）
+            blob = self.blobs.put(content, previous=(last_version or {}).get("blob"))
+            written.append(self.blobs.object_path(blob))
+
+            # 计算变更统计（与上一版本的行哈希比较，不读取旧内容）
+            line_hashes = hash_lines(content)
+            changes = self._calculate_changes(last_version, line_hashes)
+            self._save_line_hashes(blob, line_hashes)
+
+            # 更新元数据
+            version_info = {
+                "version": version,
+                "timestamp": datetime.now().isoformat(),
+                "author": author or "Unknown",
+                "email": email or "",
+                "message": message,
+                "tags": [],
+                "blob": blob,
+                "file_size": len(content.encode("utf-8")),
+                "line_count": content.count("\n") + 1,
+                "changes": changes
+            }
 
-        metadata["versions"].append(version_info)
-        metadata["current_version"] = version
-        self._save_metadata(metadata)
+            self.store.append(version_info)
 
         logging.info(f"已创建版本: {version}")
         return version
@@ -91,8 +123,7 @@ class VersionManager:
         Returns:
             List[Dict]: 版本列表
         """
-        metadata = self._load_metadata()
-        return metadata.get("versions", [])
+        return self.store.list_versions()
 
     def get_version(self, version: str) -> Optional[Dict]:
         """
@@ -104,11 +135,19 @@ class VersionManager:
         Returns:
             Optional[Dict]: 版本信息
         """
-        versions = self.list_versions()
-        for v in versions:
-            if v["version"] == version:
-                return v
-        return None
+        return self.store.get(version)
+
+    def find_by_tag(self, tag: str) -> List[Dict]:
+        """
+        获取带有指定标签的版本
+
+        Args:
+            tag: 标签名称
+
+        Returns:
+            List[Dict]: 版本列表
+        """
+        return self.store.find_by_tag(tag)
 
     def get_version_content(self, version: str) -> str:
         """
@@ -127,6 +166,10 @@ class VersionManager:
         if not version_info:
             raise FileNotFoundError(f"版本不存在: {version}")
 
+        if "blob" in version_info:
+            return self.blobs.get(version_info["blob"])
+
+        # 旧版本以独立文件保存
         file_path = self.version_dir / version_info["file_path"]
         return read_file(file_path)
 
@@ -156,19 +199,22 @@ class VersionManager:
             lineterm=""
         ))
 
-        # 统计变更
-        added = sum(1 for line in diff if line.startswith('+') and not line.startswith('+++'))
-        deleted = sum(1 for line in diff if line.startswith('-') and not line.startswith('---'))
-        modified = min(added, deleted)
+        # 章节变化（按一、二级标题）
+        sections1 = SectionIndex(content1).sections_dict()
+        sections2 = SectionIndex(content2).sections_dict()
 
         return {
             "version1": version1,
             "version2": version2,
             "diff": "".join(diff),
-            "stats": {
-                "added": added,
-                "deleted": deleted,
-                "modified": modified
+            "stats": diff_stats(hash_lines(content1), hash_lines(content2)),
+            "sections": {
+                "added": [title for title in sections2 if title not in sections1],
+                "deleted": [title for title in sections1 if title not in sections2],
+                "modified": [
+                    title for title in sections2
+                    if title in sections1 and sections1[title] != sections2[title]
+                ]
             }
         }
 
@@ -201,19 +247,10 @@ class VersionManager:
             version: 版本号
             tag: 标签名称
         """
-        metadata = self._load_metadata()
-
-        for v in metadata["versions"]:
-            if v["version"] == version:
-                if "tags" not in v:
-                    v["tags"] = []
-                if tag not in v["tags"]:
-                    v["tags"].append(tag)
-                    self._save_metadata(metadata)
-                    logging.info(f"已为版本 {version} 添加标签: {tag}")
-                    return
-
-        raise ValueError(f"版本不存在: {version}")
+        with self._transaction():
+            changed = self.store.add_tag(version, tag)
+        if changed:
+            logging.info(f"已为版本 {version} 添加标签: {tag}")
 
     def remove_tag(self, version: str, tag: str) -> None:
         """
@@ -223,17 +260,11 @@ class VersionManager:
             version: 版本号
             tag: 标签名称
         """
-        metadata = self._load_metadata()
-
-        for v in metadata["versions"]:
-            if v["version"] == version:
-                if "tags" in v and tag in v["tags"]:
-                    v["tags"].remove(tag)
-                    self._save_metadata(metadata)
-                    logging.info(f"已移除版本 {version} 的标签: {tag}")
-                    return
-
-        raise ValueError(f"版本或标签不存在")
+        with self._transaction():
+            removed = self.store.remove_tag(version, tag)
+        if not removed:
+            raise ValueError("版本或标签不存在")
+        logging.info(f"已移除版本 {version} 的标签: {tag}")
 
     def delete_version(self, version: str) -> None:
         """
@@ -242,92 +273,106 @@ class VersionManager:
         Args:
             version: 版本号
         """
-        metadata = self._load_metadata()
-
-        for i, v in enumerate(metadata["versions"]):
-            if v["version"] == version:
-                # 删除文件
-                file_path = self.version_dir / v["file_path"]
+        with self._transaction():
+            version_info = self.store.delete(version)
+            if version_info is None:
+                raise ValueError(f"版本不存在: {version}")
+
+            # 删除旧格式的版本文件；版本对象可能被其他版本共享或作为差异基准，
+            # 由 compact() 统一清理
+            if version_info.get("file_path"):
+                file_path = self.version_dir / version_info["file_path"]
                 if file_path.exists():
                     file_path.unlink()
 
-                # 从元数据中移除
-                metadata["versions"].pop(i)
-                self._save_metadata(metadata)
+        logging.info(f"已删除版本: {version}")
 
-                logging.info(f"已删除版本: {version}")
-                return
+    def compact(self) -> None:
+        """压缩版本元数据（把追加日志合并进 metadata.json），并清理未引用的版本对象"""
+        with self._transaction():
+            self.store.compact()
+            self.blobs.gc(v["blob"] for v in self.store.list_versions() if "blob" in v)
 
-        raise ValueError(f"版本不存在: {version}")
+    @contextmanager
+    def _transaction(self) -> Iterator[List[Path]]:
+        """
+        写事务
 
-    def _load_metadata(self) -> Dict:
-        """加载元数据"""
-        if self.metadata_file.exists():
-            with open(self.metadata_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        else:
-            return {
-                "prd_name": self.prd_name,
-                "current_version": None,
-                "versions": []
-            }
+        持有版本目录的文件锁执行读-改-写；durable 模式下，释放锁之后再
+        通过组提交把元数据和本次写入的对象刷到磁盘，fsync 不占用锁。
 
-    def _save_metadata(self, metadata: Dict) -> None:
-        """保存元数据"""
-        with open(self.metadata_file, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        Yields:
+            List[Path]: 事务内写入的额外文件，需要一并fsync
+        """
+        written: List[Path] = []
+        with self._lock:
+            yield written
+        if self.durable:
+            self._group_commit.commit(written + self.store.data_files())
 
-    def _generate_version_number(self, metadata: Dict) -> str:
+    def _generate_version_number(self, last_version: Optional[Dict]) -> str:
         """生成版本号"""
-        versions = metadata.get("versions", [])
-        if not versions:
+        if not last_version:
             return "v1"
 
-        # 获取最后一个版本号
-        last_version = versions[-1]["version"]
-        # 提取数字
-        import re
-        match = re.search(r'v(\d+)', last_version)
+        # 从最后一个版本号提取数字
+        match = re.search(r'v(\d+)', last_version["version"])
         if match:
             number = int(match.group(1)) + 1
             return f"v{number}"
         else:
-            return f"v{len(versions) + 1}"
+            return f"v{self.store.count() + 1}"
 
-    def _calculate_changes(self, metadata: Dict, new_content: str) -> Dict:
-        """计算变更统计"""
-        versions = metadata.get("versions", [])
-        if not versions:
+    def _calculate_changes(self, last_version: Optional[Dict], new_hashes: List[int]) -> Dict:
+        """
+        计算变更统计
+
+        Args:
+            last_version: 上一个版本信息
+            new_hashes: 新内容的行哈希
+
+        Returns:
+            Dict: {"added", "deleted", "modified"}
+        """
+        if not last_version:
             return {
-                "added": new_content.count("\n") + 1,
+                "added": len(new_hashes),
                 "deleted": 0,
                 "modified": 0
             }
 
-        # 获取上一个版本的内容
-        last_version = versions[-1]
         try:
-            old_content = self.get_version_content(last_version["version"])
-
-            old_lines = old_content.splitlines()
-            new_lines = new_content.splitlines()
-
-            # 简单的行级差异统计
-            added = len(new_lines) - len(old_lines)
-            if added < 0:
-                deleted = -added
-                added = 0
-            else:
-                deleted = 0
-
-            # 估算修改的行数
-            modified = min(len(old_lines), len(new_lines)) // 10  # 简化估算
-
-            return {
-                "added": added,
-                "deleted": deleted,
-                "modified": modified
-            }
+            old_hashes = self._load_line_hashes(last_version)
+            return diff_stats(old_hashes, new_hashes)
         except Exception as e:
             logging.warning(f"计算变更统计失败: {e}")
             return {"added": 0, "deleted": 0, "modified": 0}
+
+    def _load_line_hashes(self, version_info: Dict) -> List[int]:
+        """
+        获取版本的行哈希
+
+        依次查找内存缓存和 lines.cache（只保存最新版本），都未命中时
+        （例如旧格式版本或缓存文件丢失）才读取版本内容重新计算。
+        """
+        blob = version_info.get("blob")
+        if blob:
+            if self._line_hashes and self._line_hashes[0] == blob:
+                return self._line_hashes[1]
+
+            try:
+                with open(self.line_hash_file, "rb") as f:
+                    if f.readline().decode("ascii").strip() == blob:
+                        hashes = unpack_hashes(f.read())
+                        self._line_hashes = (blob, hashes)
+                        return hashes
+            except (FileNotFoundError, UnicodeDecodeError, ValueError):
+                pass
+
+        logging.debug(f"行哈希缓存未命中，重新计算: {version_info['version']}")
+        return hash_lines(self.get_version_content(version_info["version"]))
+
+    def _save_line_hashes(self, blob: str, hashes: List[int]) -> None:
+        """保存最新版本的行哈希（原子替换）"""
+        self._line_hashes = (blob, hashes)
+        write_atomic(self.line_hash_file, blob.encode("ascii") + b"\n" + pack_hashes(hashes))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+飞书块转换Markdown的吞吐量测试
+
+用合成的大文档（默认5万个块）对比两种方式:
+    convert_blocks  - 建立完整块索引后拼出整个Markdown字符串
+    write_markdown  - 按文档顺序流式转换，分段写入文件
+
+用法:
+    python bench_feishu_markdown.py
+    python bench_feishu_markdown.py --blocks 200000 --repeat 3
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from lib.feishu_converter import convert_blocks, iter_markdown, write_markdown
+from fake_feishu_server import make_blocks
+
+# make_blocks 每节生成的块数
+BLOCKS_PER_SECTION = 15
+
+
+def measure(func, repeat: int):
+    """返回 (最短耗时, 结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak_memory(func) -> int:
+    """函数执行期间新增的内存峰值（字节）"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="飞书块转换Markdown的吞吐量测试")
+    parser.add_argument("--blocks", type=int, default=50000, help="文档块数（近似值）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最短耗时）")
+    args = parser.parse_args()
+
+    sections = max(1, args.blocks // BLOCKS_PER_SECTION)
+    blocks = make_blocks("bench_doc", sections)
+
+    fd, output = tempfile.mkstemp(suffix=".md")
+    os.close(fd)
+
+    def materialize() -> str:
+        return convert_blocks(blocks)
+
+    def stream() -> int:
+        with open(output, "w", encoding="utf-8") as f:
+            return write_markdown(iter(blocks), f)
+
+    try:
+        full_time, markdown = measure(materialize, args.repeat)
+        stream_time, written = measure(stream, args.repeat)
+
+        if written != len(markdown) or "".join(iter_markdown(iter(blocks))) != markdown:
+            print("错误: 流式转换结果与 convert_blocks 不一致")
+            sys.exit(1)
+
+        full_peak = peak_memory(materialize)
+        stream_peak = peak_memory(stream)
+    finally:
+        os.unlink(output)
+
+    size_mb = len(markdown.encode("utf-8")) / 1024 / 1024
+    print(f"块数: {len(blocks)}  Markdown: {size_mb:.1f}MB  {len(markdown.splitlines())} 行")
+    for name, elapsed, peak in (
+        ("convert_blocks", full_time, full_peak),
+        ("write_markdown", stream_time, stream_peak),
+    ):
+        print(f"{name:<15} {elapsed * 1000:8.1f}ms  {len(blocks) / elapsed:10.0f} 块/秒  "
+              f"{size_mb / elapsed:6.1f}MB/s  内存峰值 {peak / 1024 / 1024:6.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
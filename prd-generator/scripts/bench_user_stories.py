@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+用户故事检查的病态输入基准测试
+
+对几类病态输入（超长故事块、大量故事标题、交错的嵌套故事、包含大量伪标题的
+代码块、大量不完整的故事标题）分别生成 1MB 到 10MB 的文档，只运行用户故事
+规则，检查耗时是否随输入大小线性增长。可以同时测量原先基于 DOTALL 正则
+（懒惰匹配 + 前瞻）的实现作为对照。
+
+用法:
+    python bench_user_stories.py
+    python bench_user_stories.py --sizes 1,5,10 --baseline
+    python bench_user_stories.py --check          # 非线性增长时退出码为1
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.prd_validator import PRDValidator
+
+MB = 1024 * 1024
+
+# 原先的实现：懒惰匹配到下一个 ### 或文档末尾
+BASELINE_PATTERN = re.compile(r'(?:####|###)\s*用户故事\s*#?\d+[：:]\s*(.+?)(?=(?:####|###)|$)', re.DOTALL)
+
+STORY = (
+    "作为产品经理，\n我想要查看需求状态，\n以便及时跟进进度。\n\n"
+    "验收标准：\n- [ ] 显示状态\n- [ ] 支持筛选\n- [ ] 支持导出\n\n"
+)
+
+
+def repeat_to(unit: str, size: int, prefix: str = "") -> str:
+    """重复 unit 直到 UTF-8 编码后达到 size 字节"""
+    count = max(1, (size - len(prefix.encode("utf-8"))) // len(unit.encode("utf-8")))
+    return prefix + unit * count
+
+
+def numbered(template: str, size: int) -> str:
+    """按编号生成重复片段直到达到 size 字节"""
+    parts = []
+    total = 0
+    number = 0
+    while total < size:
+        number += 1
+        part = template.format(number=number)
+        parts.append(part)
+        total += len(part.encode("utf-8"))
+    return "".join(parts)
+
+
+# 输入名称 -> (说明, 生成函数)
+CASES: Dict[str, Callable[[int], str]] = {
+    # 一个故事后接整篇没有标题的正文
+    "long_story": lambda size: repeat_to("这是一段很长的故事描述，作为用户我想要……以便……\n", size, "### 用户故事1：超长故事\n"),
+    # 大量短故事
+    "many_stories": lambda size: numbered("### 用户故事{number}：标题\n" + STORY, size),
+    # 故事中嵌套更深层的故事和细节标题
+    "nested": lambda size: numbered(
+        "### 用户故事{number}：外层\n" + STORY + "#### 细节\n说明\n##### 用户故事 #{number}: 内层\n" + STORY, size
+    ),
+    # 代码块中的伪标题
+    "fenced": lambda size: repeat_to("```\n### 用户故事1：代码\n#### 用户故事2：代码\n```\n", size, "### 用户故事1：真实\n" + STORY),
+    # 大量不完整的故事标题（没有编号或冒号）和孤立的 ###
+    "near_miss": lambda size: repeat_to("### 用户故事 \n###用户故事 12345\n正文 ### 中间\n", size),
+}
+
+
+def run_current(content: str, validator: PRDValidator) -> int:
+    """当前实现：章节索引 + 子串查找"""
+    report = validator.validate_content(content)
+    return len(report["issues"]) + len(report["warnings"])
+
+
+def run_baseline(content: str) -> int:
+    """原先的实现"""
+    count = 0
+    for match in BASELINE_PATTERN.finditer(content):
+        story = match.group(1)
+        count += ("作为" in story) + ("我想要" in story) + ("以便" in story) + ("验收标准" in story)
+        count += story.count("- [ ]")
+    return count
+
+
+def best_of(func: Callable[[], int], runs: int) -> float:
+    """多次运行取最短耗时（秒）"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="用户故事检查的病态输入基准测试")
+    parser.add_argument("--sizes", default="1,2,5,10", help="文档大小（MB，逗号分隔，默认: 1,2,5,10）")
+    parser.add_argument("--runs", type=int, default=3, help="每项运行次数，取最小值（默认: 3）")
+    parser.add_argument("--baseline", action="store_true", help="同时测量原先的正则实现")
+    parser.add_argument("--check", action="store_true", help="最大输入的每MB耗时超过最小输入的 --tolerance 倍时退出码为1")
+    parser.add_argument("--tolerance", type=float, default=2.5, help="线性检查允许的倍数（默认: 2.5）")
+    args = parser.parse_args()
+
+    sizes = [float(size) for size in args.sizes.split(",")]
+    validator = PRDValidator("standard", rules=["user_story"])
+    failed: List[str] = []
+
+    header = f"{'输入':<14}{'大小':>8}{'耗时':>12}{'每MB':>12}"
+    if args.baseline:
+        header += f"{'原实现':>12}{'原每MB':>12}"
+    print(header)
+
+    for name, generate in CASES.items():
+        per_mb = []
+        for size in sizes:
+            content = generate(int(size * MB))
+            megabytes = len(content.encode("utf-8")) / MB
+            elapsed = best_of(lambda: run_current(content, validator), args.runs)
+            per_mb.append(elapsed / megabytes)
+            line = f"{name:<14}{megabytes:>6.1f}MB{elapsed * 1000:>10.1f}ms{elapsed * 1000 / megabytes:>10.2f}ms"
+            if args.baseline:
+                baseline = best_of(lambda: run_baseline(content), args.runs)
+                line += f"{baseline * 1000:>10.1f}ms{baseline * 1000 / megabytes:>10.2f}ms"
+            print(line)
+
+        if per_mb[-1] > per_mb[0] * args.tolerance:
+            failed.append(name)
+
+    if args.check:
+        if failed:
+            print(f"❌ 耗时增长超过线性: {', '.join(failed)}")
+            sys.exit(1)
+        print("✅ 所有输入的耗时随大小线性增长")
+
+
+if __name__ == "__main__":
+    main()
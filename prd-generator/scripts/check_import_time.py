@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+导入时间检查
+
+在新的解释器中用 -X importtime 导入各个入口模块，统计入口本身引入的导入
+时间（不含解释器启动时已导入的模块，多次运行取最小值），并检查验证路径
+没有加载网络、环境变量等重依赖。超出预算或加载了禁止的模块时退出码为1。
+
+仓库没有CI，这是手动检查：修改 lib/__init__.py、验证相关模块或这些入口
+脚本的导入之后运行（见 README.md 的“开发检查”）。
+
+用法:
+    python check_import_time.py
+    python check_import_time.py --runs 10 --scale 2      # 较慢的机器放宽预算
+    python check_import_time.py --verbose                # 列出最慢的导入
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+
+# 验证路径不应加载的模块
+HEAVY_MODULES = ("requests", "urllib3", "dotenv", "asyncio", "multiprocessing", "sqlite3")
+
+# (入口, 导入语句, 预算（毫秒）, 禁止加载的模块)
+CHECKS: List[Tuple[str, str, float, Tuple[str, ...]]] = [
+    ("lib", "import lib", 5.0, HEAVY_MODULES),
+    ("lib.prd_validator", "import lib.prd_validator", 30.0, HEAVY_MODULES),
+    (
+        "scripts/validate_prd.py",
+        "import sys; sys.path.insert(0, 'scripts'); import validate_prd",
+        40.0,
+        HEAVY_MODULES
+    ),
+    (
+        "scripts/validate_fast.py",
+        "import sys; sys.path.insert(0, 'scripts'); import validate_fast",
+        25.0,
+        HEAVY_MODULES + ("lib",)
+    ),
+]
+
+
+def import_times(statement: str) -> Dict[str, Tuple[int, int]]:
+    """
+    在新的解释器中执行导入语句
+
+    Args:
+        statement: 导入语句
+
+    Returns:
+        Dict: 模块名 -> (嵌套层级（顶层为0）, 累计导入时间（微秒）)
+    """
+    env = dict(os.environ, PYTHONPATH=str(PLUGIN_ROOT))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=str(PLUGIN_ROOT),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 顶层导入前有一个空格，每嵌套一层多两个空格
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (depth, int(cumulative))
+    return times
+
+
+def measure(statement: str, baseline: set, runs: int) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    测量导入语句引入的导入时间
+
+    Args:
+        statement: 导入语句
+        baseline: 解释器启动时已导入的模块
+        runs: 运行次数
+
+    Returns:
+        Tuple: (最小导入时间（毫秒）, 最快一次的导入明细)
+    """
+    best = None
+    for _ in range(runs):
+        times = import_times(statement)
+        # 顶层导入的累计时间之和，解释器启动时的导入不计入
+        total = sum(
+            cumulative for name, (depth, cumulative) in times.items()
+            if depth == 0 and name not in baseline
+        ) / 1000
+        if best is None or total < best[0]:
+            best = (total, times)
+    return best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="检查入口模块的导入时间")
+    parser.add_argument("--runs", type=int, default=5, help="每个入口运行次数，取最小值（默认: 5）")
+    parser.add_argument("--scale", type=float, default=1.0, help="预算倍数（默认: 1）")
+    parser.add_argument("--verbose", "-v", action="store_true", help="列出最慢的导入")
+    args = parser.parse_args()
+
+    baseline = set(import_times("pass"))
+    failed = 0
+
+    for target, statement, budget, forbidden in CHECKS:
+        budget *= args.scale
+        elapsed, times = measure(statement, baseline, max(1, args.runs))
+        loaded = sorted({
+            name.split(".")[0] for name in times
+            if name not in baseline and name.split(".")[0] in forbidden
+        })
+
+        ok = elapsed <= budget and not loaded
+        failed += not ok
+        status = "✅" if ok else "❌"
+        print(f"{status} {target}: {elapsed:.1f}ms (预算 {budget:.0f}ms)")
+        if loaded:
+            print(f"   加载了不应加载的模块: {', '.join(loaded)}")
+        if args.verbose or not ok:
+            slowest = sorted(
+                ((cumulative, name) for name, (depth, cumulative) in times.items()
+                 if depth <= 1 and name not in baseline),
+                reverse=True
+            )[:5]
+            for cumulative, name in slowest:
+                print(f"   {cumulative / 1000:7.1f}ms  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+本地模拟飞书开放平台接口，用于离线测试和性能测试
+
+支持的接口:
+    POST /open-apis/auth/v3/tenant_access_token/internal
+    GET  /open-apis/docx/v1/documents/{document_id}（返回 revision_id）
+    GET  /open-apis/docx/v1/documents/{document_id}/raw_content
+    GET  /open-apis/docx/v1/documents/{document_id}/blocks（支持 page_size / page_token 分页）
+
+文档按ID确定性生成，任意ID都存在；调用 server.edit(document_id) 模拟一次编辑
+（版本号加1，其中一节的内容随之变化）。可以模拟网络延迟和频率限制
+（超过QPS时返回HTTP 429 和错误码 99991400）。
+
+用法:
+    # 独立运行
+    python fake_feishu_server.py --port 8765 --latency 0.05 --server-qps 50
+
+    # 在代码中使用
+    from fake_feishu_server import start_server
+    server = start_server(latency=0.05)
+    client = FeishuClient("app", "secret")
+    client.api_base_url = server.api_base_url
+    ...
+    server.shutdown()
+
+    # 性能对比：逐个获取 vs import_many
+    python fake_feishu_server.py --bench 200 --latency 0.05 --concurrency 16 --qps 100
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+API_PREFIX = "/open-apis"
+
+
+def make_document(document_id: str, sections: int = 20) -> str:
+    """按文档ID生成确定性的Markdown内容"""
+    lines = [f"# {document_id}\n"]
+    for i in range(sections):
+        lines.append(f"\n## 章节 {i + 1}\n\n{document_id} 的第 {i + 1} 节内容。\n")
+    return "".join(lines)
+
+
+def _text(content: str, **style) -> Dict:
+    return {"elements": [{"text_run": {"content": content, "text_element_style": style}}]}
+
+
+def make_blocks(document_id: str, sections: int = 20, revision: int = 1) -> List[Dict]:
+    """
+    按文档ID生成确定性的块树（按文档顺序排列）
+
+    每节包含标题、带样式的段落、嵌套的有序列表和一个2x2表格。
+    revision 大于1时，第 (revision - 2) % sections 节的段落带上修订号。
+    """
+    root = {"block_id": document_id, "block_type": 1, "parent_id": "", "children": [],
+            "page": _text(document_id)}
+    blocks = [root]
+
+    def add(parent: Dict, block_type: int, field: str, payload: Dict) -> Dict:
+        block = {
+            "block_id": f"{document_id}_{len(blocks)}",
+            "block_type": block_type,
+            "parent_id": parent["block_id"],
+            "children": [],
+            field: payload
+        }
+        parent["children"].append(block["block_id"])
+        blocks.append(block)
+        return block
+
+    edited = (revision - 2) % sections if revision > 1 else -1
+    for i in range(sections):
+        add(root, 4, "heading2", _text(f"章节 {i + 1}"))
+        suffix = f"（修订 {revision}）" if i == edited else ""
+        add(root, 2, "text", {"elements": [
+            {"text_run": {"content": f"{document_id} 的第 {i + 1} 节{suffix}，", "text_element_style": {}}},
+            {"text_run": {"content": "重点", "text_element_style": {"bold": True}}},
+        ]})
+        for n in range(2):
+            item = add(root, 13, "ordered", _text(f"要点 {n + 1}"))
+            add(item, 12, "bullet", _text(f"细节 {n + 1}"))
+        table = add(root, 31, "table", {"property": {"row_size": 2, "column_size": 2}, "cells": []})
+        for label in ("指标", "目标", f"指标{i + 1}", "100%"):
+            cell = add(table, 32, "table_cell", {})
+            table["table"]["cells"].append(cell["block_id"])
+            add(cell, 2, "text", _text(label))
+
+    return blocks
+
+
+class FakeFeishuServer(ThreadingHTTPServer):
+    """模拟飞书服务端"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency: float = 0.0,
+        qps: Optional[float] = None,
+        sections: int = 20
+    ):
+        super().__init__(address, FakeFeishuHandler)
+        self.latency = latency
+        self.qps = qps
+        self.sections = sections
+        self.token = "fake-tenant-token"
+        self.expire = 7200
+        self.revisions: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {"auth": 0, "info": 0, "documents": 0, "throttled": 0, "connections": 0}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    @property
+    def api_base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def revision(self, document_id: str) -> int:
+        return self.revisions.get(document_id, 1)
+
+    def edit(self, document_id: str) -> int:
+        """模拟编辑文档，返回新的版本号"""
+        with self._lock:
+            self.revisions[document_id] = self.revisions.get(document_id, 1) + 1
+            return self.revisions[document_id]
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def throttled(self) -> bool:
+        """固定1秒窗口的简单限流"""
+        if not self.qps:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.qps:
+                self.stats["throttled"] += 1
+                return True
+            return False
+
+
+class FakeFeishuHandler(BaseHTTPRequestHandler):
+    """请求处理"""
+
+    protocol_version = "HTTP/1.1"
+    server: FakeFeishuServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        if self.path == f"{API_PREFIX}/auth/v3/tenant_access_token/internal":
+            self.server.count("auth")
+            self._send({
+                "code": 0,
+                "msg": "ok",
+                "tenant_access_token": self.server.token,
+                "expire": self.server.expire
+            })
+        else:
+            self._send({"code": 404, "msg": "not found"}, status=404)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = url.path[len(API_PREFIX):].strip("/").split("/")
+
+        if self.headers.get("Authorization") != f"Bearer {self.server.token}":
+            self._send({"code": 99991663, "msg": "Invalid access token"}, status=400)
+            return
+        if self.server.throttled():
+            self._send({"code": 99991400, "msg": "request trigger frequency limit"}, status=429)
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if parts[:3] == ["docx", "v1", "documents"] and len(parts) == 4:
+            self.server.count("info")
+            self._send({"code": 0, "msg": "ok", "data": {"document": {
+                "document_id": parts[3],
+                "revision_id": self.server.revision(parts[3]),
+                "title": parts[3]
+            }}})
+        elif parts[:3] == ["docx", "v1", "documents"] and len(parts) == 5 and parts[4] == "raw_content":
+            self.server.count("documents")
+            self._send({"code": 0, "msg": "ok", "data": {"content": make_document(parts[3])}})
+        elif parts[:3] == ["docx", "v1", "documents"] and len(parts) == 5 and parts[4] == "blocks":
+            self.server.count("documents")
+            self._send_blocks(parts[3], parse_qs(url.query))
+        else:
+            self._send({"code": 404, "msg": "not found"}, status=404)
+
+    def _send_blocks(self, document_id: str, query: Dict[str, List[str]]) -> None:
+        """分页返回文档块，page_token 为下一页的起始位置"""
+        blocks = make_blocks(document_id, self.server.sections, self.server.revision(document_id))
+        page_size = min(500, int(query.get("page_size", ["500"])[0]))
+        start = int(query.get("page_token", ["0"])[0])
+        end = start + page_size
+        data = {"items": blocks[start:end], "has_more": end < len(blocks)}
+        if data["has_more"]:
+            data["page_token"] = str(end)
+        self._send({"code": 0, "msg": "ok", "data": data})
+
+    def _send(self, payload: Dict, status: int = 200) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    qps: Optional[float] = None,
+    sections: int = 20
+) -> FakeFeishuServer:
+    """
+    在后台线程启动模拟服务端
+
+    Args:
+        host: 监听地址
+        port: 端口，0表示随机端口
+        latency: 每个文档请求的模拟延迟（秒）
+        qps: 服务端限流（每秒请求数），None表示不限流
+        sections: 每个文档的章节数（块接口每节约15个块）
+
+    Returns:
+        FakeFeishuServer: 服务端实例，api_base_url 属性为API地址
+    """
+    server = FakeFeishuServer((host, port), latency=latency, qps=qps, sections=sections)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def run_benchmark(args) -> None:
+    """逐个获取与 import_many 的耗时对比"""
+    from lib.feishu_client import FeishuClient
+
+    server = start_server(latency=args.latency, qps=args.server_qps)
+    doc_ids = [f"doc{i:05d}" for i in range(args.bench)]
+
+    with FeishuClient("fake-app", "fake-secret", pool_size=args.concurrency) as client:
+        client.api_base_url = server.api_base_url
+
+        start = time.time()
+        for doc_id in doc_ids:
+            client.fetch_markdown(doc_id)
+        serial = time.time() - start
+
+        failures: Dict[str, Exception] = {}
+        start = time.time()
+        imported = sum(1 for _ in client.import_many(
+            doc_ids,
+            concurrency=args.concurrency,
+            qps=args.qps,
+            failures=failures
+        ))
+        concurrent = time.time() - start
+
+    server.shutdown()
+    print(f"文档数: {args.bench}  模拟延迟: {args.latency * 1000:.0f}ms")
+    print(f"逐个获取:    {serial:.2f}s ({args.bench / serial:.1f} 篇/秒)")
+    print(f"import_many: {concurrent:.2f}s ({imported / concurrent:.1f} 篇/秒, "
+          f"并发 {args.concurrency}, 限速 {args.qps}/s)")
+    print(f"失败: {len(failures)}  服务端统计: {server.stats}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="模拟飞书开放平台接口")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="端口")
+    parser.add_argument("--latency", type=float, default=0.0, help="文档请求的模拟延迟（秒）")
+    parser.add_argument("--server-qps", type=float, default=None, help="服务端限流（每秒请求数）")
+    parser.add_argument("--bench", type=int, default=0, help="运行性能对比（文档数）")
+    parser.add_argument("--concurrency", type=int, default=16, help="性能对比时的并发数")
+    parser.add_argument("--qps", type=float, default=100.0, help="性能对比时客户端的限速")
+    args = parser.parse_args()
+
+    if args.bench:
+        run_benchmark(args)
+        return
+
+    server = FakeFeishuServer((args.host, args.port), latency=args.latency, qps=args.server_qps)
+    print(f"模拟飞书服务已启动: {server.api_base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
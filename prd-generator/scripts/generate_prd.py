@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+批量生成PRD脚本
+
+用法:
+    python generate_prd.py roadmap.jsonl
+    python generate_prd.py roadmap.jsonl --type lean --output-dir outputs/q3 --jobs 4
+    cat roadmap.jsonl | python generate_prd.py -
+
+输入为JSON Lines，每行一条需求信息（与 PRDGenerator.generate 的 requirements 相同），
+可以用 prd_type 和 output_filename 字段覆盖默认类型和文件名。每条需求输出一行
+JSON结果（文件路径、渲染和写入耗时，失败时的错误），最后在标准错误输出汇总；
+任一需求失败时退出码为1，但不会中断其余需求。
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, IO, Iterator, List
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.prd_generator import generate_many, TEMPLATE_MAP
+from lib.utils import load_env, setup_logging
+
+
+def read_requirements(stream: IO[str], errors: List[Dict]) -> Iterator[Dict]:
+    """
+    读取JSON Lines格式的需求
+
+    Args:
+        stream: 输入流
+        errors: 无法解析的行记录到其中并输出一行错误结果，不中断读取
+
+    Yields:
+        Dict: 需求信息
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError("不是JSON对象")
+        except ValueError as e:
+            error = {"line": line_number, "error": f"无效的需求: {e}"}
+            errors.append(error)
+            sys.stdout.write(json.dumps(error, ensure_ascii=False) + "\n")
+            continue
+        yield item
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="批量生成PRD")
+    parser.add_argument("input", help="JSON Lines需求文件，- 表示标准输入")
+    parser.add_argument("--type", choices=sorted(TEMPLATE_MAP), default="standard", help="默认PRD类型")
+    parser.add_argument("--output-dir", help="输出目录（默认: OUTPUT_DIR）")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="渲染进程数（默认: 1，即在当前进程中渲染）")
+    parser.add_argument("--chunksize", type=int, default=16, help="每次分发给工作进程的需求数（默认: 16）")
+    parser.add_argument("--batch-size", type=int, default=64, help="每批写入的文件数（默认: 64）")
+    parser.add_argument("--verbose", "-v", action="store_true", help="显示详细日志")
+    args = parser.parse_args()
+
+    load_env()
+    setup_logging(level="DEBUG" if args.verbose else "WARNING")
+
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    start = time.perf_counter()
+    total = failed = 0
+    errors: List[Dict] = []
+    try:
+        for result in generate_many(
+            read_requirements(stream, errors),
+            prd_type=args.type,
+            output_dir=args.output_dir,
+            jobs=args.jobs,
+            chunksize=args.chunksize,
+            batch_size=args.batch_size
+        ):
+            total += 1
+            failed += "error" in result
+            sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    failed += len(errors)
+    print(f"生成 {total} 个PRD，失败 {failed} 个，耗时 {elapsed:.2f}s", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+版本管理并发压力测试
+
+多个进程（每个进程多个线程）同时对同一个PRD调用 create_version，
+结束后检查:
+    - 版本数量等于保存次数，版本号 v1..vN 连续且不重复
+    - 每个版本的内容都能还原，且与写入方记录的内容一致
+    - metadata.log / metadata.json 都是完整的JSON
+    - 模拟在追加元数据记录的中途崩溃（把日志截断在最后一条记录中间），
+      之后仍能加载全部已提交的版本，并且可以继续写入
+
+用法:
+    python stress_versions.py --processes 8 --threads 4 --saves 25
+    python stress_versions.py --processes 8 --threads 4 --saves 25 --durable
+    python stress_versions.py --compact-every 50
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from multiprocessing import Process, Queue
+from typing import Dict, List
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.version_manager import VersionManager
+
+PRD_NAME = "stress"
+
+
+def make_content(writer: str, n: int) -> str:
+    """生成每次保存的内容（基础内容 + 写入方相关的修改）"""
+    lines = [f"## 章节 {i}\n\n内容行 {i}\n" for i in range(200)]
+    lines[n % 200] = f"## 章节 {n % 200}\n\n{writer} 第{n}次修改\n"
+    return "".join(lines)
+
+
+def writer_process(index: int, args, results: Queue) -> None:
+    """写入进程：启动多个线程并发保存"""
+    saved: List[Dict] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def run(thread_index: int) -> None:
+        writer = f"p{index}t{thread_index}"
+        # 每个线程独立的 VersionManager，模拟互不知情的编辑器和机器人
+        manager = VersionManager(PRD_NAME, durable=args.durable)
+        for n in range(args.saves):
+            content = make_content(writer, n)
+            try:
+                version = manager.create_version(content, f"{writer} #{n}", author=writer)
+                if args.compact_every and n and n % args.compact_every == 0:
+                    manager.compact()
+            except Exception as e:
+                with lock:
+                    errors.append(f"{writer}: {e!r}")
+                continue
+            with lock:
+                saved.append({"version": version, "content": content})
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    results.put({"saved": saved, "errors": errors})
+
+
+def verify(saved: List[Dict], errors: List[str], expected: int) -> List[str]:
+    """检查最终状态，返回发现的问题"""
+    problems = list(errors)
+    version_dir = Path(os.environ["VERSION_DIR"]) / PRD_NAME
+
+    for name in ("metadata.json", "metadata.log"):
+        path = version_dir / name
+        if not path.exists():
+            continue
+        data = path.read_text(encoding="utf-8")
+        try:
+            if name.endswith(".json"):
+                json.loads(data)
+            else:
+                for line in data.splitlines():
+                    json.loads(line)
+        except ValueError as e:
+            problems.append(f"{name} 不是完整的JSON: {e}")
+
+    manager = VersionManager(PRD_NAME)
+    versions = [v["version"] for v in manager.list_versions()]
+    if len(versions) != expected:
+        problems.append(f"版本数量 {len(versions)}，期望 {expected}")
+    if len(set(versions)) != len(versions):
+        problems.append("存在重复的版本号")
+    if versions != [f"v{i}" for i in range(1, len(versions) + 1)]:
+        problems.append("版本号不连续")
+
+    for item in saved:
+        try:
+            if manager.get_version_content(item["version"]) != item["content"]:
+                problems.append(f"版本内容不一致: {item['version']}")
+        except Exception as e:
+            problems.append(f"版本内容无法读取: {item['version']}: {e!r}")
+
+    return problems
+
+
+def verify_torn_write(saves: int = 5) -> List[str]:
+    """
+    模拟追加元数据记录时崩溃：把日志截断在最后一条记录的不同位置，检查已
+    提交的版本仍能加载，之后的写入不会接在残留字节后面
+
+    Args:
+        saves: 截断前保存的版本数
+
+    Returns:
+        List[str]: 发现的问题
+    """
+    problems: List[str] = []
+    name = "torn"
+    manager = VersionManager(name)
+    for n in range(saves):
+        manager.create_version(make_content("torn", n), f"torn #{n}")
+    log_file = Path(os.environ["VERSION_DIR"]) / name / "metadata.log"
+    data = log_file.read_bytes()
+    last_start = data.rstrip(b"\n").rfind(b"\n") + 1
+
+    # 截断位置：最后一条记录的开头之后、中间、换行符之前
+    for cut in sorted({last_start + 1, (last_start + len(data)) // 2, len(data) - 1}):
+        log_file.write_bytes(data[:cut])
+        try:
+            versions = [v["version"] for v in VersionManager(name).list_versions()]
+            if versions != [f"v{i}" for i in range(1, saves)]:
+                problems.append(f"截断在 {cut} 字节后加载到的版本为 {versions}")
+                continue
+
+            content = make_content("after-crash", cut)
+            version = VersionManager(name).create_version(content, "after crash")
+            reloaded = VersionManager(name)
+            if [v["version"] for v in reloaded.list_versions()] != [f"v{i}" for i in range(1, saves + 1)]:
+                problems.append(f"截断在 {cut} 字节后继续写入，版本列表不正确")
+            elif reloaded.get_version_content(version) != content:
+                problems.append(f"截断在 {cut} 字节后继续写入，版本内容不一致")
+            for line in log_file.read_bytes().splitlines():
+                json.loads(line.decode("utf-8"))
+        except Exception as e:
+            problems.append(f"截断在 {cut} 字节后无法加载或写入: {e!r}")
+
+    return problems
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="版本管理并发压力测试")
+    parser.add_argument("--processes", type=int, default=4, help="写入进程数")
+    parser.add_argument("--threads", type=int, default=4, help="每个进程的线程数")
+    parser.add_argument("--saves", type=int, default=25, help="每个线程的保存次数")
+    parser.add_argument("--durable", action="store_true", help="启用fsync（组提交）")
+    parser.add_argument("--compact-every", type=int, default=0, help="每个线程每N次保存压缩一次")
+    parser.add_argument("--keep", action="store_true", help="保留测试目录")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="prd-stress-")
+    os.environ["VERSION_DIR"] = work_dir
+    expected = args.processes * args.threads * args.saves
+
+    results: Queue = Queue()
+    start = time.time()
+    processes = [Process(target=writer_process, args=(i, args, results)) for i in range(args.processes)]
+    for p in processes:
+        p.start()
+
+    saved: List[Dict] = []
+    errors: List[str] = []
+    for _ in processes:
+        result = results.get()
+        saved.extend(result["saved"])
+        errors.extend(result["errors"])
+    for p in processes:
+        p.join()
+    elapsed = time.time() - start
+
+    problems = verify(saved, errors, expected)
+    crash_problems = verify_torn_write()
+    problems.extend(crash_problems)
+
+    print(f"写入: {args.processes}进程 x {args.threads}线程 x {args.saves}次 = {expected}次保存")
+    print(f"耗时: {elapsed:.2f}s  吞吐: {expected / elapsed:.1f} 次/秒  fsync: {'开' if args.durable else '关'}")
+    if problems:
+        print(f"\n❌ 发现 {len(problems)} 个问题:")
+        for problem in problems[:20]:
+            print(f"  - {problem}")
+    else:
+        print("✅ 无版本丢失、无重复版本号、内容全部一致")
+        print("✅ 元数据记录写入中断后仍能加载并继续写入")
+
+    if args.keep:
+        print(f"测试目录: {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
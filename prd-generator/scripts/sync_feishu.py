@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+飞书文档增量同步脚本
+
+用法:
+    python sync_feishu.py <文档URL或ID> [...]
+    python sync_feishu.py @doclist.txt
+    python sync_feishu.py @doclist.txt --force
+
+每个文档同步到以文档ID命名的版本库（VERSION_DIR/<文档ID>）。revision_id
+没有变化的文档只请求一次文档信息；每个文档输出一行JSON结果（JSON Lines），
+有文档同步失败时退出码为1。适合作为定时镜像任务运行。
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Iterator, List
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.feishu_client import FeishuClient
+from lib.feishu_sync import FeishuSync
+from lib.utils import load_env, setup_logging
+
+
+def expand_inputs(inputs: List[str]) -> Iterator[str]:
+    """展开 @文件列表（每行一个URL或ID，# 开头为注释）"""
+    for item in inputs:
+        if item.startswith("@"):
+            with open(item[1:], "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        yield line
+        else:
+            yield item
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="增量同步飞书文档到版本库")
+    parser.add_argument("documents", nargs="+", help="文档URL或ID；也可以是@文件列表")
+    parser.add_argument("--force", action="store_true", help="忽略已记录的 revision_id，重新获取文档")
+    parser.add_argument("--author", help="创建版本时记录的作者")
+    parser.add_argument("--verbose", "-v", action="store_true", help="显示详细日志")
+    args = parser.parse_args()
+
+    load_env()
+    setup_logging("DEBUG" if args.verbose else "WARNING")
+
+    failures = {}
+    with FeishuClient() as client:
+        syncer = FeishuSync(client, author=args.author)
+        for result in syncer.sync_many(expand_inputs(args.documents), force=args.force, failures=failures):
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    for url, error in failures.items():
+        print(json.dumps({"document_id": url, "status": "failed", "error": str(error)}, ensure_ascii=False))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
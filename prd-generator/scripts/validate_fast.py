@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+PRD快速验证客户端
+
+把验证请求发送给常驻验证服务（scripts/validation_server.py），省去每次启动
+时导入和编译验证规则的时间，适合在 Write 钩子中调用。服务未运行时自动在
+后台启动；无法启动（如不支持 Unix 套接字的平台）时在当前进程中验证。
+
+用法:
+    python validate_fast.py <prd_file.md> [...] [--type lean]
+    python validate_fast.py <prd_file.md> --sections user-stories,metrics
+    cat draft.md | python validate_fast.py - --type onepager
+    python validate_fast.py --hook < event.json
+    python validate_fast.py --status
+    python validate_fast.py --stop
+
+每个文件输出一行JSON报告，任一文件存在错误时退出码为1。
+本脚本只使用标准库，不导入 lib。
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List
+
+SERVER_SCRIPT = Path(__file__).resolve().parent / "validation_server.py"
+
+# 等待服务启动的最长时间（秒）
+START_TIMEOUT = 10.0
+
+
+def socket_path() -> str:
+    """套接字路径（与 lib.validation_server.default_socket_path 一致）"""
+    return os.getenv("PRD_VALIDATOR_SOCKET") or os.path.join(
+        tempfile.gettempdir(), f"prd-validator-{os.getuid()}.sock"
+    )
+
+
+def send(path: str, requests: List[Dict], timeout: float = 60.0) -> List[Dict]:
+    """
+    在一个连接上发送请求并读取响应
+
+    Args:
+        path: 套接字路径
+        requests: 请求列表
+        timeout: 套接字超时（秒）
+
+    Returns:
+        List[Dict]: 与请求一一对应的响应
+
+    Raises:
+        OSError: 无法连接或连接中断
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(b"".join(
+            json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n" for request in requests
+        ))
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as stream:
+            responses = [json.loads(line) for line in stream if line.strip()]
+    if len(responses) != len(requests):
+        raise ConnectionError("验证服务提前关闭了连接")
+    return responses
+
+
+def start_server(path: str) -> None:
+    """
+    在后台启动验证服务并等待套接字可用
+
+    Raises:
+        TimeoutError: 服务没有在 START_TIMEOUT 秒内启动
+    """
+    subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT), "--socket", path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            send(path, [{"command": "ping"}], timeout=1.0)
+            return
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"验证服务启动超时: {path}")
+
+
+def call(requests: List[Dict]) -> List[Dict]:
+    """
+    发送请求；服务未运行或验证规则已更新时（重新）启动服务后重试
+
+    Args:
+        requests: 请求列表
+
+    Returns:
+        List[Dict]: 响应列表
+    """
+    path = socket_path()
+    try:
+        responses = send(path, requests)
+    except (FileNotFoundError, ConnectionRefusedError):
+        start_server(path)
+        return send(path, requests)
+
+    if any(response.get("retry") for response in responses):
+        # 旧服务已退出，等它释放套接字后再启动
+        deadline = time.monotonic() + START_TIMEOUT
+        while os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        start_server(path)
+        responses = send(path, requests)
+    return responses
+
+
+def validate_local(requests: List[Dict]) -> List[Dict]:
+    """在当前进程中验证（服务不可用时使用）"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from lib.prd_validator import PRDValidator, resolve_rule_names
+
+    validators = {}
+    responses = []
+    for request in requests:
+        prd_type = request["prd_type"]
+        try:
+            if prd_type not in validators:
+                rules = resolve_rule_names(request.get("sections") or []) or None
+                validators[prd_type] = PRDValidator(prd_type=prd_type, rules=rules)
+            validator = validators[prd_type]
+            if request.get("content") is not None:
+                report = validator.validate_content(request["content"])
+            else:
+                report = validator.validate_file(Path(request["path"]))
+            responses.append({"ok": True, "report": report})
+        except Exception as e:
+            responses.append({"ok": False, "error": str(e)})
+    return responses
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="通过常驻验证服务快速验证PRD")
+    parser.add_argument("files", nargs="*", metavar="file", help="PRD文件路径，- 表示从标准输入读取内容")
+    parser.add_argument(
+        "--type",
+        choices=["standard", "lean", "onepager", "technical", "design"],
+        default="standard",
+        help="PRD类型"
+    )
+    parser.add_argument("--sections", help="只执行特定检查（逗号分隔），如: user-stories,metrics")
+    parser.add_argument(
+        "--hook",
+        action="store_true",
+        help="从标准输入读取 Write 钩子事件（tool_input.file_path / content），只验证 .md 文件"
+    )
+    parser.add_argument("--status", action="store_true", help="显示验证服务状态")
+    parser.add_argument("--stop", action="store_true", help="停止验证服务")
+    args = parser.parse_args()
+
+    if args.status or args.stop:
+        try:
+            response = send(socket_path(), [{"command": "shutdown" if args.stop else "ping"}], timeout=5.0)[0]
+        except OSError:
+            print(json.dumps({"ok": False, "error": "验证服务未运行"}, ensure_ascii=False))
+            sys.exit(1)
+        print(json.dumps(response, ensure_ascii=False))
+        sys.exit(0)
+
+    requests = []
+    if args.hook:
+        tool_input = json.load(sys.stdin).get("tool_input") or {}
+        file = tool_input.get("file_path") or ""
+        if not file.endswith(".md"):
+            sys.exit(0)
+        args.files = [file]
+        # 写入之前（PreToolUse）验证待写入的内容，写入之后验证文件
+        if tool_input.get("content") is not None:
+            requests.append({"content": tool_input["content"], "prd_type": args.type})
+
+    if not args.files:
+        parser.error("需要至少一个PRD文件")
+
+    for file in args.files[len(requests):]:
+        if file == "-":
+            requests.append({"content": sys.stdin.read(), "prd_type": args.type})
+        else:
+            # 服务的工作目录可能不同，发送绝对路径
+            requests.append({"path": os.path.abspath(file), "prd_type": args.type})
+
+    if args.sections:
+        for request in requests:
+            request["sections"] = args.sections.split(",")
+
+    if hasattr(socket, "AF_UNIX"):
+        try:
+            responses = call(requests)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  验证服务不可用，在当前进程中验证: {e}", file=sys.stderr)
+            responses = validate_local(requests)
+    else:
+        responses = validate_local(requests)
+
+    failed = 0
+    for file, response in zip(args.files, responses):
+        if response.get("ok"):
+            result = {"file": file, **response["report"]}
+        else:
+            result = {"file": file, "error": response.get("error")}
+        if result.get("error") or result.get("issues"):
+            failed += 1
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
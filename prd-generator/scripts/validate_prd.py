@@ -6,23 +6,53 @@ PRD验证脚本
     python validate_prd.py <prd_file.md>
     python validate_prd.py <prd_file.md> --verbose
     python validate_prd.py <prd_file.md> --sections user-stories,metrics
+
+批量模式（输入为目录、通配符、@文件列表或多个文件时启用）:
+    python validate_prd.py docs/ "specs/**/*.md" @filelist.txt --jobs 8 --chunksize 32
+
+批量模式下每个文件输出一行JSON报告（JSON Lines），任一文件存在错误时退出码为1。
+
+机器可读格式（json/jsonl/sarif/junit），可以直接流式写入文件；--quiet 不初始化日志:
+    python validate_prd.py docs/ --format sarif --output prd.sarif --quiet
+    python validate_prd.py <prd_file.md> --format junit -o report.xml
+
+增量验证（内容未变化的文件直接使用缓存结果）:
+    python validate_prd.py docs/ --cache --cache-dir outputs/.cache
 """
 
+import os
 import sys
+import glob
+import logging
 import argparse
 from pathlib import Path
+from contextlib import redirect_stdout
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib import __version__
+from lib.prd_validator import PRDValidator, RULE_GROUPS, resolve_rule_names
+from lib.report_formats import group_findings, get_writer, WRITERS
+from lib.utils import setup_logging
 
-# 添加lib目录到路径
-sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
+if TYPE_CHECKING:
+    from lib.validation_cache import ValidationCache
 
-from prd_validator import PRDValidator
-from utils import setup_logging
+# 工作进程内复用的验证器（每个进程独立的缓存连接）
+_worker_validator = None
 
 
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="验证PRD文档")
-    parser.add_argument("file", help="PRD文件路径")
+    parser.add_argument(
+        "files",
+        nargs="+",
+        metavar="file",
+        help="PRD文件路径；也可以是目录、通配符或@文件列表"
+    )
     parser.add_argument(
         "--type",
         choices=["standard", "lean", "onepager", "technical", "design"],
@@ -37,23 +67,98 @@ def main():
     )
     parser.add_argument(
         "--sections",
-        help="只验证特定章节（逗号分隔），如: user-stories,metrics"
+        help="只执行特定检查（逗号分隔），如: user-stories,metrics；可选: " + ",".join(RULE_GROUPS)
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="批量模式的工作进程数（默认: CPU核数）"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=16,
+        help="批量模式下每次分发给工作进程的文件数（默认: 16）"
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=["text"] + sorted(WRITERS),
+        help="输出格式（默认: 单个文件为text，批量模式为jsonl）"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="输出文件（默认: 标准输出）"
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="不初始化日志、不输出日志，只输出报告"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="启用验证缓存，内容未变化的文件直接返回上次结果"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="缓存目录（默认: CACHE_DIR 或 outputs/.cache）"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=10000,
+        help="缓存最大条目数，超出时按LRU淘汰（默认: 10000）"
     )
 
     args = parser.parse_args()
 
+    # --sections 解析为规则子集，None表示全部规则
+    args.rules = None
+    if args.sections:
+        try:
+            args.rules = resolve_rule_names(args.sections.split(",")) or None
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.quiet:
+        # 不初始化日志，并屏蔽默认输出到标准错误的日志（错误已包含在报告中）
+        logging.disable(logging.CRITICAL)
+
+    batch = is_batch_input(args.files)
+    format_name = args.format or ("jsonl" if batch else "text")
+    if format_name != "text":
+        sys.exit(run_batch(args, format_name))
+    if batch:
+        parser.error("批量模式不支持 text 格式，请使用 json/jsonl/sarif/junit")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output, redirect_stdout(output):
+            validate_single(args)
+    else:
+        validate_single(args)
+
+
+def validate_single(args) -> None:
+    """验证单个文件并输出文本报告（以退出码结束）"""
+    file_path = Path(args.files[0])
+
     # 设置日志
-    log_level = "DEBUG" if args.verbose else "INFO"
-    setup_logging(level=log_level)
+    if not args.quiet:
+        setup_logging(level="DEBUG" if args.verbose else "INFO")
 
     # 检查文件是否存在
-    file_path = Path(args.file)
     if not file_path.exists():
         print(f"❌ 错误: 文件不存在: {file_path}")
         sys.exit(1)
 
     # 创建验证器
-    validator = PRDValidator(prd_type=args.type)
+    cache = open_cache(args)
+    validator = PRDValidator(prd_type=args.type, cache=cache, rules=args.rules)
 
     # 执行验证
     print(f"\n正在验证PRD: {file_path}\n")
@@ -62,7 +167,13 @@ def main():
     result = validator.validate_file(file_path)
 
     # 显示结果
-    print_validation_result(result, verbose=args.verbose)
+    print_validation_result(result, verbose=args.verbose, rule_names=validator.rule_names)
+
+    if cache is not None:
+        if args.verbose:
+            stats = cache.stats()
+            print(f"🗄️  缓存: 命中{stats['hits']}次, 未命中{stats['misses']}次, 章节复用{stats['partial_hits']}次")
+        cache.close()
 
     # 返回退出码
     if result["issues"]:
@@ -71,73 +182,247 @@ def main():
         sys.exit(0)
 
 
-def print_validation_result(result: dict, verbose: bool = False):
+def open_cache(args) -> Optional["ValidationCache"]:
+    """
+    按命令行参数打开验证缓存
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        Optional[ValidationCache]: 验证缓存，未启用缓存时返回None
+    """
+    if not args.cache:
+        return None
+    # 只在启用缓存时导入 sqlite3
+    from lib.validation_cache import ValidationCache
+    return ValidationCache(cache_dir=args.cache_dir, max_entries=args.cache_size)
+
+
+def is_batch_input(inputs: List[str]) -> bool:
+    """
+    判断输入是否需要批量模式
+
+    Args:
+        inputs: 命令行输入
+
+    Returns:
+        bool: 多个输入、目录、通配符或@文件列表时为True
+    """
+    if len(inputs) > 1:
+        return True
+
+    item = inputs[0]
+    return item.startswith("@") or glob.has_magic(item) or Path(item).is_dir()
+
+
+def expand_inputs(inputs: List[str]) -> Iterator[Path]:
+    """
+    展开批量输入为PRD文件列表
+
+    Args:
+        inputs: 文件、目录（递归查找*.md）、通配符或@文件列表（每行一个输入）
+
+    Yields:
+        Path: PRD文件路径（去重，保持输入顺序）
+    """
+    seen = set()
+    pending = list(reversed(inputs))
+
+    while pending:
+        item = pending.pop().strip()
+        if not item or item.startswith("#"):
+            continue
+
+        if item.startswith("@"):
+            list_file = Path(item[1:])
+            with open(list_file, "r", encoding="utf-8") as f:
+                pending.extend(reversed(f.read().splitlines()))
+            continue
+
+        if glob.has_magic(item):
+            candidates = sorted(Path(p) for p in glob.iglob(item, recursive=True))
+        elif Path(item).is_dir():
+            candidates = sorted(Path(item).rglob("*.md"))
+        else:
+            candidates = [Path(item)]
+
+        for path in candidates:
+            if path.is_dir() or path in seen:
+                continue
+            seen.add(path)
+            yield path
+
+
+def _init_worker(log_level: str, args) -> None:
+    """工作进程初始化"""
+    global _worker_validator
+    if log_level:
+        setup_logging(level=log_level)
+    _worker_validator = PRDValidator(prd_type=args.type, cache=open_cache(args), rules=args.rules)
+
+
+def _validate_one(file_path: Path) -> dict:
+    """
+    在工作进程中验证单个文件
+
+    Args:
+        file_path: PRD文件路径
+
+    Returns:
+        dict: 带文件路径的验证报告，失败时包含error字段
+    """
+    try:
+        report = _worker_validator.validate_file(file_path)
+    except Exception as e:
+        return {"file": str(file_path), "error": str(e)}
+    return {"file": str(file_path), **report}
+
+
+def validate_files(args, files: List[Path], log_level: str) -> Iterator[Dict]:
+    """
+    验证文件：单个文件在当前进程中验证，多个文件使用进程池
+
+    Args:
+        args: 命令行参数
+        files: PRD文件列表
+        log_level: 工作进程的日志级别，空字符串表示不初始化日志
+
+    Yields:
+        Dict: 带文件路径的验证报告（按输入顺序）
+    """
+    global _worker_validator
+    if len(files) == 1 or args.jobs == 1:
+        _worker_validator = PRDValidator(prd_type=args.type, cache=open_cache(args), rules=args.rules)
+        for file_path in files:
+            yield _validate_one(file_path)
+        return
+
+    # 进程池只在批量模式中使用，单文件验证（如钩子中）不必导入 multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=args.jobs or os.cpu_count() or 1,
+        initializer=_init_worker,
+        initargs=(log_level, args)
+    ) as executor:
+        yield from executor.map(_validate_one, files, chunksize=max(1, args.chunksize))
+
+
+def run_batch(args, format_name: str) -> int:
+    """
+    验证并以机器可读格式流式输出（批量模式，或单个文件指定了 --format）
+
+    Args:
+        args: 命令行参数
+        format_name: 输出格式（json/jsonl/sarif/junit）
+
+    Returns:
+        int: 退出码，任一文件存在错误或验证失败时为1
+    """
+    log_level = ""
+    if not args.quiet:
+        log_level = "DEBUG" if args.verbose else "WARNING"
+        setup_logging(level=log_level)
+
+    files = list(expand_inputs(args.files))
+    if not files:
+        print("❌ 错误: 未找到PRD文件", file=sys.stderr)
+        return 1
+
+    options = {}
+    if format_name == "sarif":
+        options["tool_version"] = __version__
+    elif format_name == "junit":
+        options["categories"] = PRDValidator(prd_type=args.type, rules=args.rules).rule_names
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        with get_writer(format_name, output, **options) as writer:
+            for result in validate_files(args, files, log_level):
+                if result.get("error") or result.get("issues"):
+                    failed += 1
+                writer.write(result)
+                if output is sys.stdout:
+                    output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    logging.info(f"批量验证完成: {len(files)}个文件, {failed}个未通过")
+    return 1 if failed else 0
+
+
+def print_validation_result(result: dict, verbose: bool = False, rule_names: Optional[List[str]] = None):
     """
     打印验证结果
 
     Args:
         result: 验证结果
         verbose: 是否显示详细信息
+        rule_names: 执行了的规则，只显示这些检查；None表示全部
     """
+    # 按问题类型分组（一次遍历）
+    grouped = group_findings(result)
+    empty = {"issues": [], "warnings": [], "suggestions": []}
+
     # 文档结构
-    print("\n📋 文档结构检查")
-    print("━" * 60)
-    structure_ok = True
-    for issue in result["issues"]:
-        if issue["type"] == "structure":
+    if rule_names is None or "structure" in rule_names:
+        print("\n📋 文档结构检查")
+        print("━" * 60)
+        structure = grouped.get("structure", empty)
+        for issue in structure["issues"]:
             print(f"❌ {issue['message']}")
-            structure_ok = False
-    for warning in result["warnings"]:
-        if warning["type"] == "structure":
+        for warning in structure["warnings"]:
             print(f"⚠️  {warning['message']}")
-            structure_ok = False
 
-    if structure_ok:
-        print("✅ 文档结构完整")
+        if not structure["issues"] and not structure["warnings"]:
+            print("✅ 文档结构完整")
 
     # 用户故事
-    print("\n👤 用户故事验证")
-    print("━" * 60)
-    story_issues = [i for i in result["issues"] if i["type"] == "user_story"]
-    story_warnings = [w for w in result["warnings"] if w["type"] == "user_story"]
+    if rule_names is None or "user_story" in rule_names:
+        print("\n👤 用户故事验证")
+        print("━" * 60)
+        stories = grouped.get("user_story", empty)
 
-    if not story_issues and not story_warnings:
-        print("✅ 用户故事格式正确")
-    else:
-        for issue in story_issues:
-            print(f"❌ {issue['message']}")
-        for warning in story_warnings:
-            print(f"⚠️  {warning['message']}")
+        if not stories["issues"] and not stories["warnings"]:
+            print("✅ 用户故事格式正确")
+        else:
+            for issue in stories["issues"]:
+                print(f"❌ {issue['message']}")
+            for warning in stories["warnings"]:
+                print(f"⚠️  {warning['message']}")
 
     # 成功指标
-    print("\n📊 成功指标检查")
-    print("━" * 60)
-    metrics_issues = [i for i in result["issues"] if i["type"] == "metrics"]
-    metrics_warnings = [w for w in result["warnings"] if w["type"] == "metrics"]
-    metrics_suggestions = [s for s in result["suggestions"] if s["type"] == "metrics"]
+    if rule_names is None or "metrics" in rule_names:
+        print("\n📊 成功指标检查")
+        print("━" * 60)
+        metrics = grouped.get("metrics", empty)
 
-    if not metrics_issues and not metrics_warnings:
-        print("✅ 成功指标已定义")
-    else:
-        for issue in metrics_issues:
-            print(f"❌ {issue['message']}")
-        for warning in metrics_warnings:
-            print(f"⚠️  {warning['message']}")
+        if not metrics["issues"] and not metrics["warnings"]:
+            print("✅ 成功指标已定义")
+        else:
+            for issue in metrics["issues"]:
+                print(f"❌ {issue['message']}")
+            for warning in metrics["warnings"]:
+                print(f"⚠️  {warning['message']}")
 
-    if verbose:
-        for suggestion in metrics_suggestions:
-            print(f"ℹ️  {suggestion['message']}")
+        if verbose:
+            for suggestion in metrics["suggestions"]:
+                print(f"ℹ️  {suggestion['message']}")
 
     # 内容完整性
-    print("\n🔍 内容完整性")
-    print("━" * 60)
-    placeholder_warnings = [w for w in result["warnings"] if w["type"] == "placeholder"]
+    if rule_names is None or "placeholder" in rule_names:
+        print("\n🔍 内容完整性")
+        print("━" * 60)
+        placeholder_warnings = grouped.get("placeholder", empty)["warnings"]
 
-    if not placeholder_warnings:
-        print("✅ 无占位符文本")
-    else:
-        for warning in placeholder_warnings:
-            print(f"⚠️  {warning['message']}")
+        if not placeholder_warnings:
+            print("✅ 无占位符文本")
+        else:
+            for warning in placeholder_warnings:
+                print(f"⚠️  {warning['message']}")
 
     # 总体评分
     print("\n" + "━" * 60)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+常驻PRD验证服务
+
+用法:
+    python validation_server.py
+    python validation_server.py --idle-timeout 300 --cache
+    python validation_server.py --socket /tmp/prd-validator.sock --verbose
+
+通常不需要手动启动：scripts/validate_fast.py 在服务未运行时会自动在后台启动。
+套接字路径默认为 PRD_VALIDATOR_SOCKET 或临时目录下的 prd-validator-<uid>.sock，
+空闲超时默认为 VALIDATOR_IDLE_TIMEOUT 或600秒。
+"""
+
+import os
+import sys
+import signal
+import argparse
+from pathlib import Path
+
+# 添加插件根目录到路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.validation_server import ValidationServer, DEFAULT_IDLE_TIMEOUT
+from lib.validation_cache import ValidationCache
+from lib.utils import load_env, setup_logging
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="常驻PRD验证服务")
+    parser.add_argument("--socket", help="Unix套接字路径（默认: PRD_VALIDATOR_SOCKET 或临时目录）")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        help="空闲多少秒后自动退出，0表示不退出（默认: VALIDATOR_IDLE_TIMEOUT 或600）"
+    )
+    parser.add_argument("--cache", action="store_true", help="启用验证缓存")
+    parser.add_argument("--cache-dir", help="缓存目录（默认: CACHE_DIR 或 outputs/.cache）")
+    parser.add_argument("--verbose", "-v", action="store_true", help="显示详细日志")
+    args = parser.parse_args()
+
+    load_env()
+    setup_logging(level="DEBUG" if args.verbose else None)
+
+    idle_timeout = args.idle_timeout
+    if idle_timeout is None:
+        idle_timeout = float(os.getenv("VALIDATOR_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+
+    cache = ValidationCache(cache_dir=args.cache_dir) if args.cache else None
+    server = ValidationServer(socket_path=args.socket, idle_timeout=idle_timeout, cache=cache)
+    server.warm_up()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+    try:
+        server.serve_forever()
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()